@@ -1,4 +1,5 @@
 from django.urls import path
+from core.routers import read_only
 from . import views
 
 
@@ -7,8 +8,8 @@ app_name = 'about'
 
 urlpatterns = [
     path('author/',
-         views.AboutAuthorView.as_view(), name='author'),
+         read_only(views.AboutAuthorView.as_view()), name='author'),
 
     path('tech/',
-         views.AboutTechView.as_view(), name='tech')
+         read_only(views.AboutTechView.as_view()), name='tech')
 ]
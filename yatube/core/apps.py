@@ -3,3 +3,10 @@ from django.apps import AppConfig
 
 class CoreConfig(AppConfig):
     name = 'core'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from . import checks, instrumentation, sqlite  # noqa: F401
+        instrumentation.install()
+        connection_created.connect(sqlite.configure)
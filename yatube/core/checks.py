@@ -0,0 +1,43 @@
+"""
+Проверки настроек для manage.py check.
+
+Поколения лент, кэш страниц и карта групп живут в кэше по умолчанию.
+В боевом окружении воркеров несколько, и у каждого свой locmem: сдвиг
+поколения в одном процессе другие не видят и часами отдают старые
+страницы. Поэтому при CACHE_SHARED_REQUIRED кэш обязан быть общим.
+Файловый кэш общий, но его add() не атомарен: замок кэша страниц
+(core.page_cache) могут взять несколько процессов сразу, и одну
+страницу пересобирают все они.
+"""
+from django.conf import settings
+from django.core.checks import Error, Warning, register
+
+PROCESS_LOCAL_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+NON_ATOMIC_ADD_BACKENDS = (
+    'django.core.cache.backends.filebased.FileBasedCache',
+)
+
+
+@register()
+def shared_cache(app_configs, **kwargs):
+    if not getattr(settings, 'CACHE_SHARED_REQUIRED', False):
+        return []
+    backend = settings.CACHES['default']['BACKEND']
+    if backend in NON_ATOMIC_ADD_BACKENDS:
+        return [Warning(
+            f'У кэша {backend} add() не атомарен: устаревшую страницу '
+            'могут пересобирать несколько процессов сразу.',
+            hint='Для кэша страниц задайте YATUBE_CACHE=db, memcached '
+                 'или redis.',
+            id='core.W001',
+        )]
+    if backend not in PROCESS_LOCAL_BACKENDS:
+        return []
+    return [Error(
+        f'Кэш по умолчанию {backend} не общий для процессов.',
+        hint='Задайте YATUBE_CACHE=file, db, memcached или redis.',
+        id='core.E001',
+    )]
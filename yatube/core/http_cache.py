@@ -0,0 +1,77 @@
+"""
+Заголовки HTTP-кэширования и условные ответы для страниц.
+
+Декоратор conditional_page(validators) до вызова представления берёт у
+validators(request, *args, **kwargs) пару (etag, last_modified) и, если
+копия у клиента не устарела (If-None-Match, If-Modified-Since), сразу
+отвечает 304 — запросы страницы не выполняются. validators должна быть
+дешёвой (кэш, поиск по индексу). Если она вернула None, проверять
+нечего: представление отвечает как обычно, а validators спрашивается
+ещё раз после него — ей может понадобиться то, что оно загрузило.
+
+Гостям ответ отдаётся с Cache-Control: public и max-age из
+HTTP_CACHE_MAX_AGE, его могут хранить прокси и CDN. Вошедшим — private,
+no-cache: копию хранит только браузер и переспрашивает её каждый раз.
+Vary: Cookie не даёт общему кэшу отдать гостевую страницу вошедшему.
+"""
+import calendar
+from functools import wraps
+
+from django.conf import settings
+from django.utils.cache import (get_conditional_response,
+                                patch_cache_control, patch_vary_headers)
+from django.utils.http import http_date, quote_etag
+
+
+def max_age():
+    return getattr(settings, 'HTTP_CACHE_MAX_AGE', 60)
+
+
+def _shared(request):
+    """Можно ли хранить ответ в общих кэшах."""
+    # Страница с csrf_token выдаёт посетителю его собственную куку.
+    return (not request.user.is_authenticated
+            and not request.META.get('CSRF_COOKIE_USED'))
+
+
+def _validators(found):
+    etag, last_modified = found or (None, None)
+    timestamp = last_modified and calendar.timegm(
+        last_modified.utctimetuple())
+    return etag and quote_etag(etag), timestamp
+
+
+def _patch(request, response, etag, timestamp):
+    if etag and not response.has_header('ETag'):
+        response['ETag'] = etag
+    if timestamp and not response.has_header('Last-Modified'):
+        response['Last-Modified'] = http_date(timestamp)
+    patch_vary_headers(response, ['Cookie'])
+    if _shared(request):
+        patch_cache_control(response, public=True, max_age=max_age())
+    else:
+        patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def conditional_page(validators):
+    """Условные GET и заголовки кэширования для HTML-представления."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(request, *args, **kwargs)
+            found = validators(request, *args, **kwargs)
+            etag, timestamp = _validators(found)
+            response = found and get_conditional_response(
+                request, etag=etag, last_modified=timestamp)
+            if response is None:
+                response = view(request, *args, **kwargs)
+                if response.status_code != 200:
+                    return response
+                if found is None:
+                    etag, timestamp = _validators(
+                        validators(request, *args, **kwargs))
+            return _patch(request, response, etag, timestamp)
+        return wrapper
+    return decorator
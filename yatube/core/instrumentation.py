@@ -0,0 +1,209 @@
+"""
+Лёгкая инструментация запросов для боевого окружения.
+
+InstrumentationMiddleware для доли запросов (INSTRUMENTATION_SAMPLE_RATE)
+считает число SQL-запросов и время в базе, время рендеринга шаблонов,
+попадания в кэш и в кэш страниц (core.page_cache). Итоги копятся по
+имени представления в памяти процесса и отдаются представлением
+core.views.metrics в текстовом формате Prometheus, а каждый замер
+пишется строкой JSON в лог yatube.requests.
+SQL-запросы дольше INSTRUMENTATION_SLOW_QUERY_MS попадают в лог
+yatube.slow_queries вместе с SQL и стеком вызова.
+"""
+import json
+import logging
+import random
+import threading
+import time
+import traceback
+from collections import defaultdict
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+from django.template import base
+
+request_logger = logging.getLogger('yatube.requests')
+slow_query_logger = logging.getLogger('yatube.slow_queries')
+
+# Границы гистограммы времени ответа, секунды.
+BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+COUNTERS = ('requests', 'seconds', 'db_queries', 'db_seconds',
+            'template_seconds', 'cache_hits', 'cache_misses',
+            'slow_queries', 'page_cache_hits', 'page_cache_stale',
+            'page_cache_misses')
+
+_local = threading.local()
+
+
+def sample_rate():
+    return getattr(settings, 'INSTRUMENTATION_SAMPLE_RATE', 1.0)
+
+
+def slow_query_seconds():
+    return getattr(settings, 'INSTRUMENTATION_SLOW_QUERY_MS', 200) / 1000
+
+
+class Registry:
+    """Накопленные метрики по представлениям одного процесса."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        self.counters = defaultdict(lambda: dict.fromkeys(COUNTERS, 0))
+        self.buckets = defaultdict(lambda: [0] * len(BUCKETS))
+
+    def add(self, view, sample):
+        with self.lock:
+            counters = self.counters[view]
+            counters['requests'] += 1
+            for key, value in sample.items():
+                counters[key] += value
+            buckets = self.buckets[view]
+            for i, bound in enumerate(BUCKETS):
+                if sample['seconds'] <= bound:
+                    buckets[i] += 1
+
+    def render(self):
+        """Метрики в текстовом формате Prometheus."""
+        with self.lock:
+            counters = {view: dict(values)
+                        for view, values in self.counters.items()}
+            buckets = {view: list(values)
+                       for view, values in self.buckets.items()}
+        lines = []
+        for key in COUNTERS:
+            if key == 'seconds':
+                continue
+            name = f'yatube_{key}_total'
+            lines.append(f'# TYPE {name} counter')
+            for view, values in sorted(counters.items()):
+                lines.append(f'{name}{{view="{view}"}} {values[key]}')
+        name = 'yatube_request_seconds'
+        lines.append(f'# TYPE {name} histogram')
+        for view, values in sorted(counters.items()):
+            for bound, count in zip(BUCKETS, buckets[view]):
+                lines.append(
+                    f'{name}_bucket{{view="{view}",le="{bound}"}} {count}')
+            lines.append(f'{name}_bucket{{view="{view}",le="+Inf"}} '
+                         f'{values["requests"]}')
+            lines.append(f'{name}_sum{{view="{view}"}} {values["seconds"]}')
+            lines.append(
+                f'{name}_count{{view="{view}"}} {values["requests"]}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+
+def _current():
+    """Замер текущего запроса или None, если запрос не выбран."""
+    return getattr(_local, 'sample', None)
+
+
+def count(key, value=1):
+    """Прибавляет value к счётчику key, если запрос выбран для замера."""
+    sample = _current()
+    if sample is not None:
+        sample[key] += value
+
+
+def _query_hook(execute, sql, params, many, context):
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = time.perf_counter() - started
+        sample = _current()
+        if sample is not None:
+            sample['db_queries'] += 1
+            sample['db_seconds'] += elapsed
+            if elapsed >= slow_query_seconds():
+                sample['slow_queries'] += 1
+                slow_query_logger.warning(
+                    'slow query %.1f ms: %s', elapsed * 1000, sql,
+                    extra={'sql': sql, 'params': params,
+                           'duration': elapsed,
+                           'stack': ''.join(traceback.format_stack()[:-2])}
+                )
+
+
+def _instrumented_render(render):
+    def wrapper(self, context):
+        sample = _current()
+        if sample is None or _local.depth:
+            return render(self, context)
+        # Вложенные include считаются внутри внешнего шаблона.
+        _local.depth += 1
+        started = time.perf_counter()
+        try:
+            return render(self, context)
+        finally:
+            sample['template_seconds'] += time.perf_counter() - started
+            _local.depth -= 1
+    wrapper.instrumented = True
+    return wrapper
+
+
+def _instrumented_cache(backend, method):
+    original = getattr(backend, method)
+
+    def get(key, default=None, **kwargs):
+        value = original(key, default, **kwargs)
+        _local.sample['cache_misses' if value is default
+                      else 'cache_hits'] += 1
+        return value
+
+    def get_many(keys, **kwargs):
+        keys = list(keys)
+        found = original(keys, **kwargs)
+        _local.sample['cache_hits'] += len(found)
+        _local.sample['cache_misses'] += len(keys) - len(found)
+        return found
+    return get if method == 'get' else get_many
+
+
+def install():
+    """Подменяет рендеринг шаблонов; вызывается из CoreConfig.ready()."""
+    if not getattr(base.Template.render, 'instrumented', False):
+        base.Template.render = _instrumented_render(base.Template.render)
+
+
+class InstrumentationMiddleware:
+    """Замеряет выбранные запросы и складывает итоги в registry."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if random.random() >= sample_rate():
+            return self.get_response(request)
+        _local.sample = sample = dict.fromkeys(COUNTERS[1:], 0)
+        _local.depth = 0
+        backends = [caches[alias] for alias in settings.CACHES]
+        for backend in backends:
+            for method in ('get', 'get_many'):
+                setattr(backend, method, _instrumented_cache(backend, method))
+        started = time.perf_counter()
+        try:
+            with ExitStack() as hooks:
+                for connection in connections.all():
+                    hooks.enter_context(
+                        connection.execute_wrapper(_query_hook))
+                response = self.get_response(request)
+        finally:
+            sample['seconds'] = time.perf_counter() - started
+            _local.sample = None
+            for backend in backends:
+                del backend.get, backend.get_many
+        match = request.resolver_match
+        view = match.view_name if match else '<unresolved>'
+        registry.add(view, sample)
+        if request_logger.isEnabledFor(logging.INFO):
+            request_logger.info(json.dumps(dict(
+                sample, view=view, method=request.method,
+                status=response.status_code)))
+        return response
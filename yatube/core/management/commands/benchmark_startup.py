@@ -0,0 +1,52 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+# Выполняется в отдельном интерпретаторе: время запуска WSGI-приложения
+# и загруженные модули.
+PROBE = '''
+import json, sys, time
+started = time.perf_counter()
+from django.core.wsgi import get_wsgi_application
+get_wsgi_application()
+print(json.dumps({
+    'ms': (time.perf_counter() - started) * 1000,
+    'modules': len(sys.modules),
+    'debug_toolbar': 'debug_toolbar' in sys.modules,
+}))
+'''
+
+
+class Command(BaseCommand):
+    help = ('Меряет время запуска WSGI-приложения и число импортированных '
+            'модулей в каждом окружении настроек')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument(
+            '--envs', nargs='+', default=['dev', 'prod'],
+            help='Окружения YATUBE_ENV для сравнения'
+        )
+
+    def probe(self, env):
+        environ = dict(os.environ, YATUBE_ENV=env,
+                       DJANGO_SETTINGS_MODULE='yatube.settings')
+        output = subprocess.run(
+            [sys.executable, '-c', PROBE], cwd=settings.BASE_DIR,
+            env=environ, check=True, capture_output=True, text=True
+        ).stdout
+        return json.loads(output)
+
+    def handle(self, *args, **options):
+        for env in options['envs']:
+            runs = [self.probe(env) for _ in range(options['repeat'])]
+            self.stdout.write(
+                f'{env:6} {statistics.median(run["ms"] for run in runs):8.1f}'
+                f' мс  модулей {runs[0]["modules"]:5}  '
+                f'debug_toolbar: {"да" if runs[0]["debug_toolbar"] else "нет"}'
+            )
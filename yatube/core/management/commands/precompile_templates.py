@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.template_loading import precompile
+
+
+class Command(BaseCommand):
+    help = ('Компилирует все шаблоны и падает, если хотя бы один '
+            'не собирается')
+
+    def handle(self, *args, **options):
+        compiled, errors = precompile()
+        if errors:
+            raise CommandError(
+                'Шаблоны с ошибками:\n' + '\n'.join(errors))
+        self.stdout.write(self.style.SUCCESS(
+            f'Скомпилировано шаблонов: {compiled}'
+        ))
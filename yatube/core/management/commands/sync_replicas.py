@@ -0,0 +1,48 @@
+import sqlite3
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from core.routers import replicas
+
+
+def copy_sqlite(source, target):
+    """Целиком переносит базу source в target через backup API SQLite."""
+    source_db = sqlite3.connect(source)
+    target_db = sqlite3.connect(target)
+    try:
+        source_db.backup(target_db)
+    finally:
+        target_db.close()
+        source_db.close()
+
+
+class Command(BaseCommand):
+    help = ('Копирует базу default в реплики SQLite из DATABASE_REPLICAS; '
+            'для локальной проверки чтения с реплик')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=float, default=0,
+            help='Повторять копирование каждые N секунд'
+        )
+
+    def handle(self, *args, **options):
+        aliases = replicas()
+        if not aliases:
+            raise CommandError('DATABASE_REPLICAS пуст')
+        for alias in ('default', *aliases):
+            if connections[alias].vendor != 'sqlite':
+                raise CommandError(
+                    f'{alias}: копировать можно только SQLite, реплики '
+                    'других баз ведёт сама база')
+        source = connections['default'].settings_dict['NAME']
+        while True:
+            for alias in aliases:
+                connections[alias].close()
+                copy_sqlite(source, connections[alias].settings_dict['NAME'])
+            self.stdout.write(f'Реплики обновлены: {", ".join(aliases)}')
+            if not options['interval']:
+                return
+            time.sleep(options['interval'])
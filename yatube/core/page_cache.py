@@ -0,0 +1,124 @@
+"""
+Кэш целых страниц для гостей.
+
+cached_page(validators) — это conditional_page из core.http_cache плюс
+хранение готового ответа по пути с query. Запись помнит версию — ETag
+из validators — и срок свежести PAGE_CACHE_TIMEOUT. Когда версия
+сменилась или срок вышел, страницу пересобирает один процесс, взявший
+замок, а остальные пока отдают старую копию: она живёт ещё
+PAGE_CACHE_STALE секунд. Если копии нет совсем, они ждут её до
+WAIT_SECONDS, а потом собирают страницу сами.
+
+Мимо кэша идут запросы с кукой сессии и не GET/HEAD, не сохраняются
+ответы не для всех (private, Set-Cookie). Попадания, устаревшие копии и
+промахи считает core.instrumentation.
+"""
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+
+from . import instrumentation
+from .http_cache import conditional_page
+from .routers import replica_timeout
+
+KEY_PREFIX = 'page:'
+LOCK_SECONDS = 30
+WAIT_SECONDS = 2
+POLL_SECONDS = 0.05
+
+
+def timeout():
+    return getattr(settings, 'PAGE_CACHE_TIMEOUT', 60)
+
+
+def stale_timeout():
+    return getattr(settings, 'PAGE_CACHE_STALE', 60 * 10)
+
+
+def _bypass(request):
+    return (request.method not in ('GET', 'HEAD')
+            or settings.SESSION_COOKIE_NAME in request.COOKIES)
+
+
+def _key(request):
+    # Без хоста и схемы, как и ETag: страницы сайта от них не зависят,
+    # а прогрев (warm_cache) не знает, под каким именем придут гости.
+    path = request.get_full_path()
+    return KEY_PREFIX + hashlib.md5(path.encode()).hexdigest()
+
+
+def _storable(request, response):
+    return (response.status_code == 200
+            and not response.cookies
+            and not request.META.get('CSRF_COOKIE_USED')
+            and 'private' not in response.get('Cache-Control', ''))
+
+
+def _from_cache(request, response):
+    """Сохранённый ответ с учётом If-None-Match и If-Modified-Since."""
+    return get_conditional_response(
+        request, etag=response.get('ETag'),
+        last_modified=parse_http_date_safe(
+            response.get('Last-Modified', '')),
+        response=response)
+
+
+def _wait(key):
+    """Копия, которую за WAIT_SECONDS собрал другой процесс."""
+    deadline = time.monotonic() + WAIT_SECONDS
+    while time.monotonic() < deadline:
+        time.sleep(POLL_SECONDS)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry
+    return None
+
+
+def cached_page(validators):
+    """Кэш страниц для гостей поверх conditional_page(validators)."""
+    def decorator(view):
+        conditional = conditional_page(validators)(view)
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if _bypass(request):
+                return conditional(request, *args, **kwargs)
+            found = validators(request, *args, **kwargs)
+            if found is None:
+                return conditional(request, *args, **kwargs)
+            version = found[0]
+            key = _key(request)
+            entry = cache.get(key)
+            if (entry is not None and entry['version'] == version
+                    and entry['expires'] > time.time()):
+                instrumentation.count('page_cache_hits')
+                return _from_cache(request, entry['response'])
+            lock = key + ':lock'
+            locked = cache.add(lock, 1, LOCK_SECONDS)
+            if not locked:
+                entry = entry or _wait(key)
+                if entry is not None:
+                    instrumentation.count('page_cache_stale')
+                    return _from_cache(request, entry['response'])
+            instrumentation.count('page_cache_misses')
+            try:
+                # validators уже спрошены, второй раз не нужно.
+                response = conditional_page(lambda *a, **kw: found)(view)(
+                    request, *args, **kwargs)
+                if locked and _storable(request, response):
+                    cache.set(key, {
+                        'version': version,
+                        'expires': time.time() + replica_timeout(timeout()),
+                        'response': response,
+                    }, timeout() + stale_timeout())
+            finally:
+                if locked:
+                    cache.delete(lock)
+            return response
+        return wrapper
+    return decorator
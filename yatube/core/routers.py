@@ -0,0 +1,118 @@
+"""
+Чтение с реплик базы.
+
+Представления, помеченные декоратором read_only, читают с одной из
+реплик DATABASE_REPLICAS; всё остальное, включая любую запись, идёт в
+default. После небезопасного запроса (POST и т. п.) ReplicaMiddleware
+ставит cookie, и REPLICA_STICKY_SECONDS секунд пользователь читает
+только с default, чтобы видеть свои изменения, пока реплика догоняет.
+Приложения из REPLICA_PRIMARY_APPS (сессии и пользователи, которых
+представление загружает лениво) всегда читаются из default: иначе
+завершённая сессия жила бы на реплике, пока та не догонит.
+Без реплик роутер ничего не решает и всё идёт в default.
+Кэш, собранный из данных реплики, живёт не дольше
+REPLICA_STICKY_SECONDS (replica_timeout).
+"""
+import random
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+
+STICKY_COOKIE = 'db_primary'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+_local = threading.local()
+
+
+def replicas():
+    return getattr(settings, 'DATABASE_REPLICAS', ())
+
+
+def primary_apps():
+    return getattr(settings, 'REPLICA_PRIMARY_APPS', ('auth', 'sessions'))
+
+
+def sticky_seconds():
+    return getattr(settings, 'REPLICA_STICKY_SECONDS', 5)
+
+
+def replica_timeout(timeout):
+    """
+    Срок кэша для данных, которые сейчас читаются.
+
+    Отстающая реплика может отдать старые данные уже под сдвинутыми
+    поколениями, поэтому прочитанное с неё хранится не дольше
+    REPLICA_STICKY_SECONDS — за это время реплика должна догнать.
+    """
+    if replicas() and getattr(_local, 'replica', False):
+        return min(timeout, sticky_seconds())
+    return timeout
+
+
+def read_only(view):
+    """Помечает представление, которому хватает данных с реплики."""
+    view.read_only = True
+    return view
+
+
+@contextmanager
+def reading_from(replica):
+    """Чтение с реплик (True) или только с default (False) внутри блока."""
+    previous = getattr(_local, 'replica', False)
+    _local.replica = replica
+    try:
+        yield
+    finally:
+        _local.replica = previous
+
+
+def primary():
+    """Чтение внутри блока видит только что записанное в default."""
+    return reading_from(False)
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        aliases = replicas()
+        if (aliases and getattr(_local, 'replica', False)
+                and model._meta.app_label not in primary_apps()):
+            return random.choice(aliases)
+        return None
+
+    def db_for_write(self, model, **hints):
+        return 'default' if replicas() else None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = {'default', *replicas()}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Реплика получает схему вместе с данными из default.
+        return False if db in replicas() else None
+
+
+class ReplicaMiddleware:
+    """Выбирает базу для чтения по представлению и cookie записи."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            response = self.get_response(request)
+        finally:
+            _local.replica = False
+        if request.method not in SAFE_METHODS and replicas():
+            response.set_cookie(STICKY_COOKIE, '1',
+                                max_age=sticky_seconds(), httponly=True,
+                                samesite='Lax')
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        _local.replica = (getattr(view_func, 'read_only', False)
+                          and request.method in SAFE_METHODS
+                          and STICKY_COOKIE not in request.COOKIES)
@@ -0,0 +1,26 @@
+"""
+Настройка соединений SQLite для конкурентной работы.
+
+На каждое новое соединение выполняются PRAGMA из SQLITE_PRAGMAS: журнал
+WAL, в котором читатели не ждут писателя, synchronous=NORMAL (в режиме
+WAL сбрасывается на диск только контрольная точка), ожидание блокировки
+вместо ошибки «database is locked», кэш страниц, mmap и временные
+таблицы в памяти. Значение None отключает PRAGMA. Режим WAL сохраняется
+в файле базы; вернуть прежний можно значением journal_mode='delete'.
+"""
+from django.conf import settings
+
+
+def pragmas():
+    configured = getattr(settings, 'SQLITE_PRAGMAS', {})
+    return {name: value for name, value in configured.items()
+            if value is not None}
+
+
+def configure(sender, connection, **kwargs):
+    """Обработчик connection_created; подключается в CoreConfig.ready()."""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in pragmas().items():
+            cursor.execute(f'PRAGMA {name} = {value}')
@@ -0,0 +1,49 @@
+"""
+Компиляция всех шаблонов проекта заранее.
+
+С кэширующим загрузчиком (настройки prod) скомпилированные шаблоны
+остаются в памяти процесса, и первый запрос к странице не читает и не
+разбирает файлы. Без него прогон просто проверяет, что шаблоны
+собираются.
+"""
+import os
+
+from django.template import TemplateSyntaxError, engines
+from django.template.backends.django import DjangoTemplates
+from django.template.utils import get_app_template_dirs
+
+EXTENSIONS = ('.html', '.txt')
+
+
+def template_names(engine):
+    """Имена всех шаблонов из DIRS и, при APP_DIRS, из приложений."""
+    dirs = list(engine.engine.dirs)
+    if engine.engine.app_dirs or any(
+            'app_directories' in str(loader)
+            for loader in engine.engine.loaders):
+        dirs += get_app_template_dirs('templates')
+    names = set()
+    for directory in dirs:
+        for root, _, files in os.walk(directory):
+            for filename in files:
+                if filename.endswith(EXTENSIONS):
+                    path = os.path.join(root, filename)
+                    names.add(os.path.relpath(path, directory))
+    return sorted(names)
+
+
+def precompile():
+    """Компилирует шаблоны и возвращает (число шаблонов, ошибки)."""
+    compiled = 0
+    errors = []
+    for engine in engines.all():
+        if not isinstance(engine, DjangoTemplates):
+            continue
+        for name in template_names(engine):
+            try:
+                engine.get_template(name)
+            except TemplateSyntaxError as error:
+                errors.append(f'{name}: {error}')
+            else:
+                compiled += 1
+    return compiled, errors
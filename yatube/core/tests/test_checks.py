@@ -0,0 +1,35 @@
+from django.test import SimpleTestCase, override_settings
+
+from core.checks import shared_cache
+
+LOCMEM = {'default': {
+    'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+FILE = {'default': {
+    'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+    'LOCATION': '/tmp/yatube_cache'}}
+DATABASE = {'default': {
+    'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+    'LOCATION': 'yatube_cache'}}
+
+
+class SharedCacheCheckTests(SimpleTestCase):
+    """Проверка общего кэша в боевом окружении."""
+
+    @override_settings(CACHE_SHARED_REQUIRED=True, CACHES=LOCMEM)
+    def test_locmem_rejected(self):
+        errors = shared_cache(None)
+        self.assertEqual([error.id for error in errors], ['core.E001'])
+
+    @override_settings(CACHE_SHARED_REQUIRED=True, CACHES=DATABASE)
+    def test_shared_backend_passes(self):
+        self.assertEqual(shared_cache(None), [])
+
+    @override_settings(CACHE_SHARED_REQUIRED=True, CACHES=FILE)
+    def test_file_backend_warned(self):
+        """У файлового кэша замок страниц не исключает гонку."""
+        warnings = shared_cache(None)
+        self.assertEqual([warning.id for warning in warnings], ['core.W001'])
+
+    @override_settings(CACHE_SHARED_REQUIRED=False, CACHES=LOCMEM)
+    def test_not_required(self):
+        self.assertEqual(shared_cache(None), [])
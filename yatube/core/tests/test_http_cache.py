@@ -0,0 +1,92 @@
+from datetime import datetime, timezone
+
+from django.contrib.auth.models import AnonymousUser, User
+from django.http import HttpResponse, HttpResponseNotFound
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from core.http_cache import conditional_page
+
+CHANGED = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+@override_settings(HTTP_CACHE_MAX_AGE=30)
+class ConditionalPageTests(SimpleTestCase):
+    """Проверка условных ответов и заголовков кэширования."""
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.calls = []
+
+        @conditional_page(lambda request: ('v1', CHANGED))
+        def view(request):
+            self.calls.append(request)
+            return HttpResponse('page')
+        self.view = view
+
+    def get(self, user=None, **headers):
+        request = self.factory.get('/', **headers)
+        request.user = user or AnonymousUser()
+        return self.view(request)
+
+    def test_guest_headers(self):
+        response = self.get()
+        self.assertEqual(response['ETag'], '"v1"')
+        self.assertEqual(response['Last-Modified'],
+                         'Mon, 01 Jan 2024 00:00:00 GMT')
+        self.assertEqual(response['Vary'], 'Cookie')
+        self.assertIn('public', response['Cache-Control'])
+        self.assertIn('max-age=30', response['Cache-Control'])
+
+    def test_user_headers(self):
+        response = self.get(user=User(pk=1))
+        self.assertIn('private', response['Cache-Control'])
+        self.assertIn('no-cache', response['Cache-Control'])
+        self.assertNotIn('public', response['Cache-Control'])
+
+    def test_not_modified_skips_view(self):
+        for headers in (
+            {'HTTP_IF_NONE_MATCH': '"v1"'},
+            {'HTTP_IF_MODIFIED_SINCE': 'Mon, 01 Jan 2024 00:00:00 GMT'},
+        ):
+            with self.subTest(headers=headers):
+                response = self.get(**headers)
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response['ETag'], '"v1"')
+                self.assertIn('public', response['Cache-Control'])
+        self.assertEqual(self.calls, [])
+
+    def test_modified(self):
+        for headers in (
+            {'HTTP_IF_NONE_MATCH': '"v0"'},
+            {'HTTP_IF_MODIFIED_SINCE': 'Sun, 31 Dec 2023 00:00:00 GMT'},
+            # If-None-Match важнее If-Modified-Since.
+            {'HTTP_IF_NONE_MATCH': '"v0"',
+             'HTTP_IF_MODIFIED_SINCE': 'Mon, 01 Jan 2024 00:00:00 GMT'},
+        ):
+            with self.subTest(headers=headers):
+                self.assertEqual(self.get(**headers).status_code, 200)
+
+    def test_validators_after_view(self):
+        """Если проверять нечего, заголовки берутся после представления."""
+        known = {}
+
+        @conditional_page(lambda request: known.get('page'))
+        def view(request):
+            known['page'] = ('v2', CHANGED)
+            return HttpResponse('page')
+
+        request = self.factory.get('/', HTTP_IF_NONE_MATCH='"v2"')
+        request.user = AnonymousUser()
+        response = view(request)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['ETag'], '"v2"')
+
+    def test_errors_untouched(self):
+        @conditional_page(lambda request: None)
+        def view(request):
+            return HttpResponseNotFound()
+
+        request = self.factory.get('/')
+        request.user = AnonymousUser()
+        response = view(request)
+        self.assertFalse(response.has_header('Cache-Control'))
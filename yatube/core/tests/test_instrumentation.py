@@ -0,0 +1,58 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from posts.models import Post
+
+from core.instrumentation import registry
+
+User = get_user_model()
+
+
+class InstrumentationTests(TestCase):
+    """Проверка замеров InstrumentationMiddleware."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Nemo')
+        Post.objects.create(text='text', author=cls.user)
+
+    def setUp(self):
+        cache.clear()
+        registry.clear()
+        self.client = Client()
+
+    def test_counters_by_view(self):
+        self.client.get(reverse('posts:index'))
+        self.client.get(reverse('posts:index'))
+        counters = registry.counters['posts:index']
+        self.assertEqual(counters['requests'], 2)
+        self.assertGreater(counters['db_queries'], 0)
+        self.assertGreater(counters['template_seconds'], 0)
+        self.assertGreater(counters['cache_hits'], 0)
+        self.assertGreater(counters['cache_misses'], 0)
+
+    @override_settings(INSTRUMENTATION_SAMPLE_RATE=0)
+    def test_sampling(self):
+        self.client.get(reverse('posts:index'))
+        self.assertNotIn('posts:index', registry.counters)
+
+    @override_settings(INSTRUMENTATION_SLOW_QUERY_MS=0)
+    def test_slow_query_log(self):
+        with self.assertLogs('yatube.slow_queries', 'WARNING') as logs:
+            self.client.get(reverse('posts:index'))
+        self.assertTrue(any('posts_post' in line for line in logs.output))
+        self.assertIn('stack', logs.records[-1].__dict__)
+
+    def test_metrics_endpoint(self):
+        self.client.get(reverse('posts:index'))
+        response = self.client.get(reverse('metrics'),
+                                   REMOTE_ADDR='127.0.0.1')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('yatube_db_queries_total{view="posts:index"}',
+                      response.content.decode())
+        self.assertIn('yatube_request_seconds_bucket{view="posts:index",'
+                      'le="+Inf"} 1', response.content.decode())
+        response = self.client.get(reverse('metrics'), REMOTE_ADDR='10.0.0.1')
+        self.assertEqual(response.status_code, 403)
@@ -0,0 +1,97 @@
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from core import instrumentation, page_cache, routers
+
+
+class PageCacheTests(SimpleTestCase):
+    """Проверка кэша страниц для гостей."""
+
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+        self.version = 'v1'
+        self.calls = 0
+
+        @page_cache.cached_page(lambda request: (self.version, None))
+        def view(request):
+            self.calls += 1
+            return HttpResponse(f'page {self.calls}')
+        self.view = view
+
+    def get(self, **headers):
+        request = self.factory.get('/feed/?page=2', **headers)
+        request.user = AnonymousUser()
+        return self.view(request)
+
+    def test_hit(self):
+        first = self.get()
+        second = self.get()
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(second.content, first.content)
+        response = self.get(HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_new_version(self):
+        self.get()
+        self.version = 'v2'
+        self.assertEqual(self.get().content, b'page 2')
+        self.assertEqual(self.get().content, b'page 2')
+
+    @override_settings(PAGE_CACHE_TIMEOUT=-1)
+    def test_expired(self):
+        self.get()
+        self.assertEqual(self.get().content, b'page 2')
+
+    @override_settings(DATABASE_REPLICAS=['replica'],
+                       PAGE_CACHE_TIMEOUT=600, REPLICA_STICKY_SECONDS=-1)
+    def test_replica_render_expires_early(self):
+        """Страница, собранная с реплики, живёт не дольше её отставания."""
+        with routers.reading_from(True):
+            self.get()
+        self.assertEqual(self.get().content, b'page 2')
+        self.assertEqual(self.get().content, b'page 2')
+
+    def test_stale_while_locked(self):
+        """Пока страницу собирает другой процесс, отдаётся старая копия."""
+        self.get()
+        self.version = 'v2'
+        request = self.factory.get('/feed/?page=2')
+        cache.add(page_cache._key(request) + ':lock', 1)
+        self.assertEqual(self.get().content, b'page 1')
+        self.assertEqual(self.calls, 1)
+
+    def test_bypass(self):
+        request = self.factory.get('/feed/')
+        request.COOKIES[settings.SESSION_COOKIE_NAME] = 'x'
+        request.user = AnonymousUser()
+        self.view(request)
+        self.view(request)
+        self.assertEqual(self.calls, 2)
+
+    def test_private_not_stored(self):
+        @page_cache.cached_page(lambda request: ('v1', None))
+        def view(request):
+            self.calls += 1
+            request.META['CSRF_COOKIE_USED'] = True
+            return HttpResponse()
+
+        for _ in range(2):
+            request = self.factory.get('/form/')
+            request.user = AnonymousUser()
+            view(request)
+        self.assertEqual(self.calls, 2)
+
+    def test_counters(self):
+        instrumentation._local.sample = sample = dict.fromkeys(
+            instrumentation.COUNTERS[1:], 0)
+        try:
+            self.get()
+            self.get()
+        finally:
+            instrumentation._local.sample = None
+        self.assertEqual(sample['page_cache_misses'], 1)
+        self.assertEqual(sample['page_cache_hits'], 1)
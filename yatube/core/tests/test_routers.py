@@ -0,0 +1,103 @@
+import os
+import sqlite3
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.models import Session
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.urls import resolve, reverse
+from posts.models import Post
+
+from core import routers
+from core.management.commands.sync_replicas import copy_sqlite
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class ReplicaRoutingTests(SimpleTestCase):
+    """Проверка выбора базы для чтения и записи."""
+
+    def setUp(self):
+        self.router = routers.ReplicaRouter()
+        self.factory = RequestFactory()
+
+    def route(self, request, view):
+        """База, которую роутер выберет для чтения внутри view."""
+        chosen = []
+
+        def get_response(request):
+            chosen.append(self.router.db_for_read(Post))
+            return HttpResponse()
+
+        middleware = routers.ReplicaMiddleware(get_response)
+        middleware.process_view(request, view, (), {})
+        response = middleware(request)
+        return chosen[0], response
+
+    def test_router(self):
+        with routers.reading_from(True):
+            self.assertEqual(self.router.db_for_read(Post), 'replica')
+            self.assertEqual(self.router.db_for_write(Post), 'default')
+            with routers.primary():
+                self.assertIsNone(self.router.db_for_read(Post))
+        self.assertIsNone(self.router.db_for_read(Post))
+        self.assertFalse(self.router.allow_migrate('replica', 'posts'))
+
+    def test_replica_timeout(self):
+        self.assertEqual(routers.replica_timeout(600), 600)
+        with routers.reading_from(True):
+            self.assertEqual(routers.replica_timeout(600),
+                             routers.sticky_seconds())
+            with routers.primary():
+                self.assertEqual(routers.replica_timeout(600), 600)
+
+    def test_sessions_and_users_from_primary(self):
+        with routers.reading_from(True):
+            self.assertIsNone(self.router.db_for_read(Session))
+            self.assertIsNone(self.router.db_for_read(get_user_model()))
+            self.assertEqual(self.router.db_for_read(Post), 'replica')
+
+    def test_read_only_view_reads_replica(self):
+        view = routers.read_only(lambda request: None)
+        database, _ = self.route(self.factory.get('/'), view)
+        self.assertEqual(database, 'replica')
+        database, _ = self.route(self.factory.get('/'), lambda request: None)
+        self.assertIsNone(database)
+
+    def test_write_sticks_to_primary(self):
+        view = routers.read_only(lambda request: None)
+        _, response = self.route(self.factory.post('/'), view)
+        cookie = response.cookies[routers.STICKY_COOKIE]
+        self.assertEqual(cookie['max-age'], routers.sticky_seconds())
+        request = self.factory.get('/')
+        request.COOKIES[routers.STICKY_COOKIE] = cookie.value
+        database, _ = self.route(request, view)
+        self.assertIsNone(database)
+
+    def test_views_marked(self):
+        for url, read_only in (
+            (reverse('posts:index'), True),
+            (reverse('posts:follow_index'), True),
+            (reverse('about:author'), True),
+            (reverse('posts:post_create'), False),
+            (reverse('users:signup'), False),
+        ):
+            with self.subTest(url=url):
+                self.assertEqual(
+                    getattr(resolve(url).func, 'read_only', False),
+                    read_only)
+
+
+class CopySQLiteTests(SimpleTestCase):
+
+    def test_copy(self):
+        with tempfile.TemporaryDirectory() as directory:
+            source = os.path.join(directory, 'default.sqlite3')
+            target = os.path.join(directory, 'replica.sqlite3')
+            with sqlite3.connect(source) as db:
+                db.execute('CREATE TABLE t (x)')
+                db.execute('INSERT INTO t VALUES (1)')
+            copy_sqlite(source, target)
+            with sqlite3.connect(target) as db:
+                self.assertEqual(
+                    db.execute('SELECT x FROM t').fetchall(), [(1,)])
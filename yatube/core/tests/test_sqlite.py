@@ -0,0 +1,51 @@
+import os
+import sqlite3
+import tempfile
+from contextlib import closing
+from types import SimpleNamespace
+
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from core import sqlite
+
+
+class SQLitePragmasTests(TestCase):
+    """Проверка настройки соединений SQLite."""
+
+    def pragma(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_connection_configured(self):
+        # NORMAL = 1, MEMORY = 2.
+        self.assertEqual(self.pragma('synchronous'), 1)
+        self.assertEqual(self.pragma('temp_store'), 2)
+        self.assertEqual(self.pragma('busy_timeout'), 5000)
+
+
+class ConfigureTests(SimpleTestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.db = sqlite3.connect(os.path.join(directory.name, 'db.sqlite3'))
+        self.addCleanup(self.db.close)
+        self.connection = SimpleNamespace(
+            vendor='sqlite', cursor=lambda: closing(self.db.cursor()))
+
+    def pragma(self, name):
+        return self.db.execute(f'PRAGMA {name}').fetchone()[0]
+
+    def test_wal(self):
+        sqlite.configure(None, self.connection)
+        self.assertEqual(self.pragma('journal_mode'), 'wal')
+
+    @override_settings(SQLITE_PRAGMAS={'journal_mode': None,
+                                       'mmap_size': 0})
+    def test_settings_pragmas_only(self):
+        self.assertNotIn('journal_mode', sqlite.pragmas())
+        sqlite.configure(None, self.connection)
+        self.assertEqual(self.pragma('journal_mode'), 'delete')
+        self.assertEqual(self.pragma('mmap_size'), 0)
@@ -0,0 +1,29 @@
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+
+from core.template_loading import precompile
+
+
+class PrecompileTemplatesTests(TestCase):
+    """Проверка компиляции шаблонов при деплое."""
+
+    def test_project_templates_compile(self):
+        compiled, errors = precompile()
+        self.assertEqual(errors, [])
+        self.assertGreater(compiled, 0)
+
+    def test_broken_template_fails(self):
+        broken_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, broken_dir)
+        with open(f'{broken_dir}/broken.html', 'w') as template:
+            template.write('{% load no_such_library %}')
+        templates = [dict(settings.TEMPLATES[0],
+                          DIRS=settings.TEMPLATES[0]['DIRS'] + [broken_dir])]
+        with override_settings(TEMPLATES=templates):
+            with self.assertRaisesMessage(CommandError, 'broken.html'):
+                call_command('precompile_templates')
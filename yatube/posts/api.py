@@ -0,0 +1,239 @@
+"""
+JSON API только для чтения: ленты, профиль и пост.
+
+Ответы собираются из строк values() без объектов моделей. Страницы
+курсорные (?cursor=), набор полей выбирается параметром
+?fields=id,text,author (для комментариев поста — ?comment_fields=).
+ETag строится из тех же поколений, что и ключи фрагментного кэша
+(posts.cache), поэтому, пока лента не менялась, ответ 304 отдаётся без
+запроса страницы. В лентах есть image, поэтому в их ETag входит и
+поколение thumbnails. comments_count меняется с каждым комментарием,
+поэтому в ленты он попадает только по ?fields=, и только тогда их ETag
+зависит от поколения comments.
+"""
+import json
+from functools import wraps
+
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.shortcuts import get_object_or_404
+from django.views.decorators.http import condition, require_safe
+
+from core.routers import read_only
+
+from .cache import etag
+from .feed import follow_feed
+from .groups import get_group
+from .models import Comment, Post
+from .paginators import CursorPaginator
+from .profiles import profile_header
+from .views import COMMENTS_PAGE_COUNT, PAGE_COUNT
+
+# Имя поля в ответе -> поле для values().
+POST_FIELDS = {
+    'id': 'id',
+    'text': 'text',
+    'pub_date': 'pub_date',
+    'author': 'author__username',
+    'group': 'group__slug',
+    'image': 'image',
+    'comments_count': 'comments_count',
+}
+COMMENT_FIELDS = {
+    'id': 'id',
+    'author': 'author__username',
+    'text': 'text',
+    'created': 'created',
+}
+# Поля лент без ?fields=: всё, кроме comments_count.
+LIST_FIELDS = [name for name in POST_FIELDS if name != 'comments_count']
+
+
+class ApiError(Exception):
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def _json(data, status=200):
+    return HttpResponse(
+        json.dumps(data, ensure_ascii=False, separators=(',', ':')),
+        content_type='application/json', status=status)
+
+
+def api_view(view):
+    """Ошибки представления API отдаются JSON, а не HTML-страницей."""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        try:
+            return view(request, *args, **kwargs)
+        except Http404:
+            return _json({'error': 'не найдено'}, status=404)
+        except ApiError as error:
+            return _json({'error': str(error)}, status=error.status)
+    return wrapper
+
+
+def _selected(request, available, param='fields', default=None):
+    """Поля из ?fields= (или другого param), иначе default или все."""
+    requested = request.GET.get(param)
+    if not requested:
+        return list(default or available)
+    names = [name for name in requested.split(',') if name]
+    unknown = sorted(set(names) - set(available))
+    if unknown:
+        raise ApiError(f'неизвестные поля: {", ".join(unknown)}')
+    return names
+
+
+def _serializer(names, available):
+    """Функция, которая превращает строку values() в объект ответа."""
+    columns = [(name, available[name]) for name in names]
+
+    def serialize(row):
+        item = {}
+        for name, column in columns:
+            value = row[column]
+            if name == 'image':
+                value = settings.MEDIA_URL + value if value else None
+            elif hasattr(value, 'isoformat'):
+                value = value.isoformat()
+            item[name] = value
+        return item
+    return serialize
+
+
+def _response(page, rows, serialize):
+    return {
+        'results': list(map(serialize, rows)),
+        'next': page.next_cursor,
+        'prev': page.prev_cursor,
+    }
+
+
+def _page(request, queryset, available, keys, param='cursor',
+          per_page=PAGE_COUNT, descending=True, fields_param='fields',
+          default=None):
+    names = _selected(request, available, fields_param, default)
+    # Ключи курсора выбираются всегда, даже если их нет в ?fields=.
+    columns = {available[name] for name in names} | set(keys)
+    rows = queryset.values(*columns)
+    page = CursorPaginator(rows, per_page, keys=keys,
+                           descending=descending).get_page(
+        request.GET.get(param))
+    return _response(page, page, _serializer(names, available))
+
+
+def _posts_page(request, posts):
+    return _page(request, posts, POST_FIELDS, ('pub_date', 'id'),
+                 default=LIST_FIELDS)
+
+
+def _list_generations(request):
+    """Поколения, которые меняют ленту помимо самих постов."""
+    names = ('groups', 'thumbnails')
+    if 'comments_count' in request.GET.get('fields', '').split(','):
+        names += ('comments',)
+    return names
+
+
+def _group_pk(slug):
+    return get_group(slug).pk
+
+
+@read_only
+@api_view
+@require_safe
+@condition(etag_func=lambda request: etag(
+    request, 'posts', *_list_generations(request)))
+def index(request):
+    return _json(_posts_page(request, Post.objects.all()))
+
+
+@read_only
+@api_view
+@require_safe
+@condition(etag_func=lambda request, slug: etag(
+    request, f'group:{_group_pk(slug)}', *_list_generations(request)))
+def group_posts(request, slug):
+    posts = Post.objects.filter(group_id=_group_pk(slug))
+    return _json(_posts_page(request, posts))
+
+
+def _author(header):
+    return {
+        'username': header['author'].username,
+        'full_name': header['full_name'],
+        'posts_count': header['posts_numbers'],
+        'followers_count': header['followers_count'],
+        'following_count': header['following_count'],
+    }
+
+
+def _profile_etag(request, username):
+    header = profile_header(username)
+    return etag(request, f'author:{header["author"].pk}',
+                *_list_generations(request), extra=_author(header).values())
+
+
+@read_only
+@api_view
+@require_safe
+@condition(etag_func=_profile_etag)
+def profile(request, username):
+    header = profile_header(username)
+    data = _posts_page(request, Post.objects.filter(
+        author_id=header['author'].pk))
+    data['author'] = _author(header)
+    return _json(data)
+
+
+@read_only
+@api_view
+@require_safe
+@condition(etag_func=lambda request, post_id: etag(
+    request, f'post:{post_id}', 'groups'))
+def post_detail(request, post_id):
+    names = _selected(request, POST_FIELDS)
+    row = get_object_or_404(
+        Post.objects.values(*{POST_FIELDS[name] for name in names}),
+        pk=post_id)
+    comments = _page(request, Comment.objects.filter(post_id=post_id),
+                     COMMENT_FIELDS, ('created', 'id'), param='comments',
+                     per_page=COMMENTS_PAGE_COUNT, descending=False,
+                     fields_param='comment_fields')
+    return _json({'post': _serializer(names, POST_FIELDS)(row),
+                  'comments': comments})
+
+
+def _follow_etag(request):
+    if not request.user.is_authenticated:
+        return None
+    user_id = request.user.pk
+    return etag(request, 'posts', *_list_generations(request),
+                f'follow:{user_id}', extra=[user_id])
+
+
+@read_only
+@api_view
+@require_safe
+@condition(etag_func=_follow_etag)
+def follow_index(request):
+    if not request.user.is_authenticated:
+        raise ApiError('нужна авторизация', status=401)
+    names = _selected(request, POST_FIELDS, default=LIST_FIELDS)
+    # Лента слита из входящих и постов авторов в режиме чтения, поэтому
+    # сначала выбирается страница записей, потом сами посты по pk.
+    entries = follow_feed(request.user).values('pub_date', 'post_id')
+    page = CursorPaginator(entries, PAGE_COUNT,
+                           keys=('pub_date', 'post_id')).get_page(
+        request.GET.get('cursor'))
+    columns = {POST_FIELDS[name] for name in names} | {'id'}
+    posts = Post.objects.filter(
+        pk__in=[entry['post_id'] for entry in page]).order_by().values(
+        *columns)
+    found = {row['id']: row for row in posts}
+    rows = [found[entry['post_id']] for entry in page
+            if entry['post_id'] in found]
+    return _json(_response(page, rows, _serializer(names, POST_FIELDS)))
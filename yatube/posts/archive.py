@@ -0,0 +1,251 @@
+"""
+Выгрузка и загрузка контента потоком записей.
+
+Запись — словарь с полем model (user, group, post, comment, follow) и
+полями модели; пользователи выгружаются с хэшами паролей и правами,
+так что архив нужно хранить как базу. Связи хранятся первичными
+ключами, которые при загрузке сохраняются, так что адреса постов не
+меняются. JSONL — одна запись на строку в одном файле, CSV — по файлу
+на модель в каталоге. Чтение и запись идут генераторами, память не
+зависит от объёма.
+
+load() вставляет записи подготовленным запросом пачками по batch_size
+в транзакциях по chunk_size записей и после каждой транзакции отдаёт
+число загруженных записей для контрольной точки. Даты берутся из
+архива, сигналы не отправляются, поэтому ленты, счётчики и поисковый
+индекс строятся один раз в конце — rebuild_derived().
+"""
+import csv
+import itertools
+import json
+import os
+from contextlib import contextmanager
+from datetime import datetime
+
+from django.core.cache import cache
+from django.core.management.color import no_style
+from django.db import connection, connections, router, transaction
+
+from . import counters, feed
+from .models import Comment, Follow, Group, Post, User
+from .search import rebuild_index
+
+BATCH_SIZE = 1000
+CHUNK_SIZE = 50000
+
+# Порядок важен: модель идёт после тех, на которые ссылается.
+MODELS = {
+    'user': (User, ('id', 'username', 'password', 'email', 'first_name',
+                    'last_name', 'is_active', 'is_staff', 'is_superuser',
+                    'date_joined', 'last_login')),
+    'group': (Group, ('id', 'title', 'slug', 'description')),
+    'post': (Post, ('id', 'text', 'pub_date', 'created', 'author_id',
+                    'group_id', 'image')),
+    'comment': (Comment, ('id', 'post_id', 'author_id', 'text', 'created')),
+    'follow': (Follow, ('id', 'user_id', 'author_id')),
+}
+
+
+def export_records(batch_size=BATCH_SIZE):
+    """Все записи по моделям, каждая модель по возрастанию pk."""
+    for name, (model, fields) in MODELS.items():
+        rows = model.objects.order_by('pk').values_list(*fields)
+        for row in rows.iterator(chunk_size=batch_size):
+            yield dict(zip(fields, row), model=name)
+
+
+def _json_default(value):
+    # DjangoJSONEncoder отрезает микросекунды, даты нужны точные.
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f'{type(value).__name__} не сериализуется в JSON')
+
+
+def write_jsonl(records, stream):
+    count = 0
+    for record in records:
+        stream.write(json.dumps(record, default=_json_default,
+                                ensure_ascii=False) + '\n')
+        count += 1
+    return count
+
+
+def read_jsonl(stream):
+    for line in stream:
+        if line.strip():
+            yield json.loads(line)
+
+
+def write_csv(records, directory):
+    """Пишет записи в <directory>/<model>.csv."""
+    os.makedirs(directory, exist_ok=True)
+    count = 0
+    for name, group in itertools.groupby(records, lambda r: r['model']):
+        fields = MODELS[name][1]
+        path = os.path.join(directory, f'{name}.csv')
+        with open(path, 'w', newline='', encoding='utf-8') as csv_file:
+            writer = csv.DictWriter(csv_file, fields, extrasaction='ignore')
+            writer.writeheader()
+            for record in group:
+                writer.writerow(record)
+                count += 1
+    return count
+
+
+def read_csv(directory):
+    for name in MODELS:
+        path = os.path.join(directory, f'{name}.csv')
+        if not os.path.exists(path):
+            continue
+        with open(path, newline='', encoding='utf-8') as csv_file:
+            for record in csv.DictReader(csv_file):
+                record['model'] = name
+                yield record
+
+
+INTEGER_TYPES = {
+    'AutoField', 'BigAutoField', 'IntegerField', 'BigIntegerField',
+    'SmallIntegerField', 'PositiveIntegerField',
+    'PositiveSmallIntegerField',
+}
+TEXT_TYPES = {'CharField', 'TextField', 'SlugField', 'FileField',
+              'ImageField'}
+
+
+def _converter(field, db):
+    """
+    Функция, которая приводит значение из архива к параметру запроса.
+
+    Для целых, строк и дат — короткий путь без to_python() и
+    get_db_prep_save() на каждое значение, остальное — как в save().
+    """
+    target = field.target_field if field.is_relation else field
+    internal = target.get_internal_type()
+    if internal in INTEGER_TYPES:
+        return lambda value: None if value in (None, '') else int(value)
+    if internal in TEXT_TYPES and not field.null:
+        return str
+    if internal == 'DateTimeField':
+        adapt = db.ops.adapt_datetimefield_value
+        return lambda value: (None if value in (None, '')
+                              else adapt(datetime.fromisoformat(value)))
+
+    def convert(value):
+        # В CSV пустая строка — это и NULL, и пустой текст.
+        if value == '' and field.null:
+            value = None
+        return field.get_db_prep_save(field.to_python(value), db)
+    return convert
+
+
+def _inserter(name):
+    """
+    SQL вставки модели name и функция, которая готовит из записи строку.
+
+    Ни объектов моделей, ни компиляции запроса на каждую пачку: на
+    объёмах архива это основная стоимость bulk_create.
+    """
+    model, exported = MODELS[name]
+    db = connections[router.db_for_write(model)]
+    ops = db.ops
+    fields = model._meta.concrete_fields
+    columns = ', '.join(ops.quote_name(field.column) for field in fields)
+    placeholders = ', '.join(['%s'] * len(fields))
+    sql = (
+        f'{ops.insert_statement(ignore_conflicts=True)} '
+        f'{ops.quote_name(model._meta.db_table)} ({columns}) '
+        f'VALUES ({placeholders}) '
+        f'{ops.ignore_conflicts_suffix_sql(ignore_conflicts=True)}'
+    )
+    defaults = {
+        field.attname: field.get_db_prep_save(field.get_default(), db)
+        for field in fields if field.attname not in exported
+    }
+    columns = [
+        (field.attname, defaults[field.attname], None)
+        if field.attname in defaults
+        else (field.attname, None, _converter(field, db))
+        for field in fields
+    ]
+
+    def row(record):
+        return [value if convert is None else convert(record.get(attname))
+                for attname, value, convert in columns]
+    return db, sql, row
+
+
+def _batches(iterable, size):
+    iterator = iter(iterable)
+    batch = list(itertools.islice(iterator, size))
+    while batch:
+        yield batch
+        batch = list(itertools.islice(iterator, size))
+
+
+def load(records, start=0, batch_size=BATCH_SIZE, chunk_size=CHUNK_SIZE):
+    """
+    Загружает записи, начиная с номера start.
+
+    Генератор: после каждой транзакции отдаёт число загруженных
+    записей с начала потока. Уже существующие строки пропускаются,
+    поэтому повтор после сбоя безопасен.
+    """
+    records = itertools.islice(records, start, None)
+    inserters = {name: _inserter(name) for name in MODELS}
+    using = router.db_for_write(Post)
+    done = start
+    for chunk in _batches(records, chunk_size):
+        with transaction.atomic(using=using):
+            for name, group in itertools.groupby(
+                    chunk, lambda r: r['model']):
+                db, sql, row = inserters[name]
+                with db.cursor() as cursor:
+                    for batch in _batches(map(row, group), batch_size):
+                        cursor.executemany(sql, batch)
+        done += len(chunk)
+        yield done
+
+
+def _existing_indexes(model):
+    with connection.cursor() as cursor:
+        return set(connection.introspection.get_constraints(
+            cursor, model._meta.db_table))
+
+
+@contextmanager
+def deferred_indexes():
+    """
+    Составные индексы Meta.indexes на время загрузки снимаются.
+
+    Индекс, построенный один раз по готовой таблице, обходится
+    дешевле, чем обновление на каждой вставке. Снятие и создание
+    идемпотентны: загрузка, прерванная после снятия индексов, при
+    повторном запуске проходит и возвращает их.
+    """
+    models = [model for model, _ in MODELS.values()]
+    with connection.schema_editor() as editor:
+        for model in models:
+            for index in model._meta.indexes:
+                editor.execute(
+                    f'DROP INDEX IF EXISTS {editor.quote_name(index.name)}')
+    try:
+        yield
+    finally:
+        with connection.schema_editor() as editor:
+            for model in models:
+                existing = _existing_indexes(model)
+                for index in model._meta.indexes:
+                    if index.name not in existing:
+                        editor.add_index(model, index)
+
+
+def rebuild_derived():
+    """Ленты, счётчики, поиск и кэш после загрузки в обход сигналов."""
+    models = [model for model, _ in MODELS.values()]
+    with connection.cursor() as db:
+        for sql in connection.ops.sequence_reset_sql(no_style(), models):
+            db.execute(sql)
+    feed.fill()
+    counters.recount()
+    rebuild_index()
+    cache.clear()
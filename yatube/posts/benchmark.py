@@ -0,0 +1,319 @@
+"""
+Нагрузочный прогон представлений posts.
+
+seed() наполняет базу объёмом, близким к боевому: авторы, посты и
+комментарии распределены по степенному закону, граф подписок тоже.
+measure() прогоняет представления через тестовый клиент и считает
+число SQL-запросов, медиану и 99-й перцентиль времени ответа и пик
+памяти. compare() сверяет число запросов с сохранённым baseline.
+comment_throughput() и db_throughput() меряют работу конкурентных
+потоков с базой в файле, которую создаёт file_database().
+"""
+import functools
+import gc
+import itertools
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import (DatabaseError, connection, reset_queries,
+                       transaction)
+from django.test import Client
+from django.test.utils import (CaptureQueriesContext,
+                               setup_test_environment,
+                               teardown_test_environment)
+from django.urls import reverse
+from faker import Faker
+
+from . import counters, feed, ingest
+from .models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+BATCH_SIZE = 5000
+# Столько разных текстов генерирует Faker, дальше они переиспользуются.
+TEXT_POOL = 1000
+
+
+def _power_law(count, alpha=1.2):
+    """Выборка из range(count), в которой первые номера выпадают чаще."""
+    cum_weights = list(itertools.accumulate(
+        1 / (rank + 1) ** alpha for rank in range(count)))
+    population = range(count)
+
+    def sample(size):
+        return random.choices(population, cum_weights=cum_weights, k=size)
+    return sample
+
+
+def _bulk(model, objects):
+    """Записывает объекты из генератора пачками по BATCH_SIZE."""
+    objects = iter(objects)
+    while True:
+        batch = list(itertools.islice(objects, BATCH_SIZE))
+        if not batch:
+            break
+        model.objects.bulk_create(batch)
+
+
+def _draw(sample, size):
+    """Номера из sample() по одному, выбираются пачками."""
+    for start in range(0, size, BATCH_SIZE):
+        yield from sample(min(BATCH_SIZE, size - start))
+
+
+def seed(users, posts, comments, groups=20, follows=10, seed_value=0):
+    """
+    Наполняет пустую базу и возвращает первого пользователя.
+
+    Объекты создаются генераторами и пишутся пачками, поэтому память
+    не растёт с объёмом; в памяти держатся только списки pk.
+    """
+    random.seed(seed_value)
+    fake = Faker('ru_RU')
+    fake.seed_instance(seed_value)
+    texts = [fake.paragraph() for _ in range(TEXT_POOL)]
+    with transaction.atomic():
+        _bulk(User, (User(username=f'user{i}') for i in range(users)))
+        user_ids = list(User.objects.order_by('pk').values_list(
+            'pk', flat=True))
+        _bulk(Group, (
+            Group(title=fake.word(), slug=f'group{i}',
+                  description=fake.sentence())
+            for i in range(groups)
+        ))
+        group_ids = list(Group.objects.values_list('pk', flat=True))
+        popular_users = _power_law(users)
+        _bulk(Post, (
+            Post(text=random.choice(texts), author_id=user_ids[author],
+                 group_id=random.choice(group_ids + [None]))
+            for author in _draw(popular_users, posts)
+        ))
+        post_ids = list(Post.objects.order_by('-pk').values_list(
+            'pk', flat=True))
+        _bulk(Comment, (
+            Comment(text=random.choice(texts), post_id=post_ids[post],
+                    author_id=random.choice(user_ids))
+            for post in _draw(_power_law(len(post_ids)), comments)
+        ))
+        _bulk(Follow, (
+            Follow(user_id=user_ids[user], author_id=user_ids[author])
+            for user in range(users)
+            for author in set(popular_users(follows))
+            if author != user
+        ))
+        feed.fill()
+        counters.recount()
+    return User.objects.get(pk=user_ids[0])
+
+
+def scenarios(user):
+    """Запросы для каждого представления: (имя, метод, url, данные)."""
+    post = Post.objects.filter(author=user).first() or Post.objects.first()
+    group = Group.objects.first()
+    return [
+        ('index', 'get', reverse('posts:index'), None),
+        ('group_posts', 'get',
+         reverse('posts:group_list', args=[group.slug]), None),
+        ('profile', 'get',
+         reverse('posts:profile', args=[user.username]), None),
+        ('post_detail', 'get',
+         reverse('posts:post_detail', args=[post.pk]), None),
+        ('follow_index', 'get', reverse('posts:follow_index'), None),
+        ('post_create', 'post', reverse('posts:post_create'),
+         {'text': 'Новый пост'}),
+        ('add_comment', 'post',
+         reverse('posts:add_comment', args=[post.pk]),
+         {'text': 'Новый комментарий'}),
+    ]
+
+
+def _percentile(values, percent):
+    values = sorted(values)
+    index = min(len(values) - 1, round(percent / 100 * (len(values) - 1)))
+    return values[index]
+
+
+def measure(user, repeat=20, warm=False):
+    """
+    Прогоняет представления и возвращает метрики по каждому.
+
+    Без warm кэш очищается перед каждым запросом, чтобы мерить
+    работу с базой, а не попадание во фрагментный кэш.
+    """
+    client = Client()
+    client.force_login(user)
+    results = {}
+    for name, method, url, data in scenarios(user):
+        send = getattr(client, method)
+        send(url, data)
+        gc.collect()
+        timings = []
+        for _ in range(repeat):
+            if not warm:
+                cache.clear()
+            reset_queries()
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                send(url, data)
+                timings.append(time.perf_counter() - started)
+            query_count = len(queries)
+        if not warm:
+            cache.clear()
+        tracemalloc.start()
+        send(url, data)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        results[name] = {
+            'queries': query_count,
+            'p50_ms': round(_percentile(timings, 50) * 1000, 2),
+            'p99_ms': round(_percentile(timings, 99) * 1000, 2),
+            'peak_kb': round(peak / 1024, 1),
+        }
+    return results
+
+
+def compare(results, baseline):
+    """
+    Регрессии относительно baseline: число запросов не должно расти.
+
+    Время и память зависят от машины, поэтому только выводятся.
+    """
+    regressions = []
+    for name, metrics in results.items():
+        expected = baseline.get(name)
+        if expected is None:
+            continue
+        if metrics['queries'] > expected['queries']:
+            regressions.append(
+                f'{name}: запросов {metrics["queries"]}, '
+                f'было {expected["queries"]}'
+            )
+    return regressions
+
+
+def comment_throughput(post, users, per_writer, batched=True):
+    """
+    Комментариев в секунду, которые записывают len(users) потоков.
+
+    Каждый поток работает со своим соединением, как отдельный запрос;
+    batched выбирает запись через ingest вместо save() по одному.
+    """
+    errors = []
+
+    def write(user):
+        try:
+            for i in range(per_writer):
+                comment = Comment(post=post, author=user,
+                                  text=f'Комментарий {i}')
+                if batched:
+                    ingest.submit(comment)
+                else:
+                    comment.save()
+        except Exception as error:
+            errors.append(error)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=write, args=(user,))
+               for user in users]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    if errors:
+        raise errors[0]
+    return round(len(users) * per_writer / elapsed, 1)
+
+
+@contextmanager
+def file_database():
+    """
+    Тестовая база для конкурентных прогонов.
+
+    Базу SQLite в памяти потоки делят через shared cache с блокировками
+    таблиц, поэтому она создаётся во временном файле, как в бою.
+    """
+    setup_test_environment()
+    old_name = connection.settings_dict['NAME']
+    test_settings = connection.settings_dict.setdefault('TEST', {})
+    old_test_name = test_settings.get('NAME')
+    directory = None
+    if connection.vendor == 'sqlite':
+        directory = tempfile.mkdtemp()
+        test_settings['NAME'] = os.path.join(directory, 'bench.sqlite3')
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        test_settings['NAME'] = old_test_name
+        teardown_test_environment()
+        if directory:
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+def _read():
+    list(Post.objects.select_related('author', 'group')[:10])
+
+
+def _write(user):
+    Post.objects.create(text='Новый пост', author=user)
+
+
+def _worker(kind, action, stop, totals, lock):
+    """Повторяет action до stop и добавляет успехи и ошибки в totals."""
+    done = errors = 0
+    try:
+        while not stop.is_set():
+            try:
+                action()
+                done += 1
+            except DatabaseError:
+                errors += 1
+    finally:
+        connection.close()
+    with lock:
+        totals[kind] += done
+        totals['errors'] += errors
+
+
+def db_throughput(users, readers, writers, seconds=3.0):
+    """
+    Чтений и записей в секунду и число ошибок блокировки.
+
+    Читатели выбирают страницу главной ленты, писатели публикуют посты;
+    все потоки работают seconds секунд, каждый со своим соединением.
+    """
+    stop = threading.Event()
+    totals = {'reads': 0, 'writes': 0, 'errors': 0}
+    lock = threading.Lock()
+    actions = [('reads', _read)] * readers + [
+        ('writes', functools.partial(_write, user))
+        for user in itertools.islice(itertools.cycle(users), writers)
+    ]
+    threads = [
+        threading.Thread(target=_worker,
+                         args=(kind, action, stop, totals, lock))
+        for kind, action in actions
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return {
+        'reads': round(totals['reads'] / seconds, 1),
+        'writes': round(totals['writes'] / seconds, 1),
+        'errors': totals['errors'],
+    }
@@ -0,0 +1,117 @@
+import hashlib
+import time
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.cache import cache
+
+from core.routers import replica_timeout
+
+GENERATION_PREFIX = 'gen:'
+
+
+def _fresh():
+    # Начальное значение от времени: если счётчик вытеснен из кэша,
+    # новый не совпадёт ни с одним старым ключом фрагмента.
+    return int(time.time() * 1000)
+
+
+def generations(*names):
+    """Текущие поколения ленты, недостающие создаются."""
+    keys = [GENERATION_PREFIX + name for name in names]
+    found = cache.get_many(keys)
+    for key in keys:
+        if key not in found:
+            cache.add(key, _fresh(), None)
+            found[key] = cache.get(key)
+    return [found[key] for key in keys]
+
+
+def bump(*names):
+    """
+    Сдвигает поколения: все закэшированные фрагменты с ними устаревают.
+
+    Поколение сдвигается не на единицу, а до текущего времени в
+    миллисекундах, поэтому оно же — время последнего изменения.
+    """
+    now = _fresh()
+    for name in names:
+        key = GENERATION_PREFIX + name
+        current = cache.get(key)
+        try:
+            # incr, а не set: одновременные сдвиги не теряются.
+            cache.incr(key, max(1, now - (current or now)))
+        except ValueError:
+            cache.set(key, now, None)
+
+
+def bump_post(post):
+    """Сдвигает поколения всех лент и страниц, где виден пост."""
+    bump('posts', f'author:{post.author_id}', f'post:{post.pk}')
+    if post.group_id is not None:
+        bump(f'group:{post.group_id}')
+
+
+def etag(request, *names, extra=()):
+    """ETag ответа по адресу запроса, поколениям names и extra."""
+    return _digest(request, generations(*names), extra)
+
+
+def _digest(request, values, extra):
+    parts = [request.get_full_path(), *map(str, values), *map(str, extra)]
+    return hashlib.md5('|'.join(parts).encode()).hexdigest()
+
+
+def page_validators(request, *names, extra=()):
+    """
+    ETag и Last-Modified HTML-страницы для core.http_cache.
+
+    Вошедшему страница показывает его имя и подписки, поэтому в ETag
+    входят его pk и поколение подписок. Last-Modified — самый поздний
+    сдвиг поколений: в отличие от pub_date он учитывает и правки, и
+    удаления.
+    """
+    user_id = request.user.pk
+    if user_id is not None:
+        names += (f'follow:{user_id}',)
+        extra = (*extra, user_id)
+    values = generations(*names)
+    changed = min(max(values), _fresh()) / 1000
+    return (_digest(request, values, extra),
+            datetime.fromtimestamp(changed, timezone.utc))
+
+
+def post_author(post_id):
+    """pk автора поста, если его запомнил remember_post_author()."""
+    return cache.get(f'post:author:{post_id}')
+
+
+def remember_post_author(post):
+    # Автор поста не меняется, хранить можно сколько угодно.
+    cache.set(f'post:author:{post.pk}', post.author_id, None)
+
+
+def page_marker(page_obj):
+    if page_obj is None:
+        return 'all'
+    if getattr(page_obj, 'cursor_mode', False):
+        first = page_obj.object_list[0].pk if page_obj.object_list else 0
+        return f'c{first}'
+    return f'p{page_obj.number}'
+
+
+def feed_cache(request, feed, page_obj, *names):
+    """
+    Контекст для {% cache %} ленты.
+
+    Ключ фрагмента складывается из имени ленты, страницы, того, что
+    видит посетитель, и поколений, которые сдвигают сигналы posts.
+    """
+    parts = [feed, page_marker(page_obj),
+             'a' if request.user.is_authenticated else 'g']
+    parts.extend(str(value) for value in generations(*names))
+    return {
+        'cache_key': ':'.join(parts),
+        'cache_timeout': replica_timeout(
+            getattr(settings, 'FEED_CACHE_TIMEOUT', 60 * 60)),
+    }
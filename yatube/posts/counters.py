@@ -0,0 +1,195 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, connection
+from django.db.models import (Count, F, IntegerField, OuterRef,
+                              Subquery)
+from django.db.models.functions import Coalesce
+
+from .models import AuthorStats, Comment, Group, Post
+
+
+def author_posts_count(author):
+    """Число постов автора из счётчика, без запроса при select_related."""
+    try:
+        return author.post_stats.posts_count
+    except AuthorStats.DoesNotExist:
+        return 0
+
+
+def count_timeout():
+    return getattr(settings, 'FEED_COUNT_TIMEOUT', 60 * 5)
+
+
+def cached_count(key, queryset, refresh=False):
+    """COUNT(*) ленты, который повторяется не чаще FEED_COUNT_TIMEOUT."""
+    count = None if refresh else cache.get(f'count:{key}')
+    if count is None:
+        count = queryset.count()
+        cache.set(f'count:{key}', count, count_timeout())
+    return count
+
+
+def change_cached_count(key, delta):
+    """Сдвигает закэшированный счётчик; если его нет, он посчитается заново."""
+    try:
+        cache.incr(f'count:{key}', delta)
+    except ValueError:
+        pass
+
+
+def estimated_count(model):
+    """
+    Число строк таблицы по статистике базы или None.
+
+    PostgreSQL хранит оценку в pg_class.reltuples, SQLite — в
+    sqlite_stat1 после ANALYZE.
+    """
+    table = model._meta.db_table
+    if connection.vendor == 'postgresql':
+        sql = 'SELECT reltuples::bigint FROM pg_class WHERE relname = %s'
+    elif connection.vendor == 'sqlite':
+        # Первое число в stat — строки таблицы.
+        sql = 'SELECT CAST(stat AS INTEGER) FROM sqlite_stat1 WHERE tbl = %s'
+    else:
+        return None
+    with connection.cursor() as db:
+        try:
+            db.execute(sql, [table])
+        except DatabaseError:
+            return None
+        row = db.fetchone()
+    if row is None or row[0] is None or row[0] < 0:
+        return None
+    return row[0]
+
+
+def posts_total(refresh=False):
+    """Число постов для навигации главной ленты."""
+    if getattr(settings, 'FEED_COUNT_ESTIMATE', False) and not refresh:
+        count = estimated_count(Post)
+        if count is not None:
+            return count
+    return cached_count('posts', Post.objects.all(), refresh)
+
+
+def change_posts_total(delta):
+    change_cached_count('posts', delta)
+
+
+def change_author_posts(author_id, delta):
+    updated = AuthorStats.objects.filter(user_id=author_id).update(
+        posts_count=F('posts_count') + delta
+    )
+    if not updated and delta > 0:
+        stats, created = AuthorStats.objects.get_or_create(
+            user_id=author_id, defaults={'posts_count': delta}
+        )
+        if not created:
+            change_author_posts(author_id, delta)
+
+
+def group_posts_count(group_id):
+    """Число постов группы из счётчика Group.posts_count через кэш."""
+    count = cache.get(f'count:group:{group_id}')
+    if count is None:
+        count = Group.objects.filter(pk=group_id).values_list(
+            'posts_count', flat=True).first() or 0
+        cache.set(f'count:group:{group_id}', count, count_timeout())
+    return count
+
+
+def change_group_posts(group_id, delta):
+    if group_id is not None:
+        Group.objects.filter(pk=group_id).update(
+            posts_count=F('posts_count') + delta
+        )
+        change_cached_count(f'group:{group_id}', delta)
+
+
+def change_post_comments(post_id, delta):
+    Post.objects.filter(pk=post_id).update(
+        comments_count=F('comments_count') + delta
+    )
+
+
+def _author_mismatches():
+    actual = dict(
+        Post.objects.order_by().values_list('author').annotate(Count('pk'))
+    )
+    stored = dict(AuthorStats.objects.values_list('user', 'posts_count'))
+    for user_id in set(actual) | set(stored):
+        if actual.get(user_id, 0) != stored.get(user_id, 0):
+            yield user_id, stored.get(user_id, 0), actual.get(user_id, 0)
+
+
+def _fix_author(user_id, value):
+    AuthorStats.objects.update_or_create(
+        user_id=user_id, defaults={'posts_count': value}
+    )
+
+
+def _counted_mismatches(model, field, related):
+    rows = model.objects.annotate(
+        actual=Count(related)
+    ).exclude(**{field: F('actual')}).values_list('pk', field, 'actual')
+    return rows.iterator()
+
+
+def _fix_counted(model, field):
+    def fix(pk, value):
+        model.objects.filter(pk=pk).update(**{field: value})
+    return fix
+
+
+COUNTERS = {
+    'author.posts_count': (_author_mismatches, _fix_author),
+    'group.posts_count': (
+        lambda: _counted_mismatches(Group, 'posts_count', 'post_group'),
+        _fix_counted(Group, 'posts_count'),
+    ),
+    'post.comments_count': (
+        lambda: _counted_mismatches(Post, 'comments_count', 'comments'),
+        _fix_counted(Post, 'comments_count'),
+    ),
+}
+
+
+def rebuild(fix=True):
+    """
+    Сверяет счётчики с фактическими данными.
+
+    Возвращает список расхождений (счётчик, pk, было, стало);
+    при fix=True расхождения сразу исправляются.
+    """
+    mismatches = []
+    for name, (find, repair) in COUNTERS.items():
+        for pk, stored, actual in list(find()):
+            mismatches.append((name, pk, stored, actual))
+            if fix:
+                repair(pk, actual)
+    return mismatches
+
+
+def _count_of(model, field):
+    rows = model.objects.filter(**{field: OuterRef('pk')}).order_by()
+    return Coalesce(Subquery(
+        rows.values(field).annotate(count=Count('pk')).values('count'),
+        output_field=IntegerField()), 0)
+
+
+def recount():
+    """
+    Все счётчики заново несколькими запросами по таблицам целиком.
+
+    Для массовой загрузки, где счётчики не велись: rebuild() исправлял
+    бы каждое расхождение отдельным запросом.
+    """
+    Post.objects.update(comments_count=_count_of(Comment, 'post'))
+    Group.objects.update(posts_count=_count_of(Post, 'group'))
+    AuthorStats.objects.all().delete()
+    rows = Post.objects.order_by().values_list('author').annotate(
+        count=Count('pk'))
+    AuthorStats.objects.bulk_create(
+        (AuthorStats(user_id=author_id, posts_count=count)
+         for author_id, count in rows.iterator())
+    )
@@ -0,0 +1,248 @@
+import heapq
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, F
+
+from .cache import generations
+from .counters import cached_count
+from .models import FeedEntry, Follow, Post
+
+BATCH_SIZE = 500
+
+
+def fanout_max_followers():
+    return getattr(settings, 'FEED_FANOUT_MAX_FOLLOWERS', 1000)
+
+
+def fanout_restore_followers():
+    # Порог ниже FEED_FANOUT_MAX_FOLLOWERS: автор на границе не
+    # переключается туда и обратно с каждой подпиской.
+    return getattr(settings, 'FEED_FANOUT_RESTORE_FOLLOWERS',
+                   fanout_max_followers() // 2)
+
+
+def backfill_limit():
+    return getattr(settings, 'FEED_BACKFILL_LIMIT', 200)
+
+
+def _entries(user_ids, post):
+    return [
+        FeedEntry(user_id=user_id, post_id=post.pk,
+                  author_id=post.author_id, pub_date=post.pub_date)
+        for user_id in user_ids
+    ]
+
+
+def fan_out_post(post):
+    """
+    Раскладывает новый пост по лентам подписчиков автора.
+
+    Если подписчиков больше FEED_FANOUT_MAX_FOLLOWERS, автор переводится
+    в режим чтения: его посты подмешиваются в ленту при запросе.
+    """
+    follows = Follow.objects.filter(author_id=post.author_id)
+    if follows.count() > fanout_max_followers():
+        follows.filter(fanout=True).update(fanout=False)
+        return
+    user_ids = list(
+        follows.filter(fanout=True).values_list('user_id', flat=True)
+    )
+    for start in range(0, len(user_ids), BATCH_SIZE):
+        FeedEntry.objects.bulk_create(
+            _entries(user_ids[start:start + BATCH_SIZE], post),
+            ignore_conflicts=True
+        )
+
+
+def backfill(follow):
+    """Заполняет ленту последними постами автора после подписки."""
+    if not follow.fanout:
+        return
+    if Follow.objects.filter(
+            author_id=follow.author_id).count() > fanout_max_followers():
+        Follow.objects.filter(pk=follow.pk).update(fanout=False)
+        follow.fanout = False
+        return
+    posts = Post.objects.filter(author_id=follow.author_id).only(
+        'pk', 'author_id', 'pub_date')[:backfill_limit()]
+    FeedEntry.objects.bulk_create(
+        [_entries([follow.user_id], post)[0] for post in posts],
+        batch_size=BATCH_SIZE,
+        ignore_conflicts=True
+    )
+
+
+def fill():
+    """
+    Ленты в том виде, в каком их оставила бы раскладка при записи.
+
+    Для массовой загрузки, где сигналы не срабатывают: подписки на
+    авторов с числом подписчиков больше порога переводятся в режим
+    чтения, остальные возвращаются к раскладке и получают недостающие
+    посты автора одним запросом.
+    """
+    popular = Follow.objects.values('author').annotate(
+        followers=Count('pk')).filter(
+        followers__gt=fanout_max_followers()).values('author')
+    Follow.objects.filter(author__in=popular).update(fanout=False)
+    Follow.objects.exclude(author__in=popular).filter(
+        fanout=False).update(fanout=True)
+    table = FeedEntry._meta.db_table
+    with connection.cursor() as db:
+        db.execute(
+            f'INSERT INTO {table} (user_id, post_id, author_id, pub_date) '
+            'SELECT f.user_id, p.id, p.author_id, p.pub_date '
+            f'FROM {Follow._meta.db_table} f '
+            f'JOIN {Post._meta.db_table} p ON p.author_id = f.author_id '
+            f'WHERE f.fanout = %s AND NOT EXISTS (SELECT 1 FROM {table} e '
+            'WHERE e.user_id = f.user_id AND e.post_id = p.id)',
+            [True]
+        )
+
+
+def drop(follow):
+    """Убирает посты автора из ленты отписавшегося пользователя."""
+    FeedEntry.objects.filter(
+        user_id=follow.user_id, author_id=follow.author_id
+    ).delete()
+    restore_fanout(follow.author_id)
+
+
+def restore_fanout(author_id):
+    """
+    Возвращает автора из режима чтения к раскладке, когда подписчиков
+    стало не больше FEED_FANOUT_RESTORE_FOLLOWERS.
+
+    Ленты подписчиков получают его последние FEED_BACKFILL_LIMIT постов
+    одним запросом, как после подписки.
+    """
+    follows = Follow.objects.filter(author_id=author_id)
+    if not follows.filter(fanout=False).exists():
+        return
+    if follows.count() > fanout_restore_followers():
+        return
+    table = FeedEntry._meta.db_table
+    with transaction.atomic():
+        with connection.cursor() as db:
+            db.execute(
+                f'INSERT INTO {table} '
+                '(user_id, post_id, author_id, pub_date) '
+                'SELECT f.user_id, p.id, p.author_id, p.pub_date '
+                f'FROM {Follow._meta.db_table} f JOIN ('
+                f'SELECT id, author_id, pub_date FROM {Post._meta.db_table} '
+                'WHERE author_id = %s ORDER BY pub_date DESC LIMIT %s'
+                ') p ON p.author_id = f.author_id '
+                'WHERE f.author_id = %s AND f.fanout = %s '
+                f'AND NOT EXISTS (SELECT 1 FROM {table} e '
+                'WHERE e.user_id = f.user_id AND e.post_id = p.id)',
+                [author_id, backfill_limit(), author_id, False]
+            )
+        follows.filter(fanout=False).update(fanout=True)
+
+
+class MergedFeed:
+    """
+    Лента, слитая из нескольких упорядоченных источников.
+
+    Повторяет ту часть API queryset, которой пользуются пагинаторы:
+    order_by, filter, reverse и values применяются к каждому источнику,
+    а срез [start:stop] берёт из каждого не больше stop строк по его
+    индексу и сливает их в порядке ленты. Ключи сортировки идут в одном
+    направлении.
+    """
+
+    ordered = True
+
+    def __init__(self, sources, ordering=()):
+        self.sources = sources
+        self.ordering = tuple(ordering)
+
+    def _chain(self, method, *args, **kwargs):
+        return MergedFeed(
+            [getattr(source, method)(*args, **kwargs)
+             for source in self.sources],
+            self.ordering)
+
+    def order_by(self, *ordering):
+        feed = self._chain('order_by', *ordering)
+        feed.ordering = ordering
+        return feed
+
+    def reverse(self):
+        feed = self._chain('reverse')
+        feed.ordering = tuple(
+            key[1:] if key.startswith('-') else '-' + key
+            for key in self.ordering)
+        return feed
+
+    def filter(self, *args, **kwargs):
+        return self._chain('filter', *args, **kwargs)
+
+    def values(self, *fields):
+        return self._chain('values', *fields)
+
+    def count(self):
+        return sum(source.count() for source in self.sources)
+
+    def _key(self, row):
+        names = [key.lstrip('-') for key in self.ordering]
+        if isinstance(row, dict):
+            return tuple(row[name] for name in names)
+        return tuple(getattr(row, name) for name in names)
+
+    def __getitem__(self, item):
+        if not isinstance(item, slice):
+            return self[item:item + 1][0]
+        descending = bool(self.ordering) and self.ordering[0][0] == '-'
+        rows = heapq.merge(
+            *(source[:item.stop] for source in self.sources),
+            key=self._key, reverse=descending)
+        return list(rows)[item.start:item.stop]
+
+    def __iter__(self):
+        return iter(self[:None])
+
+
+def follow_feed(user):
+    """
+    Записи ленты подписок от новых к старым.
+
+    Входящие читаются одним проходом по индексу (user, -pub_date), посты
+    авторов в режиме чтения — отдельным ограниченным запросом на автора
+    по индексу (author, -pub_date, -id). На чтении ничего не пишется.
+    """
+    read_mode = list(Follow.objects.filter(user=user, fanout=False)
+                     .values_list('author_id', flat=True))
+    # Записи, разложенные до перехода автора в режим чтения, читаются
+    # вместе с его постами, поэтому во входящих пропускаются.
+    inbox = FeedEntry.objects.filter(user=user)
+    if read_mode:
+        inbox = inbox.exclude(author_id__in=read_mode)
+    sources = [inbox] + [
+        Post.objects.filter(author_id=author_id).annotate(
+            post_id=F('pk')).only('pk', 'author_id', 'pub_date')
+        for author_id in read_mode
+    ]
+    return MergedFeed(sources).order_by('-pub_date', '-post_id')
+
+
+def follow_feed_count(user, feed):
+    """
+    Число записей ленты подписок для постраничной навигации.
+
+    Ключ меняется вместе с поколениями постов и подписок пользователя,
+    как и закэшированная страница ленты.
+    """
+    posts, follows = generations('posts', f'follow:{user.pk}')
+    return cached_count(f'follow:{user.pk}:{posts}:{follows}', feed)
+
+
+def load_posts(page_obj):
+    """Подменяет записи ленты на странице самими постами."""
+    entries = list(page_obj.object_list)
+    posts = Post.objects.for_feed().in_bulk(
+        [entry.post_id for entry in entries])
+    page_obj.object_list = [posts[entry.post_id] for entry in entries
+                            if entry.post_id in posts]
+    return page_obj
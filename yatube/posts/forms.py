@@ -1,8 +1,50 @@
 from django import forms
+from django.conf import settings
+from django.template.defaultfilters import filesizeformat
+from PIL import Image
+from .groups import all_groups
 from .models import Post, Comment
+from .uploads import max_bytes
 
 
 class PostForm(forms.ModelForm):
+    def __init__(self, data=None, files=None, *args, **kwargs):
+        image = files.get('image') if files else None
+        self.image_too_large = getattr(image, 'too_large', False)
+        if self.image_too_large:
+            files = files.copy()
+            del files['image']
+        super().__init__(data, files, *args, **kwargs)
+        # Список групп из памяти процесса и только при выводе формы.
+        self.fields['group'].choices = self.group_choices
+
+    def group_choices(self):
+        group = self.fields['group']
+        return [('', group.empty_label)] + [
+            (item.pk, group.label_from_instance(item))
+            for item in all_groups()
+        ]
+
+    def clean_image(self):
+        """Лимиты проверяются по заголовку, картинка не декодируется."""
+        image = self.cleaned_data.get('image')
+        if self.image_too_large:
+            raise forms.ValidationError(
+                'Файл больше %(limit)s',
+                params={'limit': filesizeformat(max_bytes())}
+            )
+        header = getattr(image, 'image', None)
+        if header is None:
+            return image
+        width, height = header.size
+        if width * height > getattr(settings, 'POST_IMAGE_MAX_PIXELS',
+                                    Image.MAX_IMAGE_PIXELS):
+            raise forms.ValidationError(
+                'Слишком большое разрешение: %(width)s×%(height)s',
+                params={'width': width, 'height': height}
+            )
+        return image
+
     class Meta:
         model = Post
         labels = {
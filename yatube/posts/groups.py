@@ -0,0 +1,71 @@
+"""
+Группы из памяти процесса и общего кэша.
+
+Группы меняются только в админке, поэтому все они хранятся одним
+объектом под ключом groups:<поколение groups> в общем кэше и ещё раз в
+памяти процесса. Сигнал Group сдвигает поколение, и каждый процесс на
+следующем запросе перечитывает группы; проверка на запрос — одно
+чтение поколения, которое лента и так читает для ключа фрагмента.
+Копия в памяти к тому же живёт не дольше GROUPS_MEMORY_TIMEOUT секунд
+и потом читается из базы: если кэш не общий (locmem), сдвиг поколения
+в другом процессе сюда не дойдёт.
+
+posts_count в группах не хранится: он меняется с каждым постом, число
+постов группы отдаёт counters.group_posts_count().
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import Http404
+
+from .cache import generations
+from .models import Group
+
+# (поколение, группы по slug, группы по pk, срок) последнего чтения.
+_memory = (None, {}, {}, 0)
+
+
+def memory_timeout():
+    return getattr(settings, 'GROUPS_MEMORY_TIMEOUT', 60)
+
+
+def _groups():
+    global _memory
+    generation, = generations('groups')
+    expired = _memory[0] == generation and _memory[3] <= time.monotonic()
+    if _memory[0] != generation or expired:
+        key = f'groups:{generation}'
+        # Копия устарела по сроку: кэш мог не увидеть изменений.
+        groups = None if expired else cache.get(key)
+        if groups is None:
+            groups = list(Group.objects.defer('posts_count').order_by('pk'))
+            cache.set(key, groups, None)
+        _memory = (generation,
+                   {group.slug: group for group in groups},
+                   {group.pk: group for group in groups},
+                   time.monotonic() + memory_timeout())
+    return _memory
+
+
+def forget():
+    """Сбрасывает копию в памяти; вызывается сигналом Group."""
+    global _memory
+    _memory = (None, {}, {}, 0)
+
+
+def all_groups():
+    return list(_groups()[1].values())
+
+
+def by_pk():
+    """Словарь pk -> группа."""
+    return _groups()[2]
+
+
+def get_group(slug):
+    """Группа по slug; Http404, если её нет."""
+    try:
+        return _groups()[1][slug]
+    except KeyError:
+        raise Http404(f'Группа {slug} не найдена')
@@ -0,0 +1,108 @@
+"""
+Запись комментариев пачками (group commit).
+
+Комментарии, пришедшие одновременно, встают в очередь процесса.
+Первый из ожидающих запросов записывает всю очередь одной короткой
+транзакцией, остальные ждут своей записи и возвращаются уже с pk,
+так что комментарий виден сразу после редиректа. Без конкуренции
+пачка состоит из одного комментария и задержки нет. Для SQLite это
+одна блокировка записи и один сброс журнала на пачку вместо
+блокировки на каждый комментарий. Счётчики комментариев и поколения
+постов сдвигаются тоже один раз на пачку.
+
+Пачки собираются только из потоков одного процесса: выигрыш есть,
+когда воркеры многопоточные (gunicorn --threads).
+"""
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.db import DatabaseError, transaction
+
+from . import cache, counters
+
+
+def max_batch():
+    return getattr(settings, 'COMMENT_BATCH_MAX', 100)
+
+
+class _Item:
+    __slots__ = ('comment', 'done', 'error')
+
+    def __init__(self, comment):
+        self.comment = comment
+        self.done = False
+        self.error = None
+
+
+class CommentBatcher:
+    """Очередь комментариев процесса, которую записывает один из ждущих."""
+
+    def __init__(self):
+        self._lock = threading.Condition()
+        self._pending = []
+        self._flushing = False
+
+    def submit(self, comment):
+        """Сохраняет комментарий в составе пачки и ждёт записи."""
+        item = _Item(comment)
+        with self._lock:
+            self._pending.append(item)
+            while not item.done:
+                if self._flushing:
+                    self._lock.wait()
+                    continue
+                size = max_batch()
+                batch = self._pending[:size]
+                self._pending = self._pending[size:]
+                self._flushing = True
+                self._lock.release()
+                try:
+                    self._flush(batch)
+                except Exception as error:
+                    for waiting in batch:
+                        waiting.error = waiting.error or error
+                finally:
+                    self._lock.acquire()
+                    self._flushing = False
+                    self._lock.notify_all()
+        if item.error is not None:
+            raise item.error
+        return comment
+
+    @staticmethod
+    def _flush(batch):
+        try:
+            with transaction.atomic():
+                for item in batch:
+                    item.comment._ingest_batch = True
+                    item.comment.save()
+                added = Counter(item.comment.post_id for item in batch)
+                for post_id, count in added.items():
+                    counters.change_post_comments(post_id, count)
+        except DatabaseError:
+            # Ошибка одного комментария не должна терять остальные:
+            # пачка повторяется по одному, с обычными сигналами.
+            for item in batch:
+                item.comment._ingest_batch = False
+                item.comment.pk = None
+                item.comment._state.adding = True
+                try:
+                    with transaction.atomic():
+                        item.comment.save()
+                except DatabaseError as error:
+                    item.error = error
+        else:
+            # Вне try: ошибка кэша не должна записать пачку второй раз.
+            cache.bump('comments', *(f'post:{post_id}' for post_id in added))
+        finally:
+            for item in batch:
+                item.comment._ingest_batch = False
+                item.done = True
+
+
+batcher = CommentBatcher()
+
+
+def submit(comment):
+    return batcher.submit(comment)
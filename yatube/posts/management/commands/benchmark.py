@@ -0,0 +1,85 @@
+import json
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import (setup_test_environment,
+                               teardown_test_environment)
+
+from posts import benchmark
+
+
+class Command(BaseCommand):
+    help = ('Наполняет тестовую базу и меряет число запросов, время '
+            'ответа и пик памяти представлений posts')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=2000)
+        parser.add_argument('--posts', type=int, default=50000)
+        parser.add_argument('--comments', type=int, default=100000)
+        parser.add_argument(
+            '--follows', type=int, default=10,
+            help='Сколько подписок выбирает каждый пользователь'
+        )
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument(
+            '--warm', action='store_true',
+            help='Не очищать кэш между запросами'
+        )
+        parser.add_argument(
+            '--baseline',
+            default=os.path.join(settings.BASE_DIR, 'benchmark.json'),
+            help='JSON с результатами, с которыми идёт сравнение'
+        )
+        parser.add_argument(
+            '--update', action='store_true',
+            help='Записать число запросов в baseline вместо сравнения'
+        )
+
+    def handle(self, *args, **options):
+        if 'debug_toolbar' in settings.INSTALLED_APPS:
+            raise CommandError(
+                'debug_toolbar искажает замеры, запустите с YATUBE_ENV=bench')
+        volume = {key: options[key]
+                  for key in ('users', 'posts', 'comments', 'follows')}
+        setup_test_environment()
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            self.stdout.write('Наполнение базы…')
+            user = benchmark.seed(**volume)
+            results = benchmark.measure(user, options['repeat'],
+                                        options['warm'])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        for name, metrics in results.items():
+            self.stdout.write(
+                f'{name:14} {metrics["queries"]:3} запр.  '
+                f'p50 {metrics["p50_ms"]:8} мс  p99 {metrics["p99_ms"]:8} мс  '
+                f'пик {metrics["peak_kb"]:9} КБ'
+            )
+        # Время и память зависят от машины, в baseline только запросы.
+        report = {'volume': volume, 'warm': options['warm'],
+                  'views': {name: {'queries': metrics['queries']}
+                            for name, metrics in results.items()}}
+        path = options['baseline']
+        if options['update'] or not os.path.exists(path):
+            with open(path, 'w') as baseline_file:
+                json.dump(report, baseline_file, indent=2, sort_keys=True)
+            self.stdout.write(self.style.SUCCESS(f'Baseline записан в {path}'))
+            return
+        with open(path) as baseline_file:
+            baseline = json.load(baseline_file)
+        if (baseline.get('volume') != volume
+                or baseline.get('warm') != options['warm']):
+            raise CommandError(
+                'Параметры прогона не совпадают с baseline, '
+                'запустите с --update'
+            )
+        regressions = benchmark.compare(results, baseline['views'])
+        if regressions:
+            raise CommandError('Регрессии:\n' + '\n'.join(regressions))
+        self.stdout.write(self.style.SUCCESS('Регрессий нет'))
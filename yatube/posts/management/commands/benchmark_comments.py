@@ -0,0 +1,34 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import benchmark
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = ('Меряет, сколько комментариев в секунду записывают '
+            'конкурентные писатели, пачками и по одному')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--writers', type=int, default=8)
+        parser.add_argument(
+            '--comments', type=int, default=200,
+            help='Сколько комментариев пишет каждый поток'
+        )
+
+    def handle(self, *args, **options):
+        if 'debug_toolbar' in settings.INSTALLED_APPS:
+            raise CommandError(
+                'debug_toolbar искажает замеры, запустите с YATUBE_ENV=bench')
+        with benchmark.file_database():
+            users = [benchmark.User.objects.create(username=f'writer{i}')
+                     for i in range(options['writers'])]
+            post = Post.objects.create(text='Пост', author=users[0])
+            results = {
+                mode: benchmark.comment_throughput(
+                    post, users, options['comments'], batched)
+                for mode, batched in (('по одному', False),
+                                      ('пачками', True))
+            }
+        for mode, rate in results.items():
+            self.stdout.write(f'{mode:10} {rate:10} комм./с')
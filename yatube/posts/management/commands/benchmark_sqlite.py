@@ -0,0 +1,42 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+from posts import benchmark
+
+
+class Command(BaseCommand):
+    help = ('Меряет чтения и записи в секунду при конкурентной работе '
+            'с базой без PRAGMA из core.sqlite и с ними')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=8)
+        parser.add_argument('--writers', type=int, default=4)
+        parser.add_argument('--seconds', type=float, default=3.0)
+        parser.add_argument('--posts', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        if 'debug_toolbar' in settings.INSTALLED_APPS:
+            raise CommandError(
+                'debug_toolbar искажает замеры, запустите с YATUBE_ENV=bench')
+        modes = (
+            ('без PRAGMA', dict.fromkeys(settings.SQLITE_PRAGMAS)),
+            ('SQLITE_PRAGMAS', settings.SQLITE_PRAGMAS),
+        )
+        for mode, pragmas in modes:
+            # Режим журнала хранится в файле, поэтому база на каждый режим
+            # своя.
+            with override_settings(SQLITE_PRAGMAS=pragmas), \
+                    benchmark.file_database():
+                benchmark.seed(users=options['writers'] * 5,
+                               posts=options['posts'], comments=0,
+                               follows=0)
+                users = list(benchmark.User.objects.all())
+                results = benchmark.db_throughput(
+                    users, options['readers'], options['writers'],
+                    options['seconds'])
+            self.stdout.write(
+                f'{mode:15} чтений {results["reads"]:9}/с  '
+                f'записей {results["writes"]:8}/с  '
+                f'ошибок {results["errors"]}'
+            )
@@ -0,0 +1,32 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import archive
+
+
+class Command(BaseCommand):
+    help = ('Выгружает пользователей, группы, посты, комментарии и '
+            'подписки в JSONL или CSV')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path',
+            help='Файл JSONL («-» — стандартный вывод) или каталог для CSV'
+        )
+        parser.add_argument('--format', choices=('jsonl', 'csv'),
+                            default='jsonl')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        records = archive.export_records()
+        if options['format'] == 'csv':
+            if path == '-':
+                raise CommandError('CSV пишется в каталог, а не в вывод')
+            count = archive.write_csv(records, path)
+        elif path == '-':
+            count = archive.write_jsonl(records, sys.stdout)
+        else:
+            with open(path, 'w', encoding='utf-8') as stream:
+                count = archive.write_jsonl(records, stream)
+        self.stderr.write(f'Выгружено записей: {count}')
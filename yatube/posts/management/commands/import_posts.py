@@ -0,0 +1,63 @@
+import os
+from contextlib import ExitStack
+
+from django.core.management.base import BaseCommand
+
+from posts import archive
+
+
+class Command(BaseCommand):
+    help = ('Загружает выгрузку export_posts пачками в обход моделей '
+            'с продолжением с контрольной точки')
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл JSONL или каталог с CSV')
+        parser.add_argument('--batch-size', type=int,
+                            default=archive.BATCH_SIZE)
+        parser.add_argument(
+            '--chunk-size', type=int, default=archive.CHUNK_SIZE,
+            help='Сколько записей сохраняется одной транзакцией'
+        )
+        parser.add_argument(
+            '--checkpoint',
+            help='Файл с числом загруженных записей; по умолчанию '
+                 '<path>.checkpoint'
+        )
+        parser.add_argument(
+            '--defer-indexes', action='store_true',
+            help='Снять составные индексы на время загрузки'
+        )
+        parser.add_argument(
+            '--no-rebuild', action='store_true',
+            help='Не строить ленты, счётчики и поисковый индекс после '
+                 'загрузки'
+        )
+
+    def handle(self, *args, **options):
+        path = options['path'].rstrip(os.sep)
+        checkpoint = options['checkpoint'] or f'{path}.checkpoint'
+        start = 0
+        if os.path.exists(checkpoint):
+            with open(checkpoint) as checkpoint_file:
+                start = int(checkpoint_file.read())
+            self.stdout.write(f'Продолжение с записи {start}')
+        with ExitStack() as stack:
+            if os.path.isdir(path):
+                records = archive.read_csv(path)
+            else:
+                records = archive.read_jsonl(stack.enter_context(
+                    open(path, encoding='utf-8')))
+            if options['defer_indexes']:
+                stack.enter_context(archive.deferred_indexes())
+            done = start
+            for done in archive.load(records, start, options['batch_size'],
+                                     options['chunk_size']):
+                with open(checkpoint, 'w') as checkpoint_file:
+                    checkpoint_file.write(str(done))
+                self.stdout.write(f'Загружено записей: {done}')
+        if not options['no_rebuild']:
+            self.stdout.write('Ленты, счётчики и поисковый индекс…')
+            archive.rebuild_derived()
+        if os.path.exists(checkpoint):
+            os.remove(checkpoint)
+        self.stdout.write(self.style.SUCCESS(f'Загрузка завершена: {done}'))
@@ -0,0 +1,47 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts import thumbnails
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Создаёт миниатюры картинок постов из очереди'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Работать постоянно, опрашивая очередь'
+        )
+        parser.add_argument(
+            '--sleep', type=float, default=1.0,
+            help='Пауза между опросами пустой очереди, секунд'
+        )
+        parser.add_argument(
+            '--batch', type=int, default=20,
+            help='Сколько картинок брать из очереди за раз'
+        )
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Сначала поставить в очередь картинки всех постов'
+        )
+
+    def handle(self, *args, **options):
+        if options['all']:
+            images = Post.objects.exclude(image='').values_list(
+                'image', flat=True)
+            for name in images.iterator():
+                thumbnails.enqueue(name)
+        total = 0
+        while True:
+            done = thumbnails.process(options['batch'])
+            total += done
+            if done:
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['sleep'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано картинок: {total}'
+        ))
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.counters import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счётчики постов и комментариев'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Только сверить счётчики и завершиться с ошибкой '
+                 'при расхождениях'
+        )
+
+    def handle(self, *args, **options):
+        mismatches = rebuild(fix=not options['check'])
+        for name, pk, stored, actual in mismatches:
+            self.stdout.write(f'{name} pk={pk}: {stored} -> {actual}')
+        if mismatches and options['check']:
+            raise CommandError(
+                f'Расхождений в счётчиках: {len(mismatches)}'
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Счётчики в порядке, исправлено: {len(mismatches)}'
+        ))
@@ -0,0 +1,86 @@
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+from django.urls import reverse
+
+from posts import counters, views
+from posts.models import AuthorStats, Group, Post
+from posts.paginators import CursorPaginator
+
+
+def default_host():
+    """Первое имя из ALLOWED_HOSTS, которое годится для заголовка Host."""
+    for host in settings.ALLOWED_HOSTS:
+        if host != '*':
+            return host.lstrip('.')
+    return 'localhost'
+
+
+class Command(BaseCommand):
+    help = ('Прогревает кэш: пересчитывает число постов и рендерит '
+            'первые страницы главной, всех групп и самых активных авторов')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--pages', type=int, default=3,
+            help='Сколько первых страниц каждой ленты отрендерить'
+        )
+        parser.add_argument(
+            '--profiles', type=int, default=0,
+            help='Сколько профилей самых активных авторов прогреть'
+        )
+        parser.add_argument(
+            '--host', default=default_host(),
+            help='Имя сайта в запросах прогрева; по умолчанию первое '
+                 'из ALLOWED_HOSTS'
+        )
+
+    def page_params(self, queryset, pages):
+        """GET-параметры первых страниц ленты в текущем режиме пагинации."""
+        if getattr(settings, 'POSTS_PAGINATION', 'page') != 'cursor':
+            for number in range(1, pages + 1):
+                yield {'page': number}
+            return
+        paginator = CursorPaginator(queryset, views.PAGE_COUNT)
+        cursor = None
+        for _ in range(pages):
+            yield {'cursor': cursor} if cursor else {}
+            cursor = paginator.get_page(cursor).next_cursor
+            if cursor is None:
+                return
+
+    def warm(self, view, url, queryset, pages, **kwargs):
+        factory = RequestFactory(HTTP_HOST=self.host)
+        warmed = 0
+        for params in self.page_params(queryset, pages):
+            request = factory.get(url, params)
+            request.user = AnonymousUser()
+            view(request, **kwargs)
+            warmed += 1
+        return warmed
+
+    def handle(self, *args, **options):
+        pages = options['pages']
+        self.host = options['host']
+        counters.posts_total(refresh=True)
+        warmed = self.warm(views.index, reverse('posts:index'),
+                           Post.objects.all(), pages)
+        for group in Group.objects.only('pk', 'slug').iterator():
+            warmed += self.warm(
+                views.group_posts,
+                reverse('posts:group_list', args=[group.slug]),
+                Post.objects.filter(group=group), pages, slug=group.slug
+            )
+        top_authors = AuthorStats.objects.select_related('user').order_by(
+            '-posts_count')[:options['profiles']]
+        for stats in top_authors:
+            username = stats.user.username
+            warmed += self.warm(
+                views.profile, reverse('posts:profile', args=[username]),
+                Post.objects.filter(author=stats.user), pages,
+                username=username
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Прогрето страниц: {warmed}'
+        ))
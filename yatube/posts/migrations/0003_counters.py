@@ -0,0 +1,52 @@
+# Generated by Django 2.2.16 on 2026-10-18 17:06
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_counters(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    Group = apps.get_model('posts', 'Group')
+    AuthorStats = apps.get_model('posts', 'AuthorStats')
+    authors = Post.objects.order_by().values('author').annotate(
+        n=models.Count('pk'))
+    AuthorStats.objects.bulk_create(
+        [AuthorStats(user_id=row['author'], posts_count=row['n'])
+         for row in authors],
+        batch_size=500
+    )
+    for group in Group.objects.annotate(n=models.Count('post_group')):
+        Group.objects.filter(pk=group.pk).update(posts_count=group.n)
+    for post in Post.objects.annotate(
+            n=models.Count('comments')).filter(n__gt=0):
+        Post.objects.filter(pk=post.pk).update(comments_count=post.n)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0002_follow_feed'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthorStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='post_stats', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Автор')),
+                ('posts_count', models.PositiveIntegerField(default=0, verbose_name='Число постов автора')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='group',
+            name='posts_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Число постов в группе'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='comments_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Число комментариев'),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,43 @@
+from django.db import migrations
+
+# DDL повторяет posts.search на момент миграции: сам модуль с тех пор
+# может измениться.
+SQLITE_CREATE = (
+    'CREATE VIRTUAL TABLE IF NOT EXISTS posts_search USING fts5('
+    'body, post_id UNINDEXED, pub_date UNINDEXED, '
+    "tokenize='unicode61 remove_diacritics 2')"
+)
+SQLITE_DROP = 'DROP TABLE IF EXISTS posts_search'
+POSTGRES_TABLES = ('posts_post', 'posts_comment')
+
+
+def create_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(SQLITE_CREATE)
+    elif vendor == 'postgresql':
+        for table in POSTGRES_TABLES:
+            schema_editor.execute(
+                f'CREATE INDEX IF NOT EXISTS {table}_search_idx ON {table} '
+                f"USING gin (to_tsvector('russian', text))"
+            )
+
+
+def drop_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(SQLITE_DROP)
+    elif vendor == 'postgresql':
+        for table in POSTGRES_TABLES:
+            schema_editor.execute(f'DROP INDEX IF EXISTS {table}_search_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0004_thumbnail_job'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -1,11 +1,14 @@
 from django.db import models
+from django.db.models.query import ModelIterable
 from django.contrib.auth import get_user_model
-from core.models import CreatedModel
+from core.models import CounterFieldsMixin, CreatedModel
 
 User = get_user_model()
 
 
-class Group(models.Model):
+class Group(CounterFieldsMixin, models.Model):
+    counter_fields = ('posts_count',)
+
     title = models.CharField(
         verbose_name='Название группы',
         max_length=200,
@@ -24,12 +27,55 @@ class Group(models.Model):
         help_text='Указать краткое наименование кумира и его '
         'профессиональную сферу деятельности'
     )
+    posts_count = models.PositiveIntegerField(
+        verbose_name='Число постов в группе',
+        default=0,
+        editable=False
+    )
 
     def __str__(self):
         return self.title
 
 
-class Post(CreatedModel):
+class GroupsIterable(ModelIterable):
+    """Посты, которым группа подставлена из posts.groups без запроса."""
+
+    def __iter__(self):
+        # posts.groups сам импортирует модели.
+        from .groups import by_pk
+        groups = None
+        cache_group = Post.group.field.set_cached_value
+        for post in super().__iter__():
+            if post.group_id is not None:
+                groups = by_pk() if groups is None else groups
+                group = groups.get(post.group_id)
+                if group is not None:
+                    cache_group(post, group)
+            yield post
+
+
+class PostQuerySet(models.QuerySet):
+
+    FEED_FIELDS = (
+        'text', 'pub_date', 'created', 'image', 'comments_count', 'group',
+        'author__username', 'author__first_name', 'author__last_name',
+    )
+
+    def with_groups(self):
+        """Группы постов из памяти процесса вместо JOIN."""
+        clone = self._chain()
+        clone._iterable_class = GroupsIterable
+        return clone
+
+    def for_feed(self):
+        """Посты для лент: автор одним JOIN, только нужные поля."""
+        return self.select_related('author').only(
+            *self.FEED_FIELDS).with_groups()
+
+
+class Post(CounterFieldsMixin, CreatedModel):
+    counter_fields = ('comments_count',)
+
     text = models.TextField(
         verbose_name='Статья'
     )
@@ -42,7 +88,8 @@ class Post(CreatedModel):
         User,
         verbose_name='Автор',
         on_delete=models.CASCADE,
-        related_name='posts_author'
+        related_name='posts_author',
+        db_index=False
     )
     group = models.ForeignKey(
         Group,
@@ -50,27 +97,70 @@ class Post(CreatedModel):
         blank=True,
         null=True,
         on_delete=models.SET_NULL,
-        related_name='post_group'
+        related_name='post_group',
+        db_index=False
     )
     image = models.ImageField(
         'Картинка',
         upload_to='posts/',
         blank=True
     )
+    comments_count = models.PositiveIntegerField(
+        verbose_name='Число комментариев',
+        default=0,
+        editable=False
+    )
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
         ordering = ("-pub_date",)
+        # Составные индексы заменяют одиночные индексы внешних ключей.
+        indexes = [
+            models.Index(fields=['group', '-pub_date', '-id'],
+                         name='post_group_pub_date_idx'),
+            models.Index(fields=['author', '-pub_date', '-id'],
+                         name='post_author_pub_date_idx'),
+        ]
 
     def __str__(self):
         return self.text[:15]
 
 
+class AuthorStats(models.Model):
+    """Счётчики автора, которые поддерживаются сигналами posts.signals."""
+
+    user = models.OneToOneField(
+        User,
+        verbose_name='Автор',
+        primary_key=True,
+        on_delete=models.CASCADE,
+        related_name='post_stats'
+    )
+    posts_count = models.PositiveIntegerField(
+        verbose_name='Число постов автора',
+        default=0
+    )
+
+    def __str__(self):
+        return f'{self.user_id}: {self.posts_count}'
+
+
+class CommentQuerySet(models.QuerySet):
+
+    def with_authors(self):
+        """Комментарии вместе с авторами, без запроса на каждого автора."""
+        return self.select_related('author').only(
+            'post_id', 'text', 'created', 'author__username')
+
+
 class Comment(models.Model):
     post = models.ForeignKey(
         Post,
         verbose_name='Статья',
         on_delete=models.CASCADE,
-        related_name='comments'
+        related_name='comments',
+        db_index=False
     )
     author = models.ForeignKey(
         User,
@@ -87,6 +177,14 @@ class Comment(models.Model):
         auto_now_add=True
     )
 
+    objects = CommentQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['post', 'created'],
+                         name='comment_post_created_idx'),
+        ]
+
     def __str__(self):
         return self.text
 
@@ -100,7 +198,14 @@ class Follow(models.Model):
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
-        related_name='following'
+        related_name='following',
+        db_index=False
+    )
+    fanout = models.BooleanField(
+        verbose_name='Посты доставляются в ленту подписчика',
+        default=True,
+        help_text='Снимается, когда у автора слишком много подписчиков, '
+        'и его посты читаются в ленту при запросе'
     )
 
     class Meta:
@@ -110,7 +215,74 @@ class Follow(models.Model):
                 name='unique-user-subscription'
             )
         ]
-        ordering = ['user']
+        indexes = [
+            models.Index(fields=['author', 'user'],
+                         name='follow_author_user_idx'),
+        ]
 
     def __str__(self):
         return self.user
+
+
+class FeedEntry(models.Model):
+    """Запись в ленте подписок пользователя (fan-out on write)."""
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='feed_entries'
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='feed_entries'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    pub_date = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'post'],
+                name='unique-feed-entry'
+            )
+        ]
+        indexes = [
+            models.Index(fields=['user', '-pub_date', '-post'],
+                         name='feed_user_pub_date_idx'),
+            models.Index(fields=['user', 'author'],
+                         name='feed_user_author_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.user_id} <- {self.post_id}'
+
+
+class ThumbnailJob(models.Model):
+    """Картинка поста в очереди на создание миниатюр."""
+
+    image = models.CharField(
+        verbose_name='Картинка',
+        max_length=255,
+        unique=True
+    )
+    created = models.DateTimeField(
+        verbose_name='Поставлена в очередь',
+        auto_now_add=True
+    )
+    started = models.DateTimeField(
+        verbose_name='Взята воркером',
+        blank=True,
+        null=True
+    )
+    attempts = models.PositiveSmallIntegerField(
+        verbose_name='Попыток',
+        default=0
+    )
+
+    def __str__(self):
+        return self.image
@@ -0,0 +1,190 @@
+import base64
+import json
+
+from django.conf import settings
+from django.core.paginator import Page, Paginator
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+
+
+class CursorPage(Page):
+    """Страница курсорной пагинации. Не знает ни номера, ни общего числа."""
+
+    cursor_mode = True
+
+    def __init__(self, object_list, paginator, next_cursor, prev_cursor):
+        super().__init__(object_list, None, paginator)
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+    def __repr__(self):
+        return '<Cursor page of %s items>' % len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.prev_cursor is not None
+
+
+def page_window(number, last, on_each_side=2, on_ends=1):
+    """Номера страниц для навигации, пропуски обозначены None."""
+    pages = set(range(1, min(on_ends, last) + 1))
+    pages.update(range(max(last - on_ends + 1, 1), last + 1))
+    pages.update(range(max(number - on_each_side, 1),
+                       min(number + on_each_side, last) + 1))
+    window = []
+    for page in sorted(pages):
+        if window and page - window[-1] > 1:
+            window.append(None)
+        window.append(page)
+    return window
+
+
+class WindowedPaginator(Paginator):
+    """
+    Постраничная навигация с окном вокруг текущей страницы.
+
+    В навигации остаются первые и последние on_ends страниц и
+    on_each_side страниц по обе стороны от текущей, пропуски
+    обозначены None. Число объектов можно передать в count числом
+    или функцией, чтобы не выполнять COUNT(*) по всей ленте.
+    """
+
+    on_each_side = 2
+    on_ends = 1
+
+    def __init__(self, object_list, per_page, count=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self._count = count
+
+    @cached_property
+    def count(self):
+        if self._count is None:
+            return super().count
+        return self._count() if callable(self._count) else self._count
+
+    def page_window(self, number):
+        return page_window(number, self.num_pages, self.on_each_side,
+                           self.on_ends)
+
+
+class CursorPaginator(Paginator):
+    """
+    Keyset-пагинация по паре (pub_date, id).
+
+    Вместо LIMIT/OFFSET и COUNT(*) страница выбирается условием
+    «строго раньше/позже курсора», поэтому глубокие страницы
+    стоят столько же, сколько первая. Поля ключа задаются через keys,
+    если объекты списка — не сами посты; descending=False листает
+    от старых к новым.
+    """
+
+    keys = ('pub_date', 'pk')
+    descending = True
+
+    def __init__(self, object_list, per_page, keys=None, descending=None,
+                 **kwargs):
+        if keys is not None:
+            self.keys = keys
+        if descending is not None:
+            self.descending = descending
+        sign = '-' if self.descending else ''
+        ordering = [sign + key for key in self.keys]
+        super().__init__(object_list.order_by(*ordering), per_page,
+                         **kwargs)
+
+    @staticmethod
+    def _value(obj, key):
+        # Строки values() — словари, а не объекты моделей.
+        return obj[key] if isinstance(obj, dict) else getattr(obj, key)
+
+    def encode_cursor(self, obj, direction):
+        date_key, pk_key = self.keys
+        data = [direction, self._value(obj, date_key).isoformat(),
+                self._value(obj, pk_key)]
+        raw = json.dumps(data, separators=(',', ':')).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+    @staticmethod
+    def decode_cursor(cursor):
+        """Возвращает (direction, pub_date, pk) или None для мусора."""
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            direction, pub_date, pk = json.loads(
+                base64.urlsafe_b64decode(padded.encode())
+            )
+            pub_date = parse_datetime(pub_date)
+        except (ValueError, TypeError):
+            return None
+        if (direction not in ('next', 'prev') or pub_date is None
+                or not isinstance(pk, int)):
+            return None
+        return direction, pub_date, pk
+
+    def get_page(self, cursor):
+        decoded = self.decode_cursor(cursor) if cursor else None
+        if decoded is None:
+            return self._first_page()
+        direction, pub_date, pk = decoded
+        if direction == 'next':
+            return self._page_after(pub_date, pk)
+        return self._page_before(pub_date, pk)
+
+    def _first_page(self):
+        rows = list(self.object_list[:self.per_page + 1])
+        items = rows[:self.per_page]
+        next_cursor = None
+        if len(rows) > self.per_page:
+            next_cursor = self.encode_cursor(items[-1], 'next')
+        return CursorPage(items, self, next_cursor, None)
+
+    def _compare(self, forward, pub_date, pk):
+        """Условие «за курсором», при forward=False — «перед курсором»."""
+        lookup = 'lt' if forward == self.descending else 'gt'
+        date_key, pk_key = self.keys
+        return (Q(**{f'{date_key}__{lookup}': pub_date})
+                | Q(**{date_key: pub_date, f'{pk_key}__{lookup}': pk}))
+
+    def _page_after(self, pub_date, pk):
+        after = self._compare(True, pub_date, pk)
+        rows = list(self.object_list.filter(after)[:self.per_page + 1])
+        items = rows[:self.per_page]
+        if not items:
+            return self._first_page()
+        next_cursor = None
+        if len(rows) > self.per_page:
+            next_cursor = self.encode_cursor(items[-1], 'next')
+        prev_cursor = self.encode_cursor(items[0], 'prev')
+        return CursorPage(items, self, next_cursor, prev_cursor)
+
+    def _page_before(self, pub_date, pk):
+        before = self._compare(False, pub_date, pk)
+        rows = list(
+            self.object_list.filter(before).reverse()[:self.per_page + 1]
+        )
+        items = rows[:self.per_page][::-1]
+        if not items:
+            return self._first_page()
+        prev_cursor = None
+        if len(rows) > self.per_page:
+            prev_cursor = self.encode_cursor(items[0], 'prev')
+        next_cursor = self.encode_cursor(items[-1], 'next')
+        return CursorPage(items, self, next_cursor, prev_cursor)
+
+
+def paginate(request, queryset, per_page, keys=None, count=None):
+    """
+    Возвращает страницу ленты.
+
+    Курсорный режим включается настройкой POSTS_PAGINATION = 'cursor'
+    или параметром ?cursor= в запросе, иначе обычная постраничная
+    навигация по ?page=, для которой count заменяет COUNT(*).
+    """
+    cursor = request.GET.get('cursor')
+    mode = getattr(settings, 'POSTS_PAGINATION', 'page')
+    if cursor is not None or mode == 'cursor':
+        return CursorPaginator(queryset, per_page, keys).get_page(cursor)
+    paginator = WindowedPaginator(queryset, per_page, count)
+    return paginator.get_page(request.GET.get('page'))
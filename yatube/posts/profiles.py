@@ -0,0 +1,83 @@
+"""
+Шапка профиля и подписки посетителя из кэша.
+
+Шапка — автор, его полное имя, число постов, подписчиков и подписок —
+хранится одним объектом под ключом profile:<pk>, а имя пользователя
+отображается в pk отдельным ключом. Сигналы posts сбрасывают шапку
+при изменении постов, подписок и самого пользователя. Множество id
+авторов, на которых подписан посетитель, хранится под following:<pk>.
+Запись, попавшая в кэш с отстающей реплики, живёт не дольше
+PROFILE_CACHE_TIMEOUT.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.shortcuts import get_object_or_404
+
+from .counters import author_posts_count
+from .models import Follow, User
+
+
+def cache_timeout():
+    return getattr(settings, 'PROFILE_CACHE_TIMEOUT', 60 * 5)
+
+
+def _follow_count(field):
+    """Подзапрос с числом подписок, в которых пользователь стоит в field."""
+    follows = Follow.objects.filter(**{field: OuterRef('pk')}).order_by()
+    return Coalesce(Subquery(
+        follows.values(field).annotate(count=Count('pk')).values('count'),
+        output_field=IntegerField()), 0)
+
+
+def _load_header(username):
+    author = get_object_or_404(
+        User.objects.select_related('post_stats').only(
+            'username', 'first_name', 'last_name',
+            'post_stats__posts_count',
+        ).annotate(
+            followers_count=_follow_count('author'),
+            following_count=_follow_count('user'),
+        ),
+        username=username
+    )
+    return {
+        'author': author,
+        'full_name': author.get_full_name(),
+        'posts_numbers': author_posts_count(author),
+        'followers_count': author.followers_count,
+        'following_count': author.following_count,
+    }
+
+
+def profile_header(username):
+    """Шапка профиля; Http404, если пользователя нет."""
+    pk = cache.get(f'profile:user:{username}')
+    header = None if pk is None else cache.get(f'profile:{pk}')
+    # После смены имени старый ключ ведёт к чужой шапке.
+    if header is None or header['author'].username != username:
+        header = _load_header(username)
+        pk = header['author'].pk
+        cache.set_many({f'profile:user:{username}': pk,
+                        f'profile:{pk}': header}, cache_timeout())
+    return header
+
+
+def forget_profiles(*user_ids):
+    cache.delete_many([f'profile:{pk}' for pk in user_ids])
+
+
+def followed_ids(user):
+    """id авторов, на которых подписан пользователь."""
+    key = f'following:{user.pk}'
+    ids = cache.get(key)
+    if ids is None:
+        ids = frozenset(Follow.objects.filter(user=user).values_list(
+            'author_id', flat=True))
+        cache.set(key, ids, cache_timeout())
+    return ids
+
+
+def forget_followed(user_id):
+    cache.delete(f'following:{user_id}')
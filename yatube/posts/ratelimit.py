@@ -0,0 +1,74 @@
+"""
+Ограничение частоты действий через общий кэш.
+
+Корзина токенов хранится как одно число — теоретическое время
+следующего разрешённого действия (алгоритм GCRA): rate действий в
+минуту с запасом burst подряд. Чтение и запись не атомарны, поэтому
+при одновременных запросах одного пользователя лимит может быть
+превышен на несколько действий.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+PREFIX = 'ratelimit:'
+
+
+def allow(key, rate, burst):
+    """Списывает токен из корзины key; False, если корзина пуста."""
+    return allow_all([(key, rate, burst)])
+
+
+def allow_all(buckets):
+    """
+    Списывает по токену из каждой корзины (key, rate, burst).
+
+    Если пуста хоть одна, не списывается ничего: отказ по одному лимиту
+    не тратит запас другого.
+    """
+    now = time.time()
+    found = cache.get_many([PREFIX + key for key, rate, burst in buckets])
+    taken = []
+    for key, rate, burst in buckets:
+        interval = 60 / rate
+        tat = max(found.get(PREFIX + key, now), now)
+        if tat - now > interval * (burst - 1):
+            return False
+        taken.append((PREFIX + key, tat + interval,
+                      int(interval * burst) + 1))
+    for key, tat, timeout in taken:
+        cache.set(key, tat, timeout)
+    return True
+
+
+def client_ip(request):
+    """
+    IP-адрес клиента.
+
+    За TRUSTED_PROXIES доверенными прокси адрес берётся из
+    X-Forwarded-For: каждый прокси дописывает адрес справа, поэтому
+    клиентский стоит на TRUSTED_PROXIES-м месте с конца, а всё левее
+    мог подставить сам клиент.
+    """
+    proxies = getattr(settings, 'TRUSTED_PROXIES', 0)
+    if proxies:
+        forwarded = [address.strip() for address in
+                     request.META.get('HTTP_X_FORWARDED_FOR', '').split(',')
+                     if address.strip()]
+        if len(forwarded) >= proxies:
+            return forwarded[-proxies]
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def allow_comment(request):
+    """Лимит комментариев отдельно на пользователя и на IP-адрес."""
+    rate = getattr(settings, 'COMMENT_RATE_PER_MINUTE', None)
+    if not rate:
+        return True
+    burst = getattr(settings, 'COMMENT_BURST', 5)
+    ip = client_ip(request)
+    return allow_all([
+        (f'comment:user:{request.user.pk}', rate, burst),
+        (f'comment:ip:{ip}', rate * 5, burst * 5),
+    ])
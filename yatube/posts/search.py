@@ -0,0 +1,283 @@
+import base64
+import itertools
+import json
+import time
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection, transaction
+from django.utils.module_loading import import_string
+
+from .models import Comment, Post
+from .stemmer import WORD_RE, stem, stem_text
+
+# Сколько секунд «стоит» половина релевантности: за этот срок
+# у документа с тем же bm25 рейтинг падает вдвое.
+RECENCY_HALF_LIFE = 60 * 60 * 24 * 30
+
+
+def candidates():
+    """Сколько самых свежих совпадений ранжируется."""
+    return getattr(settings, 'SEARCH_CANDIDATES', 1000)
+
+
+def encode_cursor(now, score, post_id):
+    raw = json.dumps([now, score, post_id], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Возвращает (now, score, post_id) или None для мусора."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        now, score, post_id = json.loads(base64.urlsafe_b64decode(padded))
+    except (ValueError, TypeError):
+        return None
+    if not all(isinstance(value, (int, float)) for value in (now, score)):
+        return None
+    if not isinstance(post_id, int):
+        return None
+    return now, score, post_id
+
+
+class SearchBackend:
+    """
+    Интерфейс поискового бэкенда.
+
+    search() возвращает id постов в порядке релевантности с учётом
+    свежести и курсор следующей страницы (None, если её нет).
+    """
+
+    def index_post(self, post):
+        raise NotImplementedError
+
+    def remove_post(self, post_id):
+        raise NotImplementedError
+
+    def index_comment(self, comment, pub_date):
+        raise NotImplementedError
+
+    def remove_comment(self, comment_id):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def rebuild(self, posts, comments):
+        """
+        Индекс с нуля: posts — кортежи (id, text, pub_date),
+        comments — (id, post_id, text, pub_date поста).
+        """
+        self.clear()
+        for pk, text, pub_date in posts:
+            self.index_post(Post(pk=pk, text=text, pub_date=pub_date))
+        for pk, post_id, text, pub_date in comments:
+            self.index_comment(Comment(pk=pk, post_id=post_id, text=text),
+                               pub_date)
+
+    def search(self, query, cursor=None, limit=10):
+        raise NotImplementedError
+
+    def _page(self, sql, params, decoded, limit):
+        """
+        Общая часть: keyset по (score, post_id) поверх запроса бэкенда.
+
+        sql должен вернуть колонки post_id и score (меньший score лучше),
+        а первым параметром получать момент, от которого считается
+        свежесть: он сохраняется в курсоре.
+        """
+        having = ''
+        if decoded:
+            having = 'WHERE score > %s OR (score = %s AND post_id > %s)'
+            params = params + [decoded[1], decoded[1], decoded[2]]
+        with connection.cursor() as db:
+            db.execute(
+                f'SELECT post_id, score FROM ({sql}) AS ranked {having} '
+                f'ORDER BY score, post_id LIMIT %s',
+                params + [limit + 1]
+            )
+            rows = db.fetchall()
+        next_cursor = None
+        if len(rows) > limit:
+            post_id, score = rows[limit - 1]
+            now = decoded[0] if decoded else params[0]
+            next_cursor = encode_cursor(now, score, post_id)
+        return [post_id for post_id, score in rows[:limit]], next_cursor
+
+    @staticmethod
+    def _start(cursor):
+        """Курсор и момент, от которого считается свежесть."""
+        decoded = decode_cursor(cursor) if cursor else None
+        return decoded, decoded[0] if decoded else int(time.time())
+
+
+class SqliteSearchBackend(SearchBackend):
+    """
+    Полнотекстовый индекс на виртуальной таблице SQLite FTS5.
+
+    Посты и комментарии лежат в одной таблице posts_search: rowid поста
+    равен 2 * id, комментария — 2 * id + 1, так что обновление и удаление
+    документа идут по первичному ключу. В индекс пишутся основы слов
+    (posts.stemmer), запрос приводится к основам так же. Таблицу создаёт
+    миграция 0005_search.
+    """
+
+    table = 'posts_search'
+
+    def _replace(self, rowid, text, post_id, pub_date):
+        with connection.cursor() as db:
+            db.execute(f'DELETE FROM {self.table} WHERE rowid = %s', [rowid])
+            db.execute(
+                f'INSERT INTO {self.table} (rowid, body, post_id, pub_date) '
+                'VALUES (%s, %s, %s, %s)',
+                [rowid, stem_text(text), post_id, int(pub_date.timestamp())]
+            )
+
+    def _delete(self, rowid):
+        with connection.cursor() as db:
+            db.execute(f'DELETE FROM {self.table} WHERE rowid = %s', [rowid])
+
+    def index_post(self, post):
+        self._replace(2 * post.pk, post.text, post.pk, post.pub_date)
+
+    def remove_post(self, post_id):
+        self._delete(2 * post_id)
+
+    def index_comment(self, comment, pub_date):
+        self._replace(2 * comment.pk + 1, comment.text, comment.post_id,
+                      pub_date)
+
+    def remove_comment(self, comment_id):
+        self._delete(2 * comment_id + 1)
+
+    def clear(self):
+        with connection.cursor() as db:
+            db.execute(f'DELETE FROM {self.table}')
+
+    def rebuild(self, posts, comments, batch_size=1000):
+        self.clear()
+        rows = itertools.chain(
+            ((2 * pk, stem_text(text), pk, int(pub_date.timestamp()))
+             for pk, text, pub_date in posts),
+            ((2 * pk + 1, stem_text(text), post_id,
+              int(pub_date.timestamp()))
+             for pk, post_id, text, pub_date in comments),
+        )
+        sql = (f'INSERT INTO {self.table} (rowid, body, post_id, pub_date) '
+               'VALUES (%s, %s, %s, %s)')
+        with connection.cursor() as db:
+            while True:
+                batch = list(itertools.islice(rows, batch_size))
+                if not batch:
+                    break
+                db.executemany(sql, batch)
+
+    def search(self, query, cursor=None, limit=10):
+        terms = [stem(word) for word in WORD_RE.findall(query)]
+        if not terms:
+            return [], None
+        match = ' '.join('"%s"' % term.replace('"', '') for term in terms)
+        # bm25() считается только для candidates() самых свежих
+        # совпадений: их отбор читает pub_date без ранжирования.
+        sql = (
+            f'SELECT post_id, MIN(score) AS score FROM ('
+            f'SELECT post_id, bm25({self.table}) / '
+            f'(1.0 + (%s - pub_date) / {RECENCY_HALF_LIFE}.0) AS score '
+            f'FROM {self.table} WHERE {self.table} MATCH %s '
+            f'AND rowid IN (SELECT rowid FROM {self.table} '
+            f'WHERE {self.table} MATCH %s ORDER BY pub_date DESC LIMIT %s)'
+            # LIMIT не даёт SQLite развернуть подзапрос: bm25() нельзя
+            # вызывать внутри агрегата.
+            f' LIMIT -1) AS hits GROUP BY post_id'
+        )
+        decoded, now = self._start(cursor)
+        return self._page(sql, [now, match, match, candidates()], decoded,
+                          limit)
+
+
+class PostgresSearchBackend(SearchBackend):
+    """
+    Поиск по tsvector с русской конфигурацией PostgreSQL.
+
+    Отдельной таблицы нет: запрос идёт по GIN-индексам на
+    to_tsvector('russian', text) постов и комментариев, которые
+    создаёт миграция, поэтому синхронизация не нужна.
+    """
+
+    def index_post(self, post):
+        pass
+
+    def remove_post(self, post_id):
+        pass
+
+    def index_comment(self, comment, pub_date):
+        pass
+
+    def remove_comment(self, comment_id):
+        pass
+
+    def clear(self):
+        pass
+
+    def rebuild(self, posts, comments):
+        pass
+
+    def search(self, query, cursor=None, limit=10):
+        # ts_rank() считается только для candidates() самых свежих
+        # постов и комментариев.
+        rank = (
+            "-ts_rank(to_tsvector('russian', {table}.text), q) / "
+            f'(1.0 + (%s - extract(epoch FROM {{table}}.pub_date)) / '
+            f'{RECENCY_HALF_LIFE}.0)'
+        )
+        sql = (
+            'SELECT post_id, MIN(score) AS score FROM ('
+            f'SELECT p.id AS post_id, {rank.format(table="p")} AS score '
+            'FROM (SELECT id, text, pub_date FROM posts_post '
+            "WHERE to_tsvector('russian', text) @@ "
+            "plainto_tsquery('russian', %s) "
+            'ORDER BY pub_date DESC LIMIT %s) p, '
+            "plainto_tsquery('russian', %s) q "
+            'UNION ALL '
+            f'SELECT c.post_id, {rank.format(table="c")} AS score '
+            'FROM (SELECT c.post_id, c.text, p.pub_date '
+            'FROM posts_comment c JOIN posts_post p ON p.id = c.post_id '
+            "WHERE to_tsvector('russian', c.text) @@ "
+            "plainto_tsquery('russian', %s) "
+            'ORDER BY p.pub_date DESC LIMIT %s) c, '
+            "plainto_tsquery('russian', %s) q"
+            ') AS hits GROUP BY post_id'
+        )
+        decoded, now = self._start(cursor)
+        params = [now, query, candidates(), query]
+        return self._page(sql, params + params, decoded, limit)
+
+
+BACKENDS = {
+    'sqlite': SqliteSearchBackend,
+    'postgresql': PostgresSearchBackend,
+}
+
+
+def get_backend():
+    """Бэкенд из SEARCH_BACKEND или по типу базы данных."""
+    path = getattr(settings, 'SEARCH_BACKEND', None)
+    if path:
+        return import_string(path)()
+    try:
+        return BACKENDS[connection.vendor]()
+    except KeyError:
+        raise ImproperlyConfigured(
+            f'Нет поискового бэкенда для базы {connection.vendor}, '
+            'укажите SEARCH_BACKEND'
+        )
+
+
+def rebuild_index(batch_size=1000):
+    """Заново строит поисковый индекс постов и комментариев."""
+    posts = Post.objects.order_by().values_list('pk', 'text', 'pub_date')
+    comments = Comment.objects.order_by().values_list(
+        'pk', 'post_id', 'text', 'post__pub_date')
+    with transaction.atomic():
+        get_backend().rebuild(posts.iterator(chunk_size=batch_size),
+                              comments.iterator(chunk_size=batch_size))
@@ -0,0 +1,109 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import cache, counters, feed, groups, profiles, thumbnails
+from .search import get_backend as search_backend
+from .models import AuthorStats, Comment, Follow, Group, Post, User
+
+
+@receiver(pre_save, sender=Post)
+def post_group_changing(sender, instance, raw=False, **kwargs):
+    if raw or instance._state.adding:
+        return
+    instance._old_group_id = Post.objects.filter(
+        pk=instance.pk).values_list('group_id', flat=True).first()
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    cache.bump_post(instance)
+    search_backend().index_post(instance)
+    thumbnails.pregenerate(instance.image)
+    if created:
+        counters.change_author_posts(instance.author_id, 1)
+        profiles.forget_profiles(instance.author_id)
+        counters.change_group_posts(instance.group_id, 1)
+        counters.change_posts_total(1)
+        feed.fan_out_post(instance)
+        return
+    old_group_id = getattr(instance, '_old_group_id', instance.group_id)
+    if old_group_id != instance.group_id:
+        cache.bump(f'group:{old_group_id}')
+        counters.change_group_posts(old_group_id, -1)
+        counters.change_group_posts(instance.group_id, 1)
+    instance._old_group_id = instance.group_id
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    cache.bump_post(instance)
+    search_backend().remove_post(instance.pk)
+    counters.change_author_posts(instance.author_id, -1)
+    profiles.forget_profiles(instance.author_id)
+    counters.change_group_posts(instance.group_id, -1)
+    counters.change_posts_total(-1)
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    search_backend().index_comment(instance, instance.post.pub_date)
+    if getattr(instance, '_ingest_batch', False):
+        # Счётчик и поколение сдвигает ingest, один раз на пачку.
+        return
+    if not created:
+        cache.bump(f'post:{instance.post_id}')
+        return
+    # comments — для comments_count в лентах API.
+    cache.bump(f'post:{instance.post_id}', 'comments')
+    counters.change_post_comments(instance.post_id, 1)
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    cache.bump(f'post:{instance.post_id}', 'comments')
+    search_backend().remove_comment(instance.pk)
+    counters.change_post_comments(instance.post_id, -1)
+
+
+@receiver(post_save, sender=Follow)
+def follow_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        cache.bump(f'follow:{instance.user_id}')
+        profiles.forget_profiles(instance.user_id, instance.author_id)
+        profiles.forget_followed(instance.user_id)
+        feed.backfill(instance)
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    cache.bump(f'follow:{instance.user_id}')
+    profiles.forget_profiles(instance.user_id, instance.author_id)
+    profiles.forget_followed(instance.user_id)
+    feed.drop(instance)
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def group_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        cache.bump('groups', f'group:{instance.pk}')
+        groups.forget()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        profiles.forget_profiles(instance.pk)
+
+
+@receiver(post_save, sender=AuthorStats)
+def author_stats_saved(sender, instance, raw=False, **kwargs):
+    # Счётчик поправлен rebuild_counters; обычные изменения идут
+    # через update() и сбрасываются сигналами постов.
+    if not raw:
+        profiles.forget_profiles(instance.user_id)
@@ -0,0 +1,133 @@
+"""
+Стеммер для русского языка по алгоритму Snowball.
+
+Нужен поисковому индексу posts.search: слова в документах и запросах
+приводятся к основе, чтобы «кошки», «кошкам» и «кошку» находили
+друг друга.
+"""
+import re
+from functools import lru_cache
+
+VOWELS = 'аеиоуыэюя'
+
+PERFECTIVE_GERUND = (
+    ('в', 'вши', 'вшись'),
+    ('ив', 'ивши', 'ившись', 'ыв', 'ывши', 'ывшись'),
+)
+ADJECTIVE = (
+    (),
+    ('ее', 'ие', 'ые', 'ое', 'ими', 'ыми', 'ей', 'ий', 'ый', 'ой', 'ем',
+     'им', 'ым', 'ом', 'его', 'ого', 'ему', 'ому', 'их', 'ых', 'ую', 'юю',
+     'ая', 'яя', 'ою', 'ею'),
+)
+PARTICIPLE = (
+    ('ем', 'нн', 'вш', 'ющ', 'щ'),
+    ('ивш', 'ывш', 'ующ'),
+)
+REFLEXIVE = (
+    (),
+    ('ся', 'сь'),
+)
+VERB = (
+    ('ла', 'на', 'ете', 'йте', 'ли', 'й', 'л', 'ем', 'н', 'ло', 'но', 'ет',
+     'ют', 'ны', 'ть', 'ешь', 'нно'),
+    ('ила', 'ыла', 'ена', 'ейте', 'уйте', 'ите', 'или', 'ыли', 'ей', 'уй',
+     'ил', 'ыл', 'им', 'ым', 'ен', 'ило', 'ыло', 'ено', 'ят', 'ует', 'уют',
+     'ит', 'ыт', 'ены', 'ить', 'ыть', 'ишь', 'ую', 'ю'),
+)
+NOUN = (
+    (),
+    ('а', 'ев', 'ов', 'ие', 'ье', 'е', 'иями', 'ями', 'ами', 'еи', 'ии',
+     'и', 'ией', 'ей', 'ой', 'ий', 'й', 'иям', 'ям', 'ием', 'ем', 'ам', 'ом',
+     'о', 'у', 'ах', 'иях', 'ях', 'ы', 'ь', 'ию', 'ью', 'ю', 'ия', 'ья',
+     'я'),
+)
+
+WORD_RE = re.compile(r'\w+')
+
+
+def _strip(rv, groups):
+    """Отрезает самое длинное окончание из групп или возвращает None.
+
+    Окончания первой группы должны стоять после «а» или «я».
+    """
+    after_a, plain = groups
+    best = None
+    for ending in after_a:
+        if (rv.endswith(ending)
+                and rv[:-len(ending)].endswith(('а', 'я'))
+                and (best is None or len(ending) > len(best))):
+            best = ending
+    for ending in plain:
+        if rv.endswith(ending) and (best is None or len(ending) > len(best)):
+            best = ending
+    if best is None:
+        return None
+    return rv[:-len(best)]
+
+
+def _region(word, start=0):
+    """Позиция после первой согласной, идущей за гласной."""
+    for i in range(start + 1, len(word)):
+        if word[i] not in VOWELS and word[i - 1] in VOWELS:
+            return i + 1
+    return len(word)
+
+
+def _step1(rv):
+    """
+    Окончание деепричастия, иначе возвратность и окончание
+    прилагательного (с причастием), глагола или существительного.
+    """
+    stripped = _strip(rv, PERFECTIVE_GERUND)
+    if stripped is not None:
+        return stripped
+    rv = _strip(rv, REFLEXIVE) or rv
+    stripped = _strip(rv, ADJECTIVE)
+    if stripped is not None:
+        return _strip(stripped, PARTICIPLE) or stripped
+    stripped = _strip(rv, VERB)
+    if stripped is None:
+        stripped = _strip(rv, NOUN)
+    return rv if stripped is None else stripped
+
+
+def _step3(rv, offset, r2):
+    """Словообразовательное окончание, если оно целиком в R2."""
+    for ending in ('ость', 'ост'):
+        if rv.endswith(ending) and offset + len(rv) - len(ending) >= r2:
+            return rv[:-len(ending)]
+    return rv
+
+
+def _step4(rv):
+    """Двойное «н», превосходная степень или мягкий знак."""
+    if rv.endswith('нн'):
+        return rv[:-1]
+    for ending in ('ейше', 'ейш'):
+        if rv.endswith(ending):
+            rv = rv[:-len(ending)]
+            return rv[:-1] if rv.endswith('нн') else rv
+    return rv[:-1] if rv.endswith('ь') else rv
+
+
+# Частота слов подчиняется закону Ципфа: при переиндексации почти все
+# слова уже встречались.
+@lru_cache(maxsize=100000)
+def stem(word):
+    word = word.lower().replace('ё', 'е')
+    match = re.search(f'[{VOWELS}]', word)
+    if match is None:
+        return word
+    prefix, rv = word[:match.end()], word[match.end():]
+    r2 = _region(word, _region(word))
+    rv = _step1(rv)
+    if rv.endswith('и'):
+        rv = rv[:-1]
+    rv = _step3(rv, len(prefix), r2)
+    return prefix + _step4(rv)
+
+
+def stem_text(text):
+    """Все слова текста, приведённые к основе, через пробел."""
+    return ' '.join(stem(word) for word in WORD_RE.findall(text))
@@ -0,0 +1,14 @@
+from django import template
+
+from posts.paginators import page_window as window
+
+register = template.Library()
+
+
+@register.filter
+def page_window(page_obj):
+    """Номера страниц вокруг текущей для навигации, пропуски — None."""
+    paginator = page_obj.paginator
+    if hasattr(paginator, 'page_window'):
+        return paginator.page_window(page_obj.number)
+    return window(page_obj.number, paginator.num_pages)
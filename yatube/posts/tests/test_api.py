@@ -0,0 +1,125 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from posts.models import Comment, Follow, Group, Post
+from posts.views import PAGE_COUNT
+
+User = get_user_model()
+
+
+class ApiTests(TestCase):
+    """Проверка JSON API лент."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Admin')
+        cls.reader = User.objects.create_user(username='Nemo')
+        cls.group = Group.objects.create(title='Группа', slug='slug')
+        Follow.objects.create(user=cls.reader, author=cls.author)
+        for i in range(PAGE_COUNT + 3):
+            cls.post = Post.objects.create(text=f'text{i}', author=cls.author,
+                                           group=cls.group)
+        Comment.objects.create(post=cls.post, author=cls.reader, text='ок')
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def walk(self, url, **params):
+        """Все элементы ленты по курсорам next."""
+        items = []
+        data = self.client.get(url, params).json()
+        items.extend(data['results'])
+        while data['next']:
+            data = self.client.get(
+                url, dict(params, cursor=data['next'])).json()
+            items.extend(data['results'])
+        return items
+
+    def test_feeds(self):
+        expected = list(Post.objects.values_list('id', flat=True))
+        self.client.force_login(self.reader)
+        for url in (
+            reverse('posts:api_index'),
+            reverse('posts:api_group_list', args=[self.group.slug]),
+            reverse('posts:api_profile', args=[self.author.username]),
+            reverse('posts:api_follow_index'),
+        ):
+            with self.subTest(url=url):
+                items = self.walk(url, fields='id')
+                self.assertEqual([item['id'] for item in items], expected)
+
+    def test_fields(self):
+        url = reverse('posts:api_index')
+        item = self.client.get(url, {'fields': 'id,author'}).json()[
+            'results'][0]
+        self.assertEqual(item, {'id': self.post.pk, 'author': 'Admin'})
+        response = self.client.get(url, {'fields': 'id,password'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_post_detail(self):
+        data = self.client.get(
+            reverse('posts:api_post_detail', args=[self.post.pk])).json()
+        self.assertEqual(data['post']['group'], 'slug')
+        self.assertEqual(data['comments']['results'][0]['text'], 'ок')
+        data = self.client.get(
+            reverse('posts:api_post_detail', args=[self.post.pk]),
+            {'fields': 'id,comments_count', 'comment_fields': 'text'}).json()
+        self.assertEqual(data['post'], {'id': self.post.pk,
+                                        'comments_count': 1})
+        self.assertEqual(data['comments']['results'], [{'text': 'ок'}])
+
+    def test_errors(self):
+        for url, status in (
+            (reverse('posts:api_profile', args=['nobody']), 404),
+            (reverse('posts:api_post_detail', args=[0]), 404),
+            (reverse('posts:api_follow_index'), 401),
+        ):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, status)
+                self.assertIn('error', response.json())
+
+    def test_not_modified_without_queries(self):
+        url = reverse('posts:api_index')
+        etag = self.client.get(url)['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        Post.objects.create(text='new', author=self.author)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_comment_changes_feed_etags(self):
+        """
+        Комментарий меняет ETag лент только с comments_count в ?fields=.
+        """
+        self.client.force_login(self.reader)
+        urls = (
+            reverse('posts:api_index'),
+            reverse('posts:api_group_list', args=[self.group.slug]),
+            reverse('posts:api_profile', args=[self.author.username]),
+            reverse('posts:api_follow_index'),
+        )
+        counted = {'fields': 'id,comments_count'}
+        etags = {url: (self.client.get(url)['ETag'],
+                       self.client.get(url, counted)['ETag'])
+                 for url in urls}
+        Comment.objects.create(post=self.post, author=self.reader, text='2')
+        for url in urls:
+            default_etag, counted_etag = etags[url]
+            with self.subTest(url=url):
+                self.assertNotIn(
+                    'comments_count', self.client.get(url).json()[
+                        'results'][0])
+                response = self.client.get(
+                    url, HTTP_IF_NONE_MATCH=default_etag)
+                self.assertEqual(response.status_code, 304)
+                response = self.client.get(
+                    url, counted, HTTP_IF_NONE_MATCH=counted_etag)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.json()['results'][0],
+                                 {'id': self.post.pk, 'comments_count': 2})
@@ -0,0 +1,123 @@
+import io
+import os
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+from posts import archive
+from posts.counters import author_posts_count
+from posts.models import AuthorStats, Comment, FeedEntry, Follow, Group, Post
+
+User = get_user_model()
+
+
+class ArchiveTests(TestCase):
+    """Проверка выгрузки и загрузки контента."""
+
+    def setUp(self):
+        self.author = User.objects.create_user(
+            username='Admin', first_name='Сальвадор', password='secret',
+            email='admin@example.com', is_staff=True)
+        self.reader = User.objects.create_user(username='Nemo',
+                                               is_active=False)
+        self.reader.last_login = timezone.now()
+        self.reader.save()
+        group = Group.objects.create(title='Группа', slug='slug',
+                                     description='Описание')
+        self.post = Post.objects.create(text='Пост, с "кавычками"\nи строкой',
+                                        author=self.author, group=group)
+        Post.objects.create(text='Без группы', author=self.author)
+        Comment.objects.create(post=self.post, author=self.reader,
+                               text='Комментарий')
+        Follow.objects.create(user=self.reader, author=self.author)
+        self.records = list(archive.export_records())
+
+    def wipe(self):
+        for model in (Follow, Comment, Post, Group, User):
+            model.objects.all().delete()
+        AuthorStats.objects.all().delete()
+
+    def assertRestored(self):
+        post = Post.objects.get(pk=self.post.pk)
+        self.assertEqual(post.text, self.post.text)
+        self.assertEqual(post.pub_date, self.post.pub_date)
+        self.assertEqual(post.group.slug, 'slug')
+        self.assertEqual(Post.objects.count(), 2)
+        self.assertEqual(Comment.objects.get().author.username, 'Nemo')
+        author = User.objects.get(username='Admin')
+        self.assertTrue(author.check_password('secret'))
+        self.assertEqual(author.email, 'admin@example.com')
+        self.assertTrue(author.is_staff)
+        self.assertEqual(author.date_joined, self.author.date_joined)
+        reader = User.objects.get(username='Nemo')
+        self.assertFalse(reader.has_usable_password())
+        self.assertFalse(reader.is_active)
+        self.assertEqual(reader.last_login, self.reader.last_login)
+        self.assertIsNone(author.last_login)
+        self.assertEqual(author_posts_count(author), 2)
+        self.assertEqual(FeedEntry.objects.filter(user=self.reader).count(),
+                         2)
+
+    def test_jsonl_round_trip(self):
+        stream = io.StringIO()
+        self.assertEqual(archive.write_jsonl(self.records, stream), 7)
+        self.wipe()
+        stream.seek(0)
+        self.assertEqual(list(archive.load(archive.read_jsonl(stream))), [7])
+        archive.rebuild_derived()
+        self.assertRestored()
+
+    def test_csv_round_trip(self):
+        with tempfile.TemporaryDirectory() as directory:
+            archive.write_csv(self.records, directory)
+            self.wipe()
+            list(archive.load(archive.read_csv(directory)))
+        archive.rebuild_derived()
+        self.assertRestored()
+
+    def test_resume_from_checkpoint(self):
+        """Повтор с контрольной точки не дублирует записи."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'archive.jsonl')
+            with open(path, 'w', encoding='utf-8') as stream:
+                archive.write_jsonl(self.records, stream)
+            self.wipe()
+            with open(path, encoding='utf-8') as stream:
+                progress = archive.load(archive.read_jsonl(stream),
+                                        chunk_size=3)
+                self.assertEqual(next(progress), 3)
+            with open(f'{path}.checkpoint', 'w') as checkpoint:
+                checkpoint.write('2')
+            call_command('import_posts', path, stdout=io.StringIO())
+            self.assertFalse(os.path.exists(f'{path}.checkpoint'))
+        self.assertRestored()
+
+
+class DeferredIndexesTests(TransactionTestCase):
+    """Проверка снятия индексов на время загрузки."""
+
+    def indexes(self):
+        with connection.cursor() as cursor:
+            return {
+                name
+                for model, _ in archive.MODELS.values()
+                for name in connection.introspection.get_constraints(
+                    cursor, model._meta.db_table)
+            }
+
+    def test_resume_after_killed_run(self):
+        """Повтор после загрузки, убитой без возврата индексов."""
+        expected = {index.name for model, _ in archive.MODELS.values()
+                    for index in model._meta.indexes}
+        killed = archive.deferred_indexes()
+        killed.__enter__()
+        self.assertFalse(expected & self.indexes())
+        with archive.deferred_indexes():
+            pass
+        self.assertLessEqual(expected, self.indexes())
+        with archive.deferred_indexes():
+            pass
+        self.assertLessEqual(expected, self.indexes())
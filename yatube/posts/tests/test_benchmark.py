@@ -0,0 +1,35 @@
+from django.test import TestCase
+from posts import benchmark
+from posts.models import AuthorStats, FeedEntry, Follow, Post
+
+
+class BenchmarkTests(TestCase):
+    """Проверка нагрузочного прогона на маленьком объёме."""
+
+    def test_seed_and_measure(self):
+        user = benchmark.seed(users=20, posts=100, comments=200, follows=3)
+        self.assertEqual(Post.objects.count(), 100)
+        self.assertEqual(
+            sum(AuthorStats.objects.values_list('posts_count', flat=True)),
+            100)
+        follow = Follow.objects.first()
+        self.assertEqual(
+            FeedEntry.objects.filter(user=follow.user,
+                                     author=follow.author).count(),
+            Post.objects.filter(author=follow.author).count())
+        results = benchmark.measure(user, repeat=2)
+        self.assertEqual(
+            [name for name, *_ in benchmark.scenarios(user)], list(results))
+        for metrics in results.values():
+            self.assertGreater(metrics['queries'], 0)
+            self.assertGreater(metrics['p99_ms'], 0)
+
+    def test_compare(self):
+        baseline = {'index': {'queries': 3, 'p50_ms': 10, 'p99_ms': 20,
+                              'peak_kb': 100}}
+        same = {'index': dict(baseline['index'])}
+        self.assertEqual(benchmark.compare(same, baseline), [])
+        slower = {'index': dict(baseline['index'], p99_ms=50)}
+        self.assertEqual(benchmark.compare(slower, baseline), [])
+        worse = {'index': dict(baseline['index'], queries=4)}
+        self.assertEqual(len(benchmark.compare(worse, baseline)), 1)
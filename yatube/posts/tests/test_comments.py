@@ -0,0 +1,62 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from posts.models import Comment, Post
+from posts.views import COMMENTS_PAGE_COUNT
+
+
+User = get_user_model()
+
+
+class CommentPagesTests(TestCase):
+    """Проверка постраничной загрузки комментариев."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Nemo')
+        cls.post = Post.objects.create(text='text', author=cls.user)
+        Comment.objects.bulk_create([
+            Comment(post=cls.post, author=cls.user, text=f'comment{i}')
+            for i in range(COMMENTS_PAGE_COUNT * 2 + 5)
+        ])
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def test_walk_comments(self):
+        """Страницы идут от старых к новым без пропусков и повторов."""
+        response = self.client.get(
+            reverse('posts:post_detail', args=[self.post.pk]))
+        comments = response.context['comments']
+        seen = list(comments)
+        while comments.has_next():
+            response = self.client.get(
+                reverse('posts:post_comments', args=[self.post.pk]),
+                {'cursor': comments.next_cursor})
+            comments = response.context['comments']
+            seen.extend(comments)
+        self.assertEqual(
+            seen, list(Comment.objects.order_by('created', 'pk')))
+        self.assertNotContains(response, 'data-comments-more')
+
+    def test_detail_cost_independent_of_comments(self):
+        """Число запросов страницы поста не растёт с числом комментариев."""
+        url = reverse('posts:post_detail', args=[self.post.pk])
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
+        self.assertEqual(len(response.context['comments']),
+                         COMMENTS_PAGE_COUNT)
+        self.assertContains(response, 'data-comments-more')
+
+    def test_detail_with_cursor(self):
+        """Без JavaScript ссылка открывает следующую страницу на месте."""
+        first = self.client.get(
+            reverse('posts:post_detail', args=[self.post.pk]))
+        second = self.client.get(
+            reverse('posts:post_detail', args=[self.post.pk]),
+            {'comments': first.context['comments'].next_cursor})
+        self.assertEqual(second.context['comments'][0].text,
+                         f'comment{COMMENTS_PAGE_COUNT}')
@@ -0,0 +1,83 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from posts.forms import PostForm
+from posts.models import AuthorStats, Comment, Group, Post
+
+
+User = get_user_model()
+
+
+class CountersTests(TestCase):
+    """Проверка денормализованных счётчиков постов и комментариев."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Nemo')
+        cls.group = Group.objects.create(title='Группа', slug='group')
+        cls.other_group = Group.objects.create(title='Другая', slug='other')
+
+    def assertCounts(self, author_posts, group_posts, other_posts):
+        self.assertEqual(
+            AuthorStats.objects.get(user=self.user).posts_count, author_posts)
+        self.group.refresh_from_db()
+        self.other_group.refresh_from_db()
+        self.assertEqual(self.group.posts_count, group_posts)
+        self.assertEqual(self.other_group.posts_count, other_posts)
+
+    def test_post_counters(self):
+        """Создание, перенос в другую группу и удаление поста."""
+        post = Post.objects.create(text='1', author=self.user,
+                                   group=self.group)
+        Post.objects.create(text='2', author=self.user)
+        self.assertCounts(2, 1, 0)
+        post.group = self.other_group
+        post.save()
+        self.assertCounts(2, 0, 1)
+        post.delete()
+        self.assertCounts(1, 0, 0)
+
+    def test_comment_counter(self):
+        """Комментарии увеличивают и уменьшают счётчик поста."""
+        post = Post.objects.create(text='1', author=self.user)
+        comment = Comment.objects.create(post=post, author=self.user,
+                                         text='к')
+        Comment.objects.create(post=post, author=self.user, text='к')
+        comment.delete()
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 1)
+
+    def test_edit_keeps_concurrent_counters(self):
+        """Правка поста и группы не затирает счётчики, сдвинутые F()."""
+        post = Post.objects.create(text='1', author=self.user,
+                                   group=self.group)
+        stale = Post.objects.get(pk=post.pk)
+        stale_group = Group.objects.get(pk=self.group.pk)
+        Comment.objects.create(post=post, author=self.user, text='к')
+        Post.objects.create(text='2', author=self.user, group=self.group)
+        form = PostForm({'text': 'правка', 'group': self.group.pk},
+                        instance=stale)
+        self.assertTrue(form.is_valid())
+        form.save()
+        stale_group.title = 'Новое название'
+        stale_group.save()
+        post.refresh_from_db()
+        self.assertEqual(post.text, 'правка')
+        self.assertEqual(post.comments_count, 1)
+        self.assertCounts(2, 2, 0)
+
+    def test_rebuild_command(self):
+        """Команда находит и исправляет расхождения."""
+        post = Post.objects.create(text='1', author=self.user,
+                                   group=self.group)
+        Post.objects.filter(pk=post.pk).update(comments_count=5)
+        AuthorStats.objects.filter(user=self.user).update(posts_count=7)
+        with self.assertRaises(CommandError):
+            call_command('rebuild_counters', '--check', stdout=StringIO())
+        call_command('rebuild_counters', stdout=StringIO())
+        call_command('rebuild_counters', '--check', stdout=StringIO())
+        self.assertCounts(1, 1, 0)
@@ -0,0 +1,129 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from posts.models import FeedEntry, Follow, Post
+from posts.views import PAGE_COUNT
+
+
+User = get_user_model()
+
+
+class FollowFeedTests(TestCase):
+    """Проверка ленты подписок с раскладкой постов при записи."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Admin')
+        cls.reader = User.objects.create_user(username='Nemo')
+        cls.old_post = Post.objects.create(text='старый', author=cls.author)
+
+    def setUp(self):
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+
+    def feed(self):
+        response = self.reader_client.get(reverse('posts:follow_index'))
+        return list(response.context['page_obj'])
+
+    def test_follow_new_post_unfollow(self):
+        """Подписка, новый пост и отписка меняют ленту подписчика."""
+        self.reader_client.get(
+            reverse('posts:profile_follow', args=[self.author.username]))
+        self.assertEqual(self.feed(), [self.old_post])
+        new_post = Post.objects.create(text='новый', author=self.author)
+        self.assertTrue(FeedEntry.objects.filter(
+            user=self.reader, post=new_post).exists())
+        self.assertEqual(self.feed(), [new_post, self.old_post])
+        self.reader_client.get(
+            reverse('posts:profile_unfollow', args=[self.author.username]))
+        self.assertFalse(FeedEntry.objects.filter(user=self.reader).exists())
+        self.assertEqual(self.feed(), [])
+
+    @override_settings(FEED_FANOUT_MAX_FOLLOWERS=0)
+    def test_popular_author_read_on_request(self):
+        """Посты популярного автора не раскладываются, а читаются."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        new_post = Post.objects.create(text='новый', author=self.author)
+        self.assertFalse(FeedEntry.objects.exists())
+        self.assertFalse(Follow.objects.get(user=self.reader).fanout)
+        self.assertEqual(self.feed(), [new_post, self.old_post])
+
+    @override_settings(FEED_FANOUT_MAX_FOLLOWERS=0)
+    def test_popular_author_read_without_writes(self):
+        """Посты в режиме чтения сливаются в ленту без записи в базу."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        new_post = Post.objects.create(text='новый', author=self.author)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.feed(), [new_post, self.old_post])
+        self.assertFalse(any(
+            query['sql'].startswith(('INSERT', 'UPDATE', 'DELETE'))
+            for query in queries.captured_queries))
+        response = self.reader_client.get(
+            reverse('posts:follow_index'), {'cursor': ''})
+        self.assertEqual(list(response.context['page_obj']),
+                         [new_post, self.old_post])
+
+    def test_switch_to_read_mode_no_duplicates(self):
+        """Разложенные раньше посты не повторяются после перехода."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        with override_settings(FEED_FANOUT_MAX_FOLLOWERS=0):
+            new_post = Post.objects.create(text='новый', author=self.author)
+        self.assertTrue(FeedEntry.objects.filter(post=self.old_post).exists())
+        self.assertEqual(self.feed(), [new_post, self.old_post])
+
+    def test_back_to_fanout_after_unfollows(self):
+        """Автор возвращается к раскладке, когда подписчиков мало."""
+        other = User.objects.create_user(username='Other')
+        Follow.objects.create(user=self.reader, author=self.author)
+        with override_settings(FEED_FANOUT_MAX_FOLLOWERS=1,
+                               FEED_FANOUT_RESTORE_FOLLOWERS=1):
+            Follow.objects.create(user=other, author=self.author)
+            new_post = Post.objects.create(text='новый', author=self.author)
+            self.assertFalse(Follow.objects.get(user=self.reader).fanout)
+            Follow.objects.get(user=other).delete()
+        self.assertTrue(Follow.objects.get(user=self.reader).fanout)
+        self.assertTrue(FeedEntry.objects.filter(
+            user=self.reader, post=new_post).exists())
+        self.assertEqual(self.feed(), [new_post, self.old_post])
+
+    def test_merged_feed_pages(self):
+        """Страницы слитой ленты идут по порядку без пропусков."""
+        other = User.objects.create_user(username='Other')
+        Follow.objects.create(user=self.reader, author=self.author)
+        Follow.objects.create(user=self.reader, author=other, fanout=False)
+        for i in range(PAGE_COUNT):
+            Post.objects.create(text=f'a{i}', author=self.author)
+            Post.objects.create(text=f'o{i}', author=other)
+        expected = list(Post.objects.filter(
+            author__in=[self.author, other]).order_by('-pub_date', '-pk'))
+        for params in ({}, {'cursor': ''}):
+            seen, page = [], 1
+            response = self.reader_client.get(
+                reverse('posts:follow_index'), params)
+            while True:
+                page_obj = response.context['page_obj']
+                seen.extend(page_obj)
+                if not page_obj.has_next():
+                    break
+                page += 1
+                response = self.reader_client.get(
+                    reverse('posts:follow_index'),
+                    {'cursor': page_obj.next_cursor} if 'cursor' in params
+                    else {'page': page})
+            self.assertEqual(seen, expected)
+
+    def test_page_count_cached(self):
+        """Навигация по ?page= не считает ленту на каждом запросе."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        self.feed()
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.feed(), [self.old_post])
+        self.assertFalse(any('COUNT(' in query['sql']
+                             for query in queries.captured_queries))
+        self.reader_client.get(
+            reverse('posts:profile_unfollow', args=[self.author.username]))
+        response = self.reader_client.get(reverse('posts:follow_index'))
+        self.assertEqual(response.context['page_obj'].paginator.count, 0)
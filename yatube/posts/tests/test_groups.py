@@ -0,0 +1,65 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from posts import groups
+from posts.counters import group_posts_count
+from posts.forms import PostForm
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class GroupsTests(TestCase):
+    """Проверка групп из памяти процесса и кэша."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Admin')
+        cls.group = Group.objects.create(
+            title='Группа', slug='slug', description='Описание')
+        Post.objects.create(text='text', author=cls.author, group=cls.group)
+
+    def setUp(self):
+        cache.clear()
+        groups.forget()
+        self.client = Client()
+        self.url = reverse('posts:group_list', args=[self.group.slug])
+
+    def test_group_page_queries(self):
+        """Когда группы в памяти, странице нужен только запрос постов."""
+        groups.all_groups()
+        group_posts_count(self.group.pk)
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertEqual(response.context['group'], self.group)
+        self.assertEqual(response.context['page_obj'][0].group.title,
+                         'Группа')
+
+    def test_group_changes(self):
+        self.client.get(self.url)
+        group = Group.objects.get(pk=self.group.pk)
+        group.title = 'Новое название'
+        group.save()
+        self.assertContains(self.client.get(self.url), 'Новое название')
+        group.delete()
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+    @override_settings(GROUPS_MEMORY_TIMEOUT=0)
+    def test_memory_expires_without_generation_bump(self):
+        """Изменение, сдвиг которого процесс не увидел, доходит по сроку."""
+        groups.all_groups()
+        Group.objects.filter(pk=self.group.pk).update(title='Новое название')
+        self.assertEqual(groups.get_group('slug').title, 'Новое название')
+
+    def test_posts_count(self):
+        self.assertEqual(group_posts_count(self.group.pk), 1)
+        Post.objects.create(text='new', author=self.author, group=self.group)
+        self.assertEqual(group_posts_count(self.group.pk), 2)
+
+    def test_form_choices(self):
+        groups.all_groups()
+        with self.assertNumQueries(0):
+            html = PostForm().as_p()
+        self.assertIn('Группа', html)
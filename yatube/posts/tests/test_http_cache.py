@@ -0,0 +1,88 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from posts import cache as generations
+from posts.models import Comment, Group, Post
+
+User = get_user_model()
+
+
+class PageValidatorsTests(TestCase):
+    """Проверка условных ответов страниц лент и поста."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Admin')
+        cls.group = Group.objects.create(title='Группа', slug='slug')
+        cls.post = Post.objects.create(text='text', author=cls.author,
+                                       group=cls.group)
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.urls = [
+            reverse('posts:index'),
+            reverse('posts:group_list', args=[self.group.slug]),
+            reverse('posts:profile', args=[self.author.username]),
+            reverse('posts:post_detail', args=[self.post.pk]),
+        ]
+
+    def test_revalidation(self):
+        for url in self.urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertIn('public', response['Cache-Control'])
+                self.assertEqual(response['Vary'], 'Cookie')
+                etag = response['ETag']
+                with self.assertNumQueries(0):
+                    response = self.client.get(
+                        url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+                response = self.client.get(
+                    url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+                self.assertEqual(response.status_code, 304)
+
+    def test_changes(self):
+        """Правка поста и новый комментарий меняют ETag всех страниц."""
+        etags = [self.client.get(url)['ETag'] for url in self.urls]
+        self.post.text = 'new text'
+        self.post.save()
+        Comment.objects.create(post=self.post, author=self.author, text='ок')
+        for url, etag in zip(self.urls, etags):
+            with self.subTest(url=url):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 200)
+
+    def test_thumbnails_change_pages(self):
+        """Готовые миниатюры меняют ETag лент и страницы поста."""
+        etags = [self.client.get(url)['ETag'] for url in self.urls]
+        generations.bump('thumbnails')
+        for url, etag in zip(self.urls, etags):
+            with self.subTest(url=url):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 200)
+
+    def test_user_pages_private(self):
+        guest = self.client.get(self.urls[0])['ETag']
+        self.client.force_login(self.author)
+        response = self.client.get(self.urls[0])
+        self.assertIn('private', response['Cache-Control'])
+        self.assertNotEqual(response['ETag'], guest)
+        response = self.client.get(self.urls[0],
+                                   HTTP_IF_NONE_MATCH=guest)
+        self.assertEqual(response.status_code, 200)
+
+    def test_guest_page_cache(self):
+        """Гость получает страницу из кэша, новый пост виден сразу."""
+        url = self.urls[0]
+        first = self.client.get(url)
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response.content, first.content)
+        Post.objects.create(text='свежий пост', author=self.author)
+        self.assertContains(self.client.get(url), 'свежий пост')
+        # С сессией страница собирается заново.
+        self.client.force_login(self.author)
+        self.assertIsNotNone(self.client.get(url).context)
@@ -0,0 +1,80 @@
+import re
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+# Полный проход по таблице без индекса: «SCAN posts_post» без USING.
+FULL_SCAN_RE = re.compile(r'\bSCAN (?:TABLE )?(\w+)(?!.*\bUSING\b)')
+
+
+class FeedIndexesTests(TestCase):
+    """Запросы лент идут по индексам, без полного прохода и сортировки."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Admin')
+        cls.reader = User.objects.create_user(username='Nemo')
+        cls.group = Group.objects.create(
+            title='Группа', slug='slug', description='Описание')
+        Follow.objects.create(user=cls.reader, author=cls.author)
+        for i in range(15):
+            Post.objects.create(text=f'text{i}', author=cls.author,
+                                group=cls.group)
+        cls.post = Post.objects.first()
+        Comment.objects.create(post=cls.post, author=cls.reader, text='ok')
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def plans(self, url, data=None):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url, data)
+        plans = []
+        with connection.cursor() as db:
+            for query in queries.captured_queries:
+                sql = query['sql']
+                if not sql.startswith('SELECT') or 'posts_' not in sql:
+                    continue
+                # Все группы читаются разом и живут в памяти процесса.
+                if 'FROM "posts_group"' in sql and 'WHERE' not in sql:
+                    continue
+                db.execute('EXPLAIN QUERY PLAN ' + sql)
+                plans.append(
+                    (sql, [row[-1] for row in db.fetchall()]))
+        return plans
+
+    def assertIndexed(self, url, data=None):
+        for sql, plan in self.plans(url, data):
+            for step in plan:
+                with self.subTest(url=url, sql=sql, step=step):
+                    self.assertNotIn('TEMP B-TREE', step)
+                    self.assertIsNone(FULL_SCAN_RE.search(step))
+
+    def test_feeds(self):
+        for url in (
+            reverse('posts:index'),
+            reverse('posts:group_list', args=[self.group.slug]),
+            reverse('posts:profile', args=[self.author.username]),
+            reverse('posts:follow_index'),
+            reverse('posts:post_detail', args=[self.post.pk]),
+        ):
+            self.assertIndexed(url)
+            self.assertIndexed(url, {'cursor': ''})
+
+    def test_api(self):
+        for url in (
+            reverse('posts:api_index'),
+            reverse('posts:api_group_list', args=[self.group.slug]),
+            reverse('posts:api_profile', args=[self.author.username]),
+            reverse('posts:api_follow_index'),
+            reverse('posts:api_post_detail', args=[self.post.pk]),
+        ):
+            self.assertIndexed(url)
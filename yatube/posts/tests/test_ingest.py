@@ -0,0 +1,101 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DatabaseError, IntegrityError, connection
+from django.test import (Client, RequestFactory, TestCase,
+                         override_settings)
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from posts import ingest, ratelimit
+from posts.models import Comment, Post
+
+User = get_user_model()
+
+
+class CommentIngestTests(TestCase):
+    """Проверка лимита и пакетной записи комментариев."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Nemo')
+        cls.post = Post.objects.create(text='text', author=cls.user)
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.user)
+        self.url = reverse('posts:add_comment', args=[self.post.pk])
+
+    def comment(self, text):
+        return Comment(post=self.post, author=self.user, text=text)
+
+    def test_comment_visible_after_redirect(self):
+        response = self.client.post(self.url, {'text': 'Сразу'},
+                                    follow=True)
+        self.assertContains(response, 'Сразу')
+
+    @override_settings(COMMENT_RATE_PER_MINUTE=10, COMMENT_BURST=5)
+    def test_rate_limit(self):
+        for i in range(5):
+            response = self.client.post(self.url, {'text': f'comment{i}'})
+            self.assertEqual(response.status_code, 302)
+        response = self.client.post(self.url, {'text': 'лишний'})
+        self.assertEqual(response.status_code, 429)
+        self.assertTemplateUsed(response, 'core/429.html')
+        self.assertEqual(Comment.objects.count(), 5)
+
+    def test_refused_bucket_charges_nothing(self):
+        """Отказ по одной корзине не списывает токен из другой."""
+        self.assertTrue(ratelimit.allow('b', 1, 1))
+        self.assertFalse(ratelimit.allow_all([('a', 1, 1), ('b', 1, 1)]))
+        self.assertTrue(ratelimit.allow('a', 1, 1))
+
+    def test_client_ip(self):
+        """За доверенными прокси адрес берётся из X-Forwarded-For."""
+        request = RequestFactory().post(
+            self.url, REMOTE_ADDR='10.0.0.1',
+            HTTP_X_FORWARDED_FOR='1.1.1.1, 2.2.2.2, 3.3.3.3')
+        for proxies, expected in ((0, '10.0.0.1'), (1, '3.3.3.3'),
+                                  (2, '2.2.2.2'), (4, '10.0.0.1')):
+            with self.subTest(proxies=proxies):
+                with override_settings(TRUSTED_PROXIES=proxies):
+                    self.assertEqual(ratelimit.client_ip(request), expected)
+
+    def test_pending_comments_written_together(self):
+        """Ждущие в очереди комментарии записывает первый освободившийся."""
+        batcher = ingest.CommentBatcher()
+        waiting = [ingest._Item(self.comment(f'other{i}')) for i in range(3)]
+        batcher._pending.extend(waiting)
+        with CaptureQueriesContext(connection) as queries:
+            batcher.submit(self.comment('own'))
+        savepoints = [query for query in queries.captured_queries
+                      if query['sql'].startswith('SAVEPOINT')]
+        self.assertEqual(len(savepoints), 1)
+        self.assertTrue(all(item.done for item in waiting))
+        self.assertEqual(Comment.objects.count(), 4)
+        counter_updates = [
+            query for query in queries.captured_queries
+            if query['sql'].startswith('UPDATE "posts_post"')]
+        self.assertEqual(len(counter_updates), 1)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comments_count, 4)
+
+    def test_bad_comment_does_not_lose_batch(self):
+        batcher = ingest.CommentBatcher()
+        bad = ingest._Item(self.comment(None))
+        batcher._pending.append(bad)
+        batcher.submit(self.comment('ok'))
+        self.assertIsInstance(bad.error, IntegrityError)
+        self.assertEqual(
+            list(Comment.objects.values_list('text', flat=True)), ['ok'])
+
+    def test_cache_error_does_not_repeat_batch(self):
+        """Ошибка сдвига поколений не записывает пачку второй раз."""
+        batcher = ingest.CommentBatcher()
+        with mock.patch('posts.cache.bump',
+                        side_effect=[DatabaseError, None, None]):
+            with self.assertRaises(DatabaseError):
+                batcher.submit(self.comment('once'))
+        self.assertEqual(Comment.objects.count(), 1)
@@ -0,0 +1,111 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from posts import counters
+from posts.models import Post
+from posts.paginators import CursorPaginator, WindowedPaginator, page_window
+from posts.views import PAGE_COUNT
+
+
+User = get_user_model()
+
+
+@override_settings(POSTS_PAGINATION='cursor')
+class CursorPaginatorTests(TestCase):
+    """Проверка курсорной пагинации лент."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Nemo')
+        for i in range(PAGE_COUNT * 2 + 3):
+            Post.objects.create(text=f'text{i}', author=cls.user)
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def test_walk_forward_and_back(self):
+        """Курсоры next/prev обходят ленту без пропусков и повторов."""
+        url = reverse('posts:index')
+        expected = list(Post.objects.order_by('-pub_date', '-pk'))
+        seen = []
+        pages = []
+        page_obj = self.guest_client.get(url).context['page_obj']
+        self.assertFalse(page_obj.has_previous())
+        while True:
+            pages.append(list(page_obj))
+            seen.extend(page_obj)
+            if not page_obj.has_next():
+                break
+            page_obj = self.guest_client.get(
+                url, {'cursor': page_obj.next_cursor}).context['page_obj']
+        self.assertEqual(seen, expected)
+        self.assertEqual(len(pages), 3)
+        page_obj = self.guest_client.get(
+            url, {'cursor': page_obj.prev_cursor}).context['page_obj']
+        self.assertEqual(list(page_obj), pages[1])
+
+    def test_no_count_query(self):
+        """Страница не выполняет COUNT(*)."""
+        paginator = CursorPaginator(Post.objects.all(), PAGE_COUNT)
+        first = paginator.get_page(None)
+        with self.assertNumQueries(1):
+            page_obj = paginator.get_page(first.next_cursor)
+            list(page_obj)
+
+    def test_broken_cursor(self):
+        """Мусорный курсор отдаёт первую страницу."""
+        response = self.guest_client.get(
+            reverse('posts:index'), {'cursor': 'garbage'})
+        self.assertEqual(len(response.context['page_obj']), PAGE_COUNT)
+
+
+class WindowedPaginatorTests(TestCase):
+    """Проверка навигации с окном вокруг текущей страницы."""
+
+    def test_page_window(self):
+        self.assertEqual(page_window(1, 1), [1])
+        self.assertEqual(page_window(1, 5), [1, 2, 3, None, 5])
+        self.assertEqual(page_window(50, 100),
+                         [1, None, 48, 49, 50, 51, 52, None, 100])
+        self.assertEqual(page_window(99, 100),
+                         [1, None, 97, 98, 99, 100])
+
+    def test_count_without_query(self):
+        paginator = WindowedPaginator(Post.objects.all(), PAGE_COUNT,
+                                      count=10 ** 6)
+        with self.assertNumQueries(0):
+            self.assertEqual(paginator.num_pages, 10 ** 5)
+
+    def test_navigation_size_is_constant(self):
+        user = User.objects.create_user(username='Nemo')
+        Post.objects.create(text='text', author=user)
+        cache.set('count:posts', PAGE_COUNT * 1000)
+        response = Client().get(reverse('posts:index'), {'page': 500})
+        content = response.content.decode()
+        self.assertIn('?page=1000', content)
+        self.assertIn('?page=502', content)
+        self.assertNotIn('?page=503"', content)
+        self.assertLess(content.count('page-item'), 15)
+
+    def test_posts_total_follows_signals(self):
+        user = User.objects.create_user(username='Nemo')
+        cache.delete('count:posts')
+        self.assertEqual(counters.posts_total(), 0)
+        post = Post.objects.create(text='text', author=user)
+        with self.assertNumQueries(0):
+            self.assertEqual(counters.posts_total(), 1)
+        post.delete()
+        self.assertEqual(counters.posts_total(), 0)
+
+    @override_settings(FEED_COUNT_ESTIMATE=True)
+    def test_estimated_count(self):
+        user = User.objects.create_user(username='Nemo')
+        for i in range(3):
+            Post.objects.create(text=f'text{i}', author=user)
+        with connection.cursor() as db:
+            db.execute('ANALYZE posts_post')
+        self.assertEqual(counters.estimated_count(Post), 3)
+        self.assertEqual(counters.posts_total(), 3)
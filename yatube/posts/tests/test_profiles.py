@@ -0,0 +1,65 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from posts import cache as feed_cache
+from posts.models import Follow, Post
+
+User = get_user_model()
+
+
+class ProfileHeaderTests(TestCase):
+    """Проверка шапки профиля из кэша."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(
+            username='Admin', first_name='Сальвадор', last_name='Дали')
+        cls.reader = User.objects.create_user(username='Nemo')
+        Post.objects.create(text='text', author=cls.author)
+        cls.url = reverse('posts:profile', args=[cls.author.username])
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def test_unknown_user(self):
+        response = self.client.get(
+            reverse('posts:profile', args=['nobody']))
+        self.assertEqual(response.status_code, 404)
+
+    def test_hot_profile_single_query(self):
+        """С шапкой в кэше остаётся только выборка страницы."""
+        self.client.get(self.url)
+        feed_cache.bump(f'author:{self.author.pk}')
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertEqual(response.context['full_name'], 'Сальвадор Дали')
+        self.assertEqual(len(response.context['page_obj']), 1)
+
+    def test_header_invalidated(self):
+        self.client.get(self.url)
+        Post.objects.create(text='text', author=self.author)
+        Follow.objects.create(user=self.reader, author=self.author)
+        response = self.client.get(self.url)
+        self.assertEqual(response.context['posts_numbers'], 2)
+        self.assertEqual(response.context['followers_count'], 1)
+        self.assertEqual(response.context['following_count'], 0)
+        self.author.first_name = 'Гала'
+        self.author.save()
+        response = self.client.get(self.url)
+        self.assertEqual(response.context['full_name'], 'Гала Дали')
+
+    def test_following_flag(self):
+        self.client.force_login(self.reader)
+        response = self.client.get(self.url)
+        self.assertFalse(response.context['following'])
+        self.client.get(
+            reverse('posts:profile_follow', args=[self.author.username]))
+        response = self.client.get(self.url)
+        self.assertTrue(response.context['following'])
+        self.client.get(
+            reverse('posts:profile_unfollow', args=[self.author.username]))
+        response = self.client.get(self.url)
+        self.assertFalse(response.context['following'])
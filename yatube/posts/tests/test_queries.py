@@ -0,0 +1,65 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from posts.models import Comment, Follow, Group, Post
+from posts.views import PAGE_COUNT
+
+
+User = get_user_model()
+
+
+class FeedQueryCountTests(TestCase):
+    """Число запросов страницы не зависит от числа постов на ней."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.reader = User.objects.create_user(username='Nemo')
+        cls.group = Group.objects.create(title='Группа', slug='group')
+        cls.post = cls.add_posts(1)
+        Follow.objects.create(user=cls.reader, author=cls.post.author)
+
+    @classmethod
+    def add_posts(cls, number):
+        author = User.objects.get_or_create(
+            username='Admin', defaults={'first_name': 'Сальвадор'})[0]
+        for i in range(number):
+            post = Post.objects.create(text=f'text{i}', author=author,
+                                       group=cls.group)
+        return post
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def count_queries(self, url):
+        cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(url)
+        return len(context.captured_queries)
+
+    def test_feeds(self):
+        urls = [
+            reverse('posts:index'),
+            reverse('posts:group_list', args=[self.group.slug]),
+            reverse('posts:profile', args=['Admin']),
+            reverse('posts:follow_index'),
+        ]
+        single = [self.count_queries(url) for url in urls]
+        self.add_posts(PAGE_COUNT)
+        for url, expected in zip(urls, single):
+            with self.subTest(url=url):
+                self.assertEqual(self.count_queries(url), expected)
+
+    def test_post_detail_comments(self):
+        url = reverse('posts:post_detail', args=[self.post.pk])
+        Comment.objects.create(post=self.post, author=self.reader, text='к')
+        expected = self.count_queries(url)
+        for i in range(PAGE_COUNT):
+            commenter = User.objects.create_user(username=f'user{i}')
+            Comment.objects.create(post=self.post, author=commenter,
+                                   text='к')
+        self.assertEqual(self.count_queries(url), expected)
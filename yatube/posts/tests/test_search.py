@@ -0,0 +1,78 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from posts.models import Comment, Post
+from posts.search import get_backend
+from posts.stemmer import stem
+
+
+User = get_user_model()
+
+
+class StemmerTests(TestCase):
+    def test_word_forms(self):
+        """Разные формы слова сводятся к одной основе."""
+        for word in ('кошки', 'кошкам', 'кошку', 'Кошкой'):
+            with self.subTest(word=word):
+                self.assertEqual(stem(word), 'кошк')
+
+
+class SearchTests(TestCase):
+    """Проверка полнотекстового поиска по постам и комментариям."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Nemo')
+        cls.cats = Post.objects.create(text='Про кошек и кошкам',
+                                       author=cls.user)
+        cls.dogs = Post.objects.create(text='Про собак', author=cls.user)
+        Comment.objects.create(post=cls.dogs, author=cls.user,
+                               text='А у соседа живут кошки')
+
+    def search(self, query, **params):
+        response = Client().get(reverse('posts:search'),
+                                {'q': query, **params})
+        return response.context['page_obj']
+
+    def test_post_and_comment_match(self):
+        """Находятся посты по тексту и по комментариям."""
+        found = list(self.search('кошку'))
+        self.assertEqual(set(found), {self.cats, self.dogs})
+        self.assertEqual(found[0], self.cats)
+        self.assertEqual(list(self.search('собаки')), [self.dogs])
+        self.assertEqual(list(self.search('жирафы')), [])
+
+    @override_settings(SEARCH_CANDIDATES=1)
+    def test_candidates_limit(self):
+        """Ранжируются не больше SEARCH_CANDIDATES совпадений."""
+        self.assertEqual(len(self.search('кошку')), 1)
+
+    def test_sync_on_edit_and_delete(self):
+        """Индекс следует за изменениями поста."""
+        self.dogs.text = 'Про жирафов'
+        self.dogs.save()
+        self.assertEqual(list(self.search('жираф')), [self.dogs])
+        self.dogs.delete()
+        self.assertEqual(list(self.search('кошки')), [self.cats])
+
+    def test_cursor(self):
+        """Курсор продолжает выдачу без повторов."""
+        for i in range(5):
+            Post.objects.create(text=f'кошка номер {i}', author=self.user)
+        ids, cursor = get_backend().search('кошки', limit=4)
+        rest, last = get_backend().search('кошки', cursor, limit=4)
+        self.assertEqual(len(ids), 4)
+        self.assertEqual(len(rest), 3)
+        self.assertIsNone(last)
+        self.assertFalse(set(ids) & set(rest))
+
+    def test_rebuild_command(self):
+        """Команда восстанавливает индекс после очистки."""
+        get_backend().clear()
+        self.assertEqual(list(self.search('собак')), [])
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual(list(self.search('собак')), [self.dogs])
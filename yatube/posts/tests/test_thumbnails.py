@@ -0,0 +1,95 @@
+import shutil
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from posts import thumbnails
+from posts.models import Post, ThumbnailJob
+
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+User = get_user_model()
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, THUMBNAIL_ASYNC=True)
+class AsyncThumbnailTests(TestCase):
+    """Миниатюры не создаются в потоке запроса."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Nemo')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.post = Post.objects.create(
+            text='Пост с картинкой',
+            author=self.user,
+            image=SimpleUploadedFile('small.gif', SMALL_GIF, 'image/gif')
+        )
+        self.url = reverse('posts:post_detail', args=[self.post.pk])
+
+    def test_placeholder_until_ready(self):
+        """Пока воркер не отработал, страница показывает заглушку."""
+        self.assertTrue(ThumbnailJob.objects.filter(
+            image=self.post.image.name).exists())
+        response = Client().get(self.url)
+        self.assertContains(response, settings.THUMBNAIL_DUMMY_SOURCE)
+        out = StringIO()
+        call_command('process_thumbnails', stdout=out)
+        self.assertIn('Обработано картинок: 1', out.getvalue())
+        self.assertFalse(ThumbnailJob.objects.exists())
+        response = Client().get(self.url)
+        self.assertNotContains(response, settings.THUMBNAIL_DUMMY_SOURCE)
+        self.assertContains(response, settings.MEDIA_URL + 'cache/')
+
+    @override_settings(THUMBNAIL_ASYNC=False)
+    def test_synchronous_mode(self):
+        """При THUMBNAIL_ASYNC = False миниатюра создаётся сразу."""
+        response = Client().get(self.url)
+        self.assertNotContains(response, settings.THUMBNAIL_DUMMY_SOURCE)
+
+    def test_stale_job_reclaimed(self):
+        """Задание упавшего воркера берётся снова после таймаута."""
+        started = timezone.now()
+        ThumbnailJob.objects.update(started=started)
+        self.assertEqual(thumbnails.process(), 0)
+        ThumbnailJob.objects.update(
+            started=started - timezone.timedelta(
+                seconds=settings.THUMBNAIL_JOB_TIMEOUT + 1))
+        self.assertEqual(thumbnails.process(), 1)
+        self.assertFalse(ThumbnailJob.objects.exists())
+
+    @override_settings(THUMBNAIL_JOB_ATTEMPTS=2)
+    def test_failed_job_retried_then_dropped(self):
+        """Ошибка возвращает задание в очередь, последняя — удаляет."""
+        ThumbnailJob.objects.all().delete()
+        ThumbnailJob.objects.create(image='posts/missing.gif')
+        with self.assertLogs('posts.thumbnails', 'ERROR'):
+            self.assertEqual(thumbnails.process(), 1)
+        job = ThumbnailJob.objects.get()
+        self.assertIsNone(job.started)
+        self.assertEqual(job.attempts, 1)
+        with self.assertLogs('posts.thumbnails', 'ERROR'):
+            self.assertEqual(thumbnails.process(), 1)
+        self.assertFalse(ThumbnailJob.objects.exists())
@@ -0,0 +1,113 @@
+import shutil
+import tempfile
+from io import BytesIO
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.template.defaultfilters import filesizeformat
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+from posts.cache import generations
+from posts.forms import PostForm
+from posts.models import Post
+from posts.uploads import normalize
+
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+User = get_user_model()
+
+
+def make_image(size, image_format='PNG', **params):
+    buffer = BytesIO()
+    image = Image.new('RGBA', size, (255, 0, 0, 128))
+    if image_format == 'JPEG':
+        image = image.convert('RGB')
+    image.save(buffer, image_format, **params)
+    return buffer.getvalue()
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ImageUploadTests(TestCase):
+    """Проверка лимитов и нормализации загружаемых картинок."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Nemo')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def create(self, content, name='pic.png'):
+        image = SimpleUploadedFile(name, content)
+        return self.client.post(reverse('posts:post_create'),
+                                {'text': 'Текст', 'image': image})
+
+    @override_settings(POST_IMAGE_MAX_BYTES=100)
+    def test_too_many_bytes(self):
+        """Файл больше лимита отклоняется формой."""
+        response = self.create(make_image((200, 200)) + b'\0' * 100)
+        self.assertFormError(response, 'form', 'image',
+                             f'Файл больше {filesizeformat(100)}')
+        self.assertFalse(Post.objects.exists())
+
+    @override_settings(POST_IMAGE_MAX_PIXELS=100)
+    def test_too_many_pixels(self):
+        """Разрешение больше лимита отклоняется по заголовку."""
+        response = self.create(make_image((20, 20)))
+        self.assertFormError(response, 'form', 'image',
+                             'Слишком большое разрешение: 20×20')
+        self.assertFalse(Post.objects.exists())
+
+    @override_settings(POST_IMAGE_MAX_EDGE=50)
+    def test_normalize(self):
+        """Оригинал пережимается в JPEG с ограничением по стороне."""
+        self.create(make_image((200, 100)))
+        post = Post.objects.get()
+        old_name = post.image.name
+        new_name = normalize(old_name)
+        post.refresh_from_db()
+        self.assertEqual(post.image.name, new_name)
+        self.assertTrue(new_name.endswith('.jpg'))
+        with post.image.open() as image_file:
+            image = Image.open(image_file)
+            self.assertEqual(image.format, 'JPEG')
+            self.assertEqual(image.size, (50, 25))
+        self.assertEqual(normalize(new_name), new_name)
+
+    def test_normalize_strips_metadata(self):
+        """Метаданные снимаются и у картинки подходящего формата."""
+        self.create(make_image((20, 20), 'JPEG', icc_profile=b'icc' * 10),
+                    'pic.jpg')
+        cache.clear()
+        before = generations('posts')
+        new_name = normalize(Post.objects.get().image.name)
+        with Post.objects.get().image.open() as image_file:
+            self.assertNotIn('icc_profile', Image.open(image_file).info)
+        self.assertEqual(Post.objects.get().image.name, new_name)
+        self.assertNotEqual(generations('posts'), before)
+
+    @override_settings(THUMBNAIL_ASYNC=False)
+    def test_normalize_without_worker(self):
+        """Без воркера картинка пережимается после коммита поста."""
+        with mock.patch('django.db.transaction.on_commit',
+                        lambda func: func()):
+            self.create(make_image((20, 20)))
+        self.assertTrue(Post.objects.get().image.name.endswith('.jpg'))
+
+    def test_form_positional_files(self):
+        """Файлы передаются форме так же, как любой ModelForm."""
+        image = SimpleUploadedFile('pic.png', make_image((20, 20)))
+        form = PostForm({'text': 'Текст'}, {'image': image})
+        self.assertTrue(form.is_valid(), form.errors)
+        self.assertIs(form.cleaned_data['image'], image)
@@ -264,22 +264,41 @@ class CasheTests(TestCase):
         )
 
     def setUp(self):
+        cache.clear()
         self.authorized_client = Client()
         self.authorized_client.force_login(self.user)
 
     def test_cache_index(self):
         """Тест кеша главной страницы."""
 
+        cache.clear()
+        response = self.authorized_client.get(reverse('posts:index'))
+        key = response.context['cache_key']
+        response_cashe = self.authorized_client.get(reverse('posts:index'))
+        self.assertEqual(key, response_cashe.context['cache_key'])
+        self.assertEqual(response.content, response_cashe.content)
+
+    def test_cache_index_invalidated(self):
+        """Удаление поста сразу сбрасывает кеш главной страницы."""
+
         response = self.authorized_client.get(
             reverse('posts:index')).content
         self.post_cashe.delete()
-        response_cashe = self.authorized_client.get(
-            reverse('posts:index')).content
-        self.assertEqual(response, response_cashe)
-        cache.clear()
-        response_clear = self.authorized_client.get(
+        response_deleted = self.authorized_client.get(
             reverse('posts:index')).content
-        self.assertNotEqual(response, response_clear)
+        self.assertNotEqual(response, response_deleted)
+
+    def test_cache_pages_differ(self):
+        """Каждая страница ленты кешируется под своим ключом."""
+
+        for x in range(PAGE_COUNT):
+            Post.objects.create(author=self.user, text=f'text{x}')
+        first = self.authorized_client.get(reverse('posts:index'))
+        second = self.authorized_client.get(
+            reverse('posts:index'), {'page': 2})
+        self.assertNotEqual(first.context['cache_key'],
+                            second.context['cache_key'])
+        self.assertIn('Тест кеш', second.content.decode())
 
 
 class Follow_Unfollow_Tests(TestCase):
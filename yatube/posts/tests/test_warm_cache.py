@@ -0,0 +1,79 @@
+import shutil
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache, caches
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from posts import cache as generations_cache
+from posts.models import Group, Post
+
+
+User = get_user_model()
+
+
+class WarmCacheTests(TestCase):
+    """Проверка команды прогрева кэша."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Nemo')
+        cls.group = Group.objects.create(title='Группа', slug='group')
+        Post.objects.create(text='Тест', author=cls.user, group=cls.group)
+
+    def test_warm_cache(self):
+        """После прогрева лента отдаётся из кэша без запроса постов."""
+        cache.clear()
+        out = StringIO()
+        call_command('warm_cache', '--pages=2', '--profiles=1', stdout=out)
+        self.assertIn('Прогрето страниц: 6', out.getvalue())
+        Post.objects.filter(author=self.user).update(text='Изменён')
+        response = Client().get(reverse('posts:group_list',
+                                        args=[self.group.slug]))
+        self.assertIn('Тест', response.content.decode())
+
+    @override_settings(ALLOWED_HOSTS=['.yatube.example', 'localhost'])
+    def test_prod_hosts(self):
+        """Прогрев с боевыми ALLOWED_HOSTS отдаётся настоящим гостям."""
+        cache.clear()
+        call_command('warm_cache', '--pages=1', stdout=StringIO())
+        url = reverse('posts:group_list', args=[self.group.slug])
+        with self.assertNumQueries(0):
+            response = Client().get(url, HTTP_HOST='www.yatube.example')
+        self.assertIn('Тест', response.content.decode())
+
+
+class SharedCacheBackendTests(WarmCacheTests):
+    """Прогрев и поколения на общем для процессов бэкенде вместо locmem."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.cache_dir = tempfile.mkdtemp()
+        cls.cache_settings = override_settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': cls.cache_dir,
+        }})
+        cls.cache_settings.enable()
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls.cache_settings.disable()
+        shutil.rmtree(cls.cache_dir, ignore_errors=True)
+
+    def test_backend(self):
+        self.assertIsInstance(caches['default'], FileBasedCache)
+
+    def test_bump(self):
+        """Сдвиг меняет только своё поколение."""
+        cache.clear()
+        posts, groups = generations_cache.generations('posts', 'groups')
+        generations_cache.bump('posts')
+        bumped, same = generations_cache.generations('posts', 'groups')
+        self.assertGreater(bumped, posts)
+        self.assertEqual(same, groups)
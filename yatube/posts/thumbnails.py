@@ -0,0 +1,168 @@
+import logging
+
+from django.conf import settings
+from django.core.cache import cache as django_cache
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from sorl.thumbnail import default
+from sorl.thumbnail.base import ThumbnailBackend
+from sorl.thumbnail.conf import defaults as sorl_defaults
+from sorl.thumbnail.conf import settings as sorl_settings
+from sorl.thumbnail.images import DummyImageFile, ImageFile
+
+from . import cache, uploads
+from .models import ThumbnailJob
+
+logger = logging.getLogger(__name__)
+
+# Размеры, в которых шаблоны posts показывают картинку поста.
+THUMBNAIL_SIZES = (
+    ('960x339', {'crop': 'center', 'upscale': True}),
+)
+QUEUED_KEY = 'thumbnail-queued:'
+
+
+def is_async():
+    return getattr(settings, 'THUMBNAIL_ASYNC', False)
+
+
+def job_timeout():
+    return getattr(settings, 'THUMBNAIL_JOB_TIMEOUT', 60 * 5)
+
+
+def job_attempts():
+    return getattr(settings, 'THUMBNAIL_JOB_ATTEMPTS', 3)
+
+
+def enqueue(name):
+    """Ставит картинку в очередь; повторы отсекаются кэшем и UNIQUE."""
+    if django_cache.add(QUEUED_KEY + name, True, 60 * 10):
+        ThumbnailJob.objects.bulk_create([ThumbnailJob(image=name)],
+                                         ignore_conflicts=True)
+
+
+class AsyncThumbnailBackend(ThumbnailBackend):
+    """
+    Бэкенд sorl, который не создаёт миниатюры в потоке запроса.
+
+    Готовая миниатюра берётся из key-value store, иначе картинка
+    ставится в очередь ThumbnailJob для `manage.py process_thumbnails`,
+    а шаблон получает заглушку THUMBNAIL_DUMMY_SOURCE.
+    При THUMBNAIL_ASYNC = False миниатюры создаются прямо в запросе.
+    """
+
+    def thumbnail_name(self, file_, geometry_string, options):
+        source = ImageFile(file_)
+        options = dict(options)
+        if sorl_settings.THUMBNAIL_PRESERVE_FORMAT:
+            options.setdefault('format', self._get_format(source))
+        for key, value in self.default_options.items():
+            options.setdefault(key, value)
+        for key, attr in self.extra_options:
+            value = getattr(sorl_settings, attr)
+            if value != getattr(sorl_defaults, attr):
+                options.setdefault(key, value)
+        return self._get_thumbnail_filename(source, geometry_string, options)
+
+    def get_thumbnail(self, file_, geometry_string, **options):
+        if not is_async():
+            return super().get_thumbnail(file_, geometry_string, **options)
+        if not file_:
+            raise ValueError('falsey file_ argument in get_thumbnail()')
+        name = self.thumbnail_name(file_, geometry_string, options)
+        cached = default.kvstore.get(ImageFile(name, default.storage))
+        if cached:
+            return cached
+        enqueue(getattr(file_, 'name', file_))
+        return DummyImageFile(geometry_string)
+
+
+def normalize_enabled():
+    return getattr(settings, 'POST_IMAGE_NORMALIZE', True)
+
+
+def pregenerate(image):
+    """
+    Ставит картинку в очередь воркера миниатюр. Без THUMBNAIL_ASYNC
+    миниатюры создаются в запросе, а картинка пережимается сразу после
+    коммита поста.
+    """
+    if not image:
+        return
+    if is_async():
+        enqueue(image.name)
+    elif normalize_enabled():
+        name = image.name
+        transaction.on_commit(lambda: _normalize_quietly(name))
+
+
+def _normalize_quietly(name):
+    # Пост уже сохранён: ошибка картинки не должна ронять запрос.
+    try:
+        uploads.normalize(name)
+    except Exception:
+        logger.exception('Не удалось пережать картинку %s', name)
+
+
+def generate(name):
+    """Синхронно создаёт все миниатюры картинки."""
+    backend = ThumbnailBackend()
+    for geometry_string, options in THUMBNAIL_SIZES:
+        backend.get_thumbnail(name, geometry_string, **options)
+
+
+def _claimable():
+    """Свободные задания и те, чей воркер не уложился в таймаут."""
+    expired = timezone.now() - timezone.timedelta(seconds=job_timeout())
+    return ThumbnailJob.objects.filter(
+        Q(started__isnull=True) | Q(started__lt=expired))
+
+
+def _claim(job):
+    # UPDATE по тому started, что был прочитан: из двух воркеров
+    # задание достанется одному.
+    return ThumbnailJob.objects.filter(
+        pk=job.pk, started=job.started).update(
+        started=timezone.now(), attempts=F('attempts') + 1)
+
+
+def _fail(job):
+    """Возвращает задание в очередь, после job_attempts() — удаляет."""
+    if job.attempts + 1 < job_attempts():
+        ThumbnailJob.objects.filter(pk=job.pk).update(started=None)
+    else:
+        job.delete()
+
+
+def process(batch_size=20):
+    """
+    Обрабатывает очередь миниатюр, возвращает число взятых заданий.
+    Перед созданием миниатюр картинка пережимается uploads.normalize.
+
+    Задание сначала захватывается UPDATE по прочитанному started,
+    поэтому несколько воркеров не делают одну работу дважды. Задание
+    упавшего воркера снова берётся через THUMBNAIL_JOB_TIMEOUT секунд,
+    ошибка возвращает его в очередь; после THUMBNAIL_JOB_ATTEMPTS
+    попыток задание удаляется, и картинку можно поставить заново.
+    """
+    handled = ready = 0
+    for job in list(_claimable().order_by('pk')[:batch_size]):
+        if not _claim(job):
+            continue
+        handled += 1
+        try:
+            name = job.image
+            if normalize_enabled():
+                name = uploads.normalize(name)
+            generate(name)
+        except Exception:
+            logger.exception('Не удалось создать миниатюру %s', job.image)
+            _fail(job)
+            continue
+        ready += 1
+        job.delete()
+    if ready:
+        # Ленты могли закэшировать заглушку вместо этих миниатюр.
+        cache.bump('thumbnails')
+    return handled
@@ -0,0 +1,115 @@
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler
+from PIL import Image, ImageOps
+
+from . import cache
+from .models import Post
+
+EXTENSIONS = {
+    'JPEG': '.jpg',
+    'WEBP': '.webp',
+}
+# Что Pillow сам пишет в JPEG и WebP; всё прочее в info (EXIF, ICC,
+# XMP, текст PNG, комментарии) — метаданные загрузившего.
+ENCODER_INFO = {'jfif', 'jfif_version', 'jfif_unit', 'jfif_density', 'dpi',
+                'loop', 'background'}
+
+
+def max_bytes():
+    return getattr(settings, 'POST_IMAGE_MAX_BYTES', 10 * 1024 * 1024)
+
+
+class OversizedUploadedFile(UploadedFile):
+    """Заглушка вместо файла, который превысил POST_IMAGE_MAX_BYTES."""
+
+    too_large = True
+
+    def __init__(self, name, content_type, size, charset):
+        super().__init__(BytesIO(), name, content_type, size, charset)
+
+
+class SizeLimitUploadHandler(FileUploadHandler):
+    """
+    Обрывает приём файла, как только он превысил POST_IMAGE_MAX_BYTES.
+
+    Стоит первым в FILE_UPLOAD_HANDLERS: пока лимит не превышен, куски
+    уходят дальше (в память или во временный файл), после этого
+    отбрасываются, а форма получает OversizedUploadedFile.
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.received = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > max_bytes():
+            return None
+        return raw_data
+
+    def file_complete(self, file_size):
+        if self.received > max_bytes():
+            return OversizedUploadedFile(
+                self.file_name, self.content_type, self.received,
+                self.charset
+            )
+        return None
+
+
+def _flatten(image):
+    if image.mode in ('RGB', 'L'):
+        return image
+    image = image.convert('RGBA')
+    background = Image.new('RGB', image.size, 'white')
+    background.paste(image, mask=image.getchannel('A'))
+    return background
+
+
+def normalized(image, image_format, max_edge):
+    """Картинка уже в норме: формат, размер и никаких метаданных."""
+    return (image.format == image_format
+            and max(image.size) <= max_edge
+            and set(image.info) <= ENCODER_INFO)
+
+
+def normalize(name):
+    """
+    Пережимает картинку поста: без метаданных, не больше
+    POST_IMAGE_MAX_EDGE по длинной стороне, в формате POST_IMAGE_FORMAT.
+
+    Возвращает имя нового файла или прежнее, если картинка уже в норме.
+    """
+    max_edge = getattr(settings, 'POST_IMAGE_MAX_EDGE', 1920)
+    image_format = getattr(settings, 'POST_IMAGE_FORMAT', 'JPEG')
+    with default_storage.open(name) as source:
+        image = Image.open(source)
+        if normalized(image, image_format, max_edge):
+            return name
+        image.draft('RGB', (max_edge, max_edge))
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((max_edge, max_edge))
+        if image_format == 'JPEG':
+            image = _flatten(image)
+        # Некоторые кодеры Pillow берут ICC и EXIF из info.
+        image.info = {}
+        buffer = BytesIO()
+        image.save(buffer, image_format, quality=85, optimize=True)
+    new_name = default_storage.save(
+        os.path.splitext(name)[0] + EXTENSIONS[image_format],
+        ContentFile(buffer.getvalue())
+    )
+    posts = list(Post.objects.filter(image=name).only(
+        'pk', 'author_id', 'group_id'))
+    Post.objects.filter(image=name).update(image=new_name)
+    # update() идёт мимо сигналов: страницы со старым именем сбрасываются
+    # здесь.
+    for post in posts:
+        cache.bump_post(post)
+    default_storage.delete(name)
+    return new_name
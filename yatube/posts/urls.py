@@ -1,5 +1,5 @@
 from django.urls import path
-from . import views
+from . import api, views
 
 
 app_name = 'posts'
@@ -20,10 +20,24 @@ urlpatterns = [
          views.post_create, name='post_create'),
     path('posts/<int:post_id>/comment/',
          views.add_comment, name='add_comment'),
+    path('posts/<int:post_id>/comments/',
+         views.post_comments, name='post_comments'),
+    path('search/',
+         views.search, name='search'),
     path('follow/',
          views.follow_index, name='follow_index'),
     path('profile/<str:username>/follow/',
          views.profile_follow, name='profile_follow'),
     path('profile/<str:username>/unfollow/',
          views.profile_unfollow, name='profile_unfollow'),
+    path('api/posts/',
+         api.index, name='api_index'),
+    path('api/group/<slug:slug>/',
+         api.group_posts, name='api_group_list'),
+    path('api/profile/<str:username>/',
+         api.profile, name='api_profile'),
+    path('api/posts/<int:post_id>/',
+         api.post_detail, name='api_post_detail'),
+    path('api/follow/',
+         api.follow_index, name='api_follow_index'),
 ]
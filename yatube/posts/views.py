@@ -1,71 +1,151 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
-from .models import Post, Group, User, Comment, Follow
-from django.core.paginator import Paginator
+from core.page_cache import cached_page
+from core.routers import read_only
+from .models import Post, User, Comment, Follow
 from .forms import PostForm, CommentForm
+from . import ingest, ratelimit
+from .cache import (feed_cache, page_validators, post_author,
+                    remember_post_author)
+from .counters import author_posts_count, group_posts_count, posts_total
+from .feed import follow_feed, follow_feed_count, load_posts
+from .groups import get_group
+from .paginators import CursorPage, CursorPaginator, paginate
+from .profiles import followed_ids, profile_header
+from .search import get_backend as search_backend
 
 
 PAGE_COUNT = 10
+COMMENTS_PAGE_COUNT = 20
 
 
+def _group_validators(request, slug):
+    return page_validators(request, f'group:{get_group(slug).pk}',
+                           'groups', 'thumbnails')
+
+
+def _profile_validators(request, username):
+    header = profile_header(username)
+    return page_validators(
+        request, f'author:{header["author"].pk}', 'groups', 'thumbnails',
+        extra=[header[key] for key in ('full_name', 'posts_numbers',
+                                       'followers_count',
+                                       'following_count')])
+
+
+def _post_validators(request, post_id):
+    # Рядом с постом показано число постов автора, а картинка поста —
+    # миниатюрой, которую воркер может дорисовать позже.
+    author_id = post_author(post_id)
+    if author_id is None:
+        return None
+    return page_validators(request, f'post:{post_id}',
+                           f'author:{author_id}', 'groups', 'thumbnails')
+
+
+@read_only
+@cached_page(lambda request: page_validators(
+    request, 'posts', 'groups', 'thumbnails'))
 def index(request):
-    posts = Post.objects.select_related('group')
-    paginator = Paginator(posts, PAGE_COUNT)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    posts = Post.objects.for_feed()
+    page_obj = paginate(request, posts, PAGE_COUNT, count=posts_total)
     context = {'page_obj': page_obj}
+    context.update(feed_cache(request, 'index', page_obj,
+                              'posts', 'groups', 'thumbnails'))
     return render(request, 'posts/index.html', context)
 
 
+@read_only
+@cached_page(_group_validators)
 def group_posts(request, slug):
-    group = get_object_or_404(Group, slug=slug)
-    posts = Post.objects.filter(group=group)
-    paginator = Paginator(posts, PAGE_COUNT)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    group = get_group(slug)
+    posts = Post.objects.for_feed().filter(group_id=group.pk)
+    page_obj = paginate(request, posts, PAGE_COUNT,
+                        count=group_posts_count(group.pk))
 
     return render(request, 'posts/group_list.html', {
         'group': group,
         'page_obj': page_obj,
+        **feed_cache(request, 'group', page_obj,
+                     f'group:{group.pk}', 'groups', 'thumbnails'),
     }
     )
 
 
+@read_only
+@cached_page(_profile_validators)
 def profile(request, username):
-    author = User.objects.get(username=username)
-    author_post = Post.objects.filter(author=author)
-    posts_numbers = author_post.count()
-    paginator = Paginator(author_post, PAGE_COUNT)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-
-    following = request.user.is_authenticated and Follow.objects.filter(
-        user=request.user, author=author
-    ).exists()
-
-    context = {
-        'author': author,
-        'posts_numbers': posts_numbers,
-        'page_obj': page_obj,
-        'following': following,
-    }
+    header = profile_header(username)
+    author_post = Post.objects.for_feed().filter(author=header['author'])
+    page_obj = paginate(request, author_post, PAGE_COUNT,
+                        count=header['posts_numbers'])
+
+    following = (request.user.is_authenticated
+                 and header['author'].pk in followed_ids(request.user))
+
+    context = dict(header, page_obj=page_obj, following=following)
+    context.update(feed_cache(request, 'profile', page_obj,
+                              f'author:{header["author"].pk}', 'groups',
+                              'thumbnails'))
     return render(request, 'posts/profile.html', context)
 
 
+@read_only
+@cached_page(_post_validators)
 def post_detail(request, post_id):
-    post = Post.objects.get(id=post_id)
-    posts_numbers = Post.objects.filter(author=post.author).count()
+    post = Post.objects.select_related(
+        'author__post_stats').with_groups().get(id=post_id)
+    remember_post_author(post)
+    posts_numbers = author_posts_count(post.author)
     form = CommentForm()
-    comments = Comment.objects.filter(post=post)
+    comments = comments_page(post.pk, request.GET.get('comments'))
     context = {
         'post': post,
         'posts_numbers': posts_numbers,
         'form': form,
-        'comments': comments
+        'comments': comments,
     }
+    context.update(feed_cache(request, 'comments', comments,
+                              f'post:{post.pk}'))
     return render(request, 'posts/post_detail.html', context)
 
 
+def comments_page(post_id, cursor):
+    """Страница комментариев поста от старых к новым."""
+    comments = Comment.objects.filter(post_id=post_id).with_authors()
+    paginator = CursorPaginator(comments, COMMENTS_PAGE_COUNT,
+                                keys=('created', 'pk'), descending=False)
+    return paginator.get_page(cursor)
+
+
+@read_only
+def post_comments(request, post_id):
+    """Фрагмент со следующей страницей комментариев."""
+    comments = comments_page(post_id, request.GET.get('cursor'))
+    context = {'post_id': post_id, 'comments': comments}
+    context.update(feed_cache(request, 'comments', comments,
+                              f'post:{post_id}'))
+    return render(request, 'posts/includes/comment_list.html', context)
+
+
+@read_only
+def search(request):
+    """Поиск по постам и комментариям."""
+
+    query = request.GET.get('q', '').strip()
+    post_ids, next_cursor = [], None
+    if query:
+        post_ids, next_cursor = search_backend().search(
+            query, request.GET.get('cursor'), PAGE_COUNT)
+    found = Post.objects.for_feed().in_bulk(post_ids)
+    posts = [found[pk] for pk in post_ids if pk in found]
+    context = {
+        'query': query,
+        'page_obj': CursorPage(posts, None, next_cursor, None),
+    }
+    return render(request, 'posts/search.html', context)
+
+
 @login_required
 def post_create(request):
     form = PostForm(
@@ -101,24 +181,30 @@ def post_edit(request, post_id):
 
 @login_required
 def add_comment(request, post_id):
-    post = get_object_or_404(Post, id=post_id)
+    post = get_object_or_404(Post.objects.only('pub_date'), id=post_id)
+    if request.method == 'POST' and not ratelimit.allow_comment(request):
+        return render(request, 'core/429.html', {'path': request.path},
+                      status=429)
     form = CommentForm(request.POST)
     if form.is_valid():
         comment = form.save(commit=False)
         comment.author = request.user
         comment.post = post
-        comment.save()
+        ingest.submit(comment)
     return redirect('posts:post_detail', post_id=post_id)
 
 
+@read_only
 @login_required
 def follow_index(request):
-    posts = Post.objects.select_related('author').filter(
-        author__following__user=request.user)
-    paginator = Paginator(posts, PAGE_COUNT)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    entries = follow_feed(request.user)
+    page_obj = load_posts(paginate(
+        request, entries, PAGE_COUNT, keys=('pub_date', 'post_id'),
+        count=lambda: follow_feed_count(request.user, entries)))
     context = {'page_obj': page_obj}
+    context.update(feed_cache(
+        request, f'follow:{request.user.pk}', page_obj,
+        'posts', 'groups', 'thumbnails', f'follow:{request.user.pk}'))
     return render(request, 'posts/follow.html', context)
 
 
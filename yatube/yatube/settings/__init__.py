@@ -0,0 +1,17 @@
+"""
+Настройки выбираются переменной окружения YATUBE_ENV:
+dev (по умолчанию), prod или bench. Модуль окружения можно указать
+и напрямую: DJANGO_SETTINGS_MODULE=yatube.settings.prod.
+"""
+import os
+
+YATUBE_ENV = os.getenv('YATUBE_ENV', 'dev')
+
+if YATUBE_ENV == 'prod':
+    from .prod import *  # noqa: F401,F403
+elif YATUBE_ENV == 'bench':
+    from .bench import *  # noqa: F401,F403
+elif YATUBE_ENV == 'dev':
+    from .dev import *  # noqa: F401,F403
+else:
+    raise ValueError(f'Неизвестное окружение YATUBE_ENV={YATUBE_ENV}')
@@ -0,0 +1,309 @@
+"""
+Django settings for yatube project.
+
+Общие настройки всех окружений; dev, prod и bench дополняют их.
+
+Generated by 'django-admin startproject' using Django 2.2.19.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/2.2/topics/settings/
+
+For the full list of settings and their values, see
+https://docs.djangoproject.com/en/2.2/ref/settings/
+"""
+
+import os
+
+# Build paths inside the project like this: os.path.join(BASE_DIR, ...)
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))))
+
+
+# Quick-start development settings - unsuitable for production
+# See https://docs.djangoproject.com/en/2.2/howto/deployment/checklist/
+
+# SECURITY WARNING: keep the secret key used in production secret!
+SECRET_KEY = os.getenv(
+    'YATUBE_SECRET_KEY', 'kb&p7^c)hws^@zzlu6)l)j%%n8p%dx&5(n2dt6#(o7(qp%fy@3')
+
+# SECURITY WARNING: don't run with debug turned on in production!
+DEBUG = False
+
+ALLOWED_HOSTS = [
+    'localhost',
+    '127.0.0.1',
+    '[::1]',
+    'testserver',
+]
+
+DEFAULT_AUTO_FIELD='django.db.models.AutoField'
+
+LOGIN_URL = 'users:login'
+LOGIN_REDIRECT_URL = 'posts:index'
+
+# Application definition
+
+INSTALLED_APPS = [
+    'posts.apps.PostsConfig',  # Добавлена запись приложения posts
+    'about.apps.AboutConfig',
+    'users.apps.UsersConfig',
+    'core.apps.CoreConfig',
+    'django.contrib.admin',
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+    'sorl.thumbnail',
+]
+
+MIDDLEWARE = [
+    'core.instrumentation.InstrumentationMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.routers.ReplicaMiddleware',
+]
+
+ROOT_URLCONF = 'yatube.urls'
+
+TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [TEMPLATES_DIR],
+        'APP_DIRS': True,
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.debug',
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+                'core.context_processors.year.year',
+            ],
+        },
+    },
+]
+
+WSGI_APPLICATION = 'yatube.wsgi.application'
+
+
+# Database
+# https://docs.djangoproject.com/en/2.2/ref/settings/#databases
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+    }
+}
+
+# Локальная реплика для чтения: копия db.sqlite3, которую обновляет
+# manage.py sync_replicas; в тестах это то же соединение, что default
+if os.getenv('YATUBE_REPLICA'):
+    DATABASES['replica'] = dict(
+        DATABASES['default'],
+        NAME=os.path.join(BASE_DIR, 'db.replica.sqlite3'),
+        TEST={'MIRROR': 'default'},
+    )
+
+
+# Password validation
+# https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
+
+AUTH_PASSWORD_VALIDATORS = [
+    {
+        'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.CommonPasswordValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator',
+    },
+]
+
+
+# Internationalization
+# https://docs.djangoproject.com/en/2.2/topics/i18n/
+
+LANGUAGE_CODE = 'ru'
+
+TIME_ZONE = 'UTC'
+
+USE_I18N = True
+
+USE_L10N = True
+
+USE_TZ = True
+
+
+# Static files (CSS, JavaScript, Images)
+# https://docs.djangoproject.com/en/2.2/howto/static-files/
+
+STATIC_URL = '/static/'
+STATICFILES_DIRS = (os.path.join(BASE_DIR, 'static'),)
+
+# Подключение локальной почты для тестов
+EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
+CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
+MEDIA_URL = '/media/'
+MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+# Кэш выбирается переменной окружения YATUBE_CACHE. locmem живёт внутри
+# одного процесса; file и db общие для всех воркеров gunicorn и не
+# требуют внешних сервисов (для db нужен `manage.py createcachetable`);
+# memcached и redis ждут адрес сервера в YATUBE_CACHE_LOCATION
+# (клиенты python-memcached и django-redis — в requirements-cache.txt).
+CACHE_BACKENDS = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'yatube',
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv('YATUBE_CACHE_LOCATION',
+                              os.path.join(BASE_DIR, 'cache')),
+        'OPTIONS': {'MAX_ENTRIES': 100000},
+    },
+    'db': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': os.getenv('YATUBE_CACHE_LOCATION', 'yatube_cache'),
+        'OPTIONS': {'MAX_ENTRIES': 100000},
+    },
+    'memcached': {
+        'BACKEND': 'django.core.cache.backends.memcached.MemcachedCache',
+        'LOCATION': os.getenv('YATUBE_CACHE_LOCATION', '127.0.0.1:11211'),
+    },
+    'redis': {
+        'BACKEND': 'django_redis.cache.RedisCache',
+        'LOCATION': os.getenv('YATUBE_CACHE_LOCATION',
+                              'redis://127.0.0.1:6379/1'),
+    },
+}
+CACHES = {
+    'default': CACHE_BACKENDS[os.getenv('YATUBE_CACHE', 'locmem')],
+}
+
+# Режим пагинации лент: 'page' (?page=N) или 'cursor' (keyset по pub_date, id)
+POSTS_PAGINATION = 'page'
+
+# Лента подписок: посты авторов с числом подписчиков больше лимита
+# читаются при запросе, остальные раскладываются по лентам при публикации.
+# Раскладка возвращается, когда подписчиков не больше второго порога
+FEED_FANOUT_MAX_FOLLOWERS = 1000
+FEED_FANOUT_RESTORE_FOLLOWERS = 500
+# Сколько последних постов автора попадает в ленту сразу после подписки
+FEED_BACKFILL_LIMIT = 200
+
+# Время жизни фрагментов лент: они сбрасываются сигналами, а не по таймеру
+FEED_CACHE_TIMEOUT = 60 * 60 * 6
+# Число постов для навигации по страницам пересчитывается раз в
+# FEED_COUNT_TIMEOUT (или командой warm_cache); с FEED_COUNT_ESTIMATE
+# главная берёт оценку из статистики таблицы
+FEED_COUNT_TIMEOUT = 60 * 5
+FEED_COUNT_ESTIMATE = False
+
+# Миниатюры картинок постов создаются в запросе. С THUMBNAIL_ASYNC
+# (в prod) их создаёт `manage.py process_thumbnails --loop`, а пока они
+# не готовы, шаблоны показывают заглушку. Задание упавшего воркера
+# берётся снова через THUMBNAIL_JOB_TIMEOUT секунд, не больше
+# THUMBNAIL_JOB_ATTEMPTS раз
+THUMBNAIL_BACKEND = 'posts.thumbnails.AsyncThumbnailBackend'
+THUMBNAIL_ASYNC = False
+THUMBNAIL_JOB_TIMEOUT = 60 * 5
+THUMBNAIL_JOB_ATTEMPTS = 3
+THUMBNAIL_DUMMY_SOURCE = STATIC_URL + 'img/placeholder.svg'
+
+# Загрузка картинок: файлы больше 256 КБ пишутся на диск по кускам,
+# приём обрывается после POST_IMAGE_MAX_BYTES, разрешение проверяется
+# по заголовку, а оригинал пережимается без метаданных после коммита
+# поста (при THUMBNAIL_ASYNC — воркером миниатюр)
+FILE_UPLOAD_MAX_MEMORY_SIZE = 256 * 1024
+FILE_UPLOAD_HANDLERS = [
+    'posts.uploads.SizeLimitUploadHandler',
+    'django.core.files.uploadhandler.MemoryFileUploadHandler',
+    'django.core.files.uploadhandler.TemporaryFileUploadHandler',
+]
+POST_IMAGE_MAX_BYTES = 10 * 1024 * 1024
+POST_IMAGE_MAX_PIXELS = 40 * 1000 * 1000
+POST_IMAGE_NORMALIZE = True
+POST_IMAGE_MAX_EDGE = 1920
+POST_IMAGE_FORMAT = 'JPEG'
+
+# Поисковый бэкенд; по умолчанию выбирается по типу базы (posts.search)
+SEARCH_BACKEND = None
+# Ранжируются только столько самых свежих совпадений запроса
+SEARCH_CANDIDATES = 1000
+
+# Инструментация запросов (core.instrumentation): доля замеряемых запросов,
+# порог медленного SQL и адреса, которым доступен /metrics/
+INSTRUMENTATION_SAMPLE_RATE = 1.0
+INSTRUMENTATION_SLOW_QUERY_MS = 200
+INSTRUMENTATION_METRICS_IPS = ('127.0.0.1',)
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'yatube.requests': {'handlers': ['console'], 'level': 'WARNING'},
+        'yatube.slow_queries': {'handlers': ['console'], 'level': 'WARNING'},
+    },
+}
+
+# Комментарии: не больше COMMENT_RATE_PER_MINUTE в минуту на пользователя
+# (с запасом COMMENT_BURST подряд) и в пять раз больше на IP-адрес;
+# одновременные комментарии записываются пачками до COMMENT_BATCH_MAX
+COMMENT_RATE_PER_MINUTE = 10
+COMMENT_BURST = 5
+COMMENT_BATCH_MAX = 100
+
+# Число доверенных прокси перед сайтом (nginx и т. п.): за ними IP-адрес
+# клиента берётся из X-Forwarded-For, иначе все делят адрес прокси
+TRUSTED_PROXIES = int(os.getenv('YATUBE_TRUSTED_PROXIES', 0))
+
+# PRAGMA для каждого соединения с SQLite (core.sqlite): WAL, ожидание
+# блокировки в миллисекундах, кэш страниц и mmap; None отключает PRAGMA
+SQLITE_PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'busy_timeout': 5000,
+    # Отрицательное значение — размер в килобайтах, а не в страницах.
+    'cache_size': -20000,
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'memory',
+}
+
+# Реплики для представлений только на чтение (core.routers), сколько
+# секунд после записи пользователь читает только из default и какие
+# приложения реплик не читают вовсе
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+REPLICA_STICKY_SECONDS = 5
+REPLICA_PRIMARY_APPS = ('auth', 'sessions')
+
+# Сколько живут шапка профиля и подписки посетителя (posts.profiles),
+# если их не сбросили сигналы
+PROFILE_CACHE_TIMEOUT = 60 * 5
+
+# Сколько секунд процесс держит группы в памяти (posts.groups), даже если
+# сдвиг поколения groups до него не дошёл
+GROUPS_MEMORY_TIMEOUT = 60
+
+# Сколько секунд прокси и CDN могут отдавать гостям ленты и посты без
+# перепроверки (core.http_cache); вошедшим кэш браузера переспрашивает
+HTTP_CACHE_MAX_AGE = 60
+
+# Кэш целых страниц для гостей (core.page_cache): сколько секунд копия
+# свежая и сколько ещё её можно отдавать, пока страницу пересобирают
+PAGE_CACHE_TIMEOUT = 60
+PAGE_CACHE_STALE = 60 * 10
@@ -0,0 +1,13 @@
+"""Нагрузочные прогоны (manage.py benchmark): боевые настройки локально."""
+from .prod import *  # noqa: F401,F403
+
+ALLOWED_HOSTS = ['localhost', '127.0.0.1', 'testserver']
+
+# Создание тысяч пользователей при наполнении базы не упирается в хэш
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+# Нагрузочный прогон отправляет комментарии чаще живого пользователя
+COMMENT_RATE_PER_MINUTE = None
+
+# Прогон идёт в одном процессе, locmem ему подходит
+CACHE_SHARED_REQUIRED = False
@@ -0,0 +1,55 @@
+"""
+Боевое окружение.
+
+Без приложений и middleware для разработки, с кэшем скомпилированных
+шаблонов, постоянными соединениями с базой и сессиями в кэше.
+"""
+import os
+
+from .base import *  # noqa: F401,F403
+from .base import DATABASES, TEMPLATES
+
+DEBUG = False
+
+ALLOWED_HOSTS = os.getenv('YATUBE_ALLOWED_HOSTS', 'localhost').split(',')
+
+# Соединение с базой живёт между запросами, а не открывается на каждый
+DATABASES = {
+    alias: dict(database,
+                CONN_MAX_AGE=int(os.getenv('YATUBE_CONN_MAX_AGE', 600)))
+    for alias, database in DATABASES.items()
+}
+
+# Шаблоны компилируются один раз на процесс; без APP_DIRS, потому что
+# загрузчики заданы явно
+TEMPLATES = [dict(
+    TEMPLATES[0],
+    APP_DIRS=False,
+    OPTIONS=dict(
+        TEMPLATES[0]['OPTIONS'],
+        context_processors=[
+            processor
+            for processor in TEMPLATES[0]['OPTIONS']['context_processors']
+            if processor != 'django.template.context_processors.debug'
+        ],
+        loaders=[(
+            'django.template.loaders.cached.Loader', [
+                'django.template.loaders.filesystem.Loader',
+                'django.template.loaders.app_directories.Loader',
+            ]
+        )],
+    ),
+)]
+
+# wsgi.py компилирует все шаблоны при запуске процесса
+TEMPLATES_PRECOMPILE = True
+
+# Воркеров несколько: поколения лент и кэш страниц должны быть общими,
+# manage.py check не пропустит locmem (см. core/checks.py)
+CACHE_SHARED_REQUIRED = True
+
+# Миниатюры создаёт воркер `manage.py process_thumbnails --loop`
+THUMBNAIL_ASYNC = True
+
+# Сессия читается из кэша, в базу идёт только запись
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
@@ -9,8 +9,14 @@ https://docs.djangoproject.com/en/2.2/howto/deployment/wsgi/
 
 import os
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
 
 application = get_wsgi_application()
+
+if getattr(settings, 'TEMPLATES_PRECOMPILE', False):
+    # С gunicorn --preload шаблоны компилируются до форка воркеров
+    from core.template_loading import precompile
+    precompile()